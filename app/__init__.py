@@ -6,12 +6,15 @@ from typing import TYPE_CHECKING, Any
 from dotenv import load_dotenv
 from flask import Flask, redirect, request, url_for
 
-from app.api import features, search_config, tasks
+from app.api import features, metrics, search_config, users
+from app.api import tasks as tasks_api
 from app.cli import register_commands
 from app.config import config_by_name
 from app.extensions import db, login_manager, mail
 from app.models import User
 from app.utils.errors import unauthorized as api_unauthorized
+from app.utils.metrics import instrument_app as instrument_metrics
+from app.utils.profiling import instrument_app as instrument_profiling
 from app.web import routes as web_routes
 
 # Carregar variáveis de ambiente
@@ -60,11 +63,21 @@ def create_app(config_name: str | None = None) -> Flask:
     # Registrar blueprints
     app.register_blueprint(search_config.bp)
     app.register_blueprint(features.bp)
-    app.register_blueprint(tasks.bp)
+    app.register_blueprint(tasks_api.bp)
+    app.register_blueprint(metrics.bp)
+    app.register_blueprint(users.bp)
 
     # Registrar blueprint web (HTML)
     app.register_blueprint(web_routes.bp)
 
+    # Backend do processamento diário, resolvido uma vez (auto: pinga o Redis)
+    app.config["TASKS_BACKEND"] = tasks_api.resolve_backend(app)
+
+    # Latência das requisições por rota, exposta em /metrics
+    instrument_metrics(app)
+    # Profiling opcional (PROFILING=true)
+    instrument_profiling(app)
+
     # Registrar comandos CLI (create-user, seed-test-users)
     register_commands(app)
 
@@ -0,0 +1,28 @@
+"""Endpoint de métricas para o Prometheus."""
+
+from typing import Any
+
+from flask import Blueprint, current_app, jsonify
+
+from app.api.tasks import verify_api_key
+from app.utils.metrics import metrics_response
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/metrics", methods=["GET"])
+def get_metrics() -> Any:
+    """
+    Métricas do app no formato de texto do Prometheus.
+
+    Requer a API_KEY, como as demais rotas administrativas (no Prometheus,
+    ``params: {api_key: [...]}`` ou ``authorization`` no scrape config).
+
+    Returns:
+        Latência das requisições por rota, das buscas FTS, da API do IOF e
+        dos envios de email, e o tamanho dos arquivos SQLite (banco e WAL)
+    """
+    is_valid, error_msg = verify_api_key()
+    if not is_valid:
+        return jsonify({"success": False, "error": error_msg}), 401
+    return metrics_response(current_app)
@@ -1,11 +1,21 @@
 """API para gerenciar configurações de busca (protegida por sessão Flask-Login)."""
 
+import csv
+import json
 import os
+from collections.abc import Iterable, Iterator
 from datetime import UTC, date, datetime
 from pathlib import Path
 from typing import Any
 
-from flask import Blueprint, current_app, jsonify, request
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+)
 from flask_login import current_user, login_required
 from pydantic import ValidationError
 
@@ -14,11 +24,17 @@ from app.models.search_config import SearchConfig
 from app.repositories.search_config_repository import SearchConfigRepository
 from app.repositories.sqlite_document_repository import SQLiteDocumentRepository
 from app.schemas.search_config import SearchConfigCreate, SearchConfigUpdate
+from app.services import config_csv
 from app.services.search_service import SearchService
-from app.utils.errors import not_found, server_error, validation_error
+from app.utils.errors import bad_request, not_found, server_error, validation_error
 
 bp = Blueprint("search_config", __name__, url_prefix="/api/search/configs")
 
+# Linhas aceitas por importação em lote
+MAX_BULK_ROWS = 10_000
+# Tamanho máximo da página na listagem por cursor
+MAX_PAGE_SIZE = 100
+
 
 # Dependency Injection (Simple)
 def get_service() -> SearchService:
@@ -44,20 +60,48 @@ def config_to_dict(config: SearchConfig) -> dict[str, Any]:
         "mail_subject": config.mail_subject,
         "teams_webhook": config.teams_webhook,
         "active": config.active,
+        "max_highlights_per_term": config.max_highlights_per_term,
         "created_at": config.created_at.isoformat() if config.created_at else None,
         "updated_at": config.updated_at.isoformat() if config.updated_at else None,
-        "terms": [{"term": term.term, "exact": True} for term in config.terms],
+        "terms": [
+            {"term": term.term, "exact": True, "syntax": term.syntax}
+            for term in config.terms
+        ],
     }
 
 
 @bp.route("", methods=["GET"])
 @login_required
 def list_configs() -> tuple[Any, int]:
-    """Lista configurações de busca do usuário logado."""
+    """
+    Lista configurações de busca do usuário logado.
+
+    Com ``limit`` (até 100) ou ``cursor``, pagina por cursor e responde
+    ``{"items": [...], "next_cursor": ...}``; sem eles, a lista completa.
+    """
     service = get_service()
     active_only = request.args.get("active_only", "true").lower() == "true"
-    configs = service.list_configs(active_only=active_only, user_id=current_user.id)
-    return jsonify([config_to_dict(c) for c in configs]), 200
+    cursor = request.args.get("cursor") or None
+    if "limit" not in request.args and cursor is None:
+        configs = service.list_configs(active_only=active_only, user_id=current_user.id)
+        return jsonify([config_to_dict(c) for c in configs]), 200
+
+    try:
+        limit = int(request.args.get("limit", 20))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return validation_error(
+            {"limit": f"Deve ser um inteiro entre 1 e {MAX_PAGE_SIZE}"}
+        )
+    try:
+        page = service.list_configs_page(
+            limit, cursor=cursor, active_only=active_only, user_id=current_user.id
+        )
+    except ValueError as e:
+        return validation_error({"cursor": str(e)})
+    items = [config_to_dict(c) for c in page.items]
+    return jsonify({"items": items, "next_cursor": page.next_cursor}), 200
 
 
 @bp.route("", methods=["POST"])
@@ -83,6 +127,81 @@ def create_config() -> tuple[Any, int]:
     return jsonify(config_to_dict(config)), 201
 
 
+def _bulk_rows() -> list[tuple[int, Any]] | None:
+    """Linhas da importação: CSV (arquivo ``file`` ou corpo text/csv) ou JSON."""
+    upload = request.files.get("file")
+    if upload is not None:
+        return config_csv.parse_rows(upload.read().decode("utf-8-sig"))
+    if request.mimetype == "text/csv":
+        return config_csv.parse_rows(request.get_data(as_text=True))
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("configs")
+    if not isinstance(data, list):
+        return None
+    return list(enumerate(data, start=1))
+
+
+def _stream_json(configs: Iterable[SearchConfig]) -> Iterator[str]:
+    """Gera a lista JSON de configs item a item."""
+    separator = "["
+    for config in configs:
+        yield separator + json.dumps(config_to_dict(config), ensure_ascii=False)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+@bp.route("/bulk", methods=["POST"])
+@login_required
+def import_configs() -> tuple[Any, int]:
+    """
+    Cria várias configurações do usuário logado em uma transação.
+
+    Aceita uma lista JSON (ou ``{"configs": [...]}``) no formato do POST
+    unitário, ou um CSV (ver ``app.services.config_csv``). Se alguma linha
+    for inválida, nada é criado e a resposta 422 traz os erros por
+    ``<linha>.<campo>`` (índice na lista JSON, a partir de 1, ou linha do CSV).
+    """
+    try:
+        rows = _bulk_rows()
+    except (UnicodeDecodeError, csv.Error) as e:
+        return bad_request(f"CSV inválido: {e}")
+    if not rows:
+        return validation_error({"body": "Envie uma lista JSON ou um CSV com configs"})
+    if len(rows) > MAX_BULK_ROWS:
+        return bad_request(f"Máximo de {MAX_BULK_ROWS} configurações por importação")
+
+    result = get_service().import_configs(rows, user_id=current_user.id)
+    if result.errors:
+        return validation_error(result.errors)
+    return jsonify({"created": len(result.ids), "ids": result.ids}), 201
+
+
+@bp.route("/bulk", methods=["GET"])
+@login_required
+def export_configs() -> Any:
+    """
+    Exporta as configurações do usuário logado em streaming.
+
+    ``format=json`` (padrão; mesmo formato do GET) ou ``format=csv`` (o da
+    importação). ``active_only=true`` exporta só as ativas.
+    """
+    output = request.args.get("format", "json").lower()
+    if output not in {"json", "csv"}:
+        return bad_request("format deve ser json ou csv")
+    active_only = request.args.get("active_only", "false").lower() == "true"
+    configs = get_service().export_configs(current_user.id, active_only=active_only)
+    if output == "csv":
+        return Response(
+            stream_with_context(config_csv.stream(configs)),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=configs.csv"},
+        )
+    return Response(
+        stream_with_context(_stream_json(configs)), mimetype="application/json"
+    )
+
+
 @bp.route("/<int:config_id>", methods=["GET"])
 @login_required
 def get_config(config_id: int) -> tuple[Any, int]:
@@ -192,7 +311,10 @@ def backtest_config(config_id: int) -> tuple[Any, int]:
                 doc_repo.save_pages(pages_data)
 
             # Converter termos da config para busca
-            search_terms = [{"term": term.term, "exact": True} for term in config.terms]
+            search_terms = [
+                {"term": term.term, "exact": True, "syntax": term.syntax}
+                for term in config.terms
+            ]
 
             # Executar busca
             report = doc_repo.search(test_date, search_terms)
@@ -209,7 +331,10 @@ def backtest_config(config_id: int) -> tuple[Any, int]:
                     }
                     for h in report.results
                 ],
-                "search_terms": [{"term": t.term, "exact": True} for t in config.terms],
+                "search_terms": [
+                    {"term": t.term, "exact": True, "syntax": t.syntax}
+                    for t in config.terms
+                ],
                 "trigger": "backtest",
                 "count": report.count,
             }
@@ -1,18 +1,34 @@
 """API para tarefas administrativas e processamento."""
 
 import os
-from datetime import UTC, date, datetime
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import UTC, date, datetime, timedelta
 from pathlib import Path
 from typing import Any
 
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, current_app, jsonify, request, url_for
+from redis import Redis
+from redis.exceptions import RedisError
+from rq import Queue
 
-from app.iof.v1.consulta import consulta_por_data, convert_pages
-from app.mailer.mailer import Mailer
-from app.mailer.notification import build_notification_emails
+from app.mailer.mailer import Mailer, MailerPool
+from app.repositories.pipeline_run_repository import PipelineRunRepository
 from app.repositories.search_config_repository import SearchConfigRepository
-from app.search.source import Pagina, SearchSource, Term, Trigger
+from app.repositories.sqlite_document_repository import SQLiteDocumentRepository
+from app.search.source import SearchSource, SearchSourcePool
+from app.services.digest_service import DigestService
+from app.services.gazette_service import GazetteService
+from app.services.notification_service import NotificationService
+from app.services.pipeline_metrics import StageMetrics
+from app.services.pipeline_run_service import (
+    PipelineRunService,
+    RunInProgressError,
+    RunTracker,
+)
 from app.services.search_service import SearchService
+from app.services.teams_service import TeamsChannel
+from app.utils.profiling import Profiler
 
 bp = Blueprint("tasks", __name__, url_prefix="/api/tasks")
 
@@ -61,7 +77,11 @@ def verify_api_key() -> tuple[bool, str | None]:
 @bp.route("/process-daily", methods=["POST"])
 def process_daily() -> tuple[Any, int]:
     """
-    Processa o diário oficial de uma data específica.
+    Enfileira o processamento do diário oficial de uma data específica.
+
+    O processamento (download, extração, indexação e notificações) roda em
+    segundo plano: via RQ quando há Redis, ou em uma thread do próprio
+    processo. Acompanhe pelo ``status_url`` retornado.
 
     Autenticação (escolha uma):
     - Query parameter: ?api_key=<API_KEY> (recomendado, funciona com Gunicorn)
@@ -70,11 +90,17 @@ def process_daily() -> tuple[Any, int]:
 
     Body (JSON opcional):
     {
-        "date": "2026-01-14"  # Data no formato YYYY-MM-DD. Se não fornecido, usa hoje.
+        "date": "2026-01-14",  # Data no formato YYYY-MM-DD. Se não fornecido, usa hoje.
+        "resume": false  # Retomar também uma execução ainda em andamento
     }
 
+    Se a última execução da data falhou (ou está em andamento sem atividade
+    há mais de ``STALE_AFTER``), ela é retomada da última etapa concluída e
+    notifica só as configurações pendentes.
+
     Returns:
-        JSON com status da execução
+        202 com o ID da execução, 409 se já há uma em andamento ou 503 se a
+        fila (Redis) estiver indisponível
     """
     # Verificar autenticação
     is_valid, error_msg = verify_api_key()
@@ -83,7 +109,7 @@ def process_daily() -> tuple[Any, int]:
 
     try:
         # Obter data do body ou usar hoje
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         date_str = data.get("date")
 
         if date_str:
@@ -101,103 +127,364 @@ def process_daily() -> tuple[Any, int]:
         else:
             publish_date = datetime.now(UTC).date()
 
-        # Processar diário (versão síncrona sem RQ)
-        current_app.logger.info("Iniciando processamento do diário de %s", publish_date)
-
-        # Chamar função de processamento
-        process_daily_gazette_sync(publish_date)
+        run_service = PipelineRunService(PipelineRunRepository())
+        backend = str(current_app.config["TASKS_BACKEND"])
+        run, resumed = run_service.open_run(
+            publish_date, backend, resume=bool(data.get("resume"))
+        )
+        current_app.logger.info(
+            "Processamento do diário de %s enfileirado (run %s, %s%s)",
+            publish_date,
+            run.id,
+            backend,
+            ", retomada" if resumed else "",
+        )
+        try:
+            _dispatch_run(run.id, backend)
+        except RedisError as e:
+            current_app.logger.warning(
+                "Redis indisponível, execução %s falhou: %s", run.id, e
+            )
+            tracker = run_service.tracker(run.id)
+            if tracker is not None:
+                # Falha: a próxima chamada retoma a execução
+                tracker.fail(e)
+            response = jsonify(
+                {
+                    "success": False,
+                    "error": "Fila de processamento indisponível",
+                    "run_id": run.id,
+                }
+            )
+            response.headers["Retry-After"] = "60"
+            return response, 503
 
+    except RunInProgressError as e:
         return jsonify(
             {
-                "success": True,
-                "message": f"Diário de {publish_date} processado com sucesso",
-                "date": publish_date.isoformat(),
+                "success": False,
+                "error": str(e),
+                "run_id": e.run.id,
+                "status_url": url_for("tasks.get_run", run_id=e.run.id),
             }
-        ), 200
-
+        ), 409
     except Exception as e:
-        current_app.logger.exception("Erro ao processar diário")
+        current_app.logger.exception("Erro ao enfileirar processamento do diário")
         return jsonify({"success": False, "error": str(e)}), 500
 
+    status_url = url_for("tasks.get_run", run_id=run.id)
+    response = jsonify(
+        {
+            "success": True,
+            "message": f"Processamento do diário de {publish_date} enfileirado",
+            "date": publish_date.isoformat(),
+            "run_id": run.id,
+            "resumed": resumed,
+            "status_url": status_url,
+        }
+    )
+    response.headers["Location"] = status_url
+    return response, 202
+
+
+@bp.route("/runs/<run_id>", methods=["GET"])
+def get_run(run_id: str) -> tuple[Any, int]:
+    """
+    Situação de uma execução do processamento diário.
 
-def process_daily_gazette_sync(publish_date: date) -> None:
+    Returns:
+        JSON com status, etapas (progresso e duração) e erro, se houver
     """
-    Versão síncrona do processamento de diário (sem RQ).
+    is_valid, error_msg = verify_api_key()
+    if not is_valid:
+        return jsonify({"success": False, "error": error_msg}), 401
+
+    run = PipelineRunService(PipelineRunRepository()).get_run(run_id)
+    if run is None:
+        return jsonify({"success": False, "error": "Execução não encontrada"}), 404
+    return jsonify({"success": True, "run": run.to_dict()}), 200
+
+
+@bp.route("/metrics", methods=["GET"])
+def get_metrics() -> tuple[Any, int]:
+    """
+    Latência por etapa e freshness do processamento diário.
+
+    Query params:
+    - days: Janela em dias de publicação (padrão 7)
+
+    Returns:
+        JSON com, por etapa, a duração (avg, p50, p95, max) e as métricas
+        somadas (bytes, páginas, matches, emails, tempos das subetapas), e a
+        freshness: tempo entre a publicação e o último alerta de cada execução
+    """
+    is_valid, error_msg = verify_api_key()
+    if not is_valid:
+        return jsonify({"success": False, "error": error_msg}), 401
+
+    days = request.args.get("days", 7, type=int)
+    if days < 1:
+        return jsonify({"success": False, "error": "days deve ser positivo"}), 400
+    since = datetime.now(UTC).date() - timedelta(days=days)
+    report = PipelineRunService(PipelineRunRepository()).stage_report(since)
+    return jsonify({"success": True, **report}), 200
+
+
+def resolve_backend(app: Any) -> str:
+    """
+    Escolhe, ao iniciar o app, onde rodar o processamento (``TASKS_BACKEND``).
+
+    ``auto`` usa RQ se o Redis responder. Sem Redis, fora de produção, usa
+    uma thread do próprio processo; em produção continua com RQ (o
+    ``process-daily`` responde 503 até o Redis voltar), para não rodar o
+    pipeline dentro do worker web sem aviso.
 
     Args:
-        publish_date: Data de publicação do diário
+        app: Instância do Flask app
+
+    Returns:
+        ``rq``, ``thread`` ou ``sync``
     """
+    backend = str(app.config.get("TASKS_BACKEND", "auto")).lower()
+    if backend != "auto":
+        return backend
     try:
-        # Consultar diário via API v1
-        # Consultar diário via API v1
-        try:
-            response = consulta_por_data(publish_date)
-        except Exception as e:
-            if "not found" in str(e).lower():
-                current_app.logger.info(
-                    "Nenhum diário encontrado para %s, pulando...", publish_date
-                )
-                return
-            raise
-
-        # Converter páginas do PDF
-        arquivo = response.dados.arquivo_caderno_principal.arquivo
-        paginas_iof = convert_pages(arquivo, publish_date)
-
-        # Converter para Pagina do search
-        paginas = [
-            Pagina(
-                titulo="",
-                num_pagina=p.num_pagina,
-                descricao="",
-                conteudo=p.conteudo,
-                data_publicacao=p.data_publicacao,
+        Redis.from_url(
+            app.config.get("REDIS_URL", "redis://localhost:6379/0"),
+            socket_connect_timeout=1,
+        ).ping()
+    except RedisError as e:
+        if app.config.get("APP_ENV") == "production":
+            app.logger.warning(
+                "Redis indisponível (%s): process-daily responde 503 até ele voltar",
+                e,
             )
-            for p in paginas_iof
-        ]
+            return "rq"
+        app.logger.warning(
+            "Redis indisponível (%s): processamento diário em thread local", e
+        )
+        return "thread"
+    return "rq"
 
-        # Importar páginas no banco de busca
-        diarios_dir = current_app.config.get("DIARIOS_DIR", "diarios")
-        Path(diarios_dir).mkdir(parents=True, exist_ok=True)
-        search_db = str(Path(diarios_dir) / "diarios.db")
-        source = SearchSource(search_db)
 
+def _dispatch_run(run_id: str, backend: str) -> None:
+    """Inicia a execução no backend escolhido."""
+    if backend == "rq":
+        # Importar aqui para evitar ciclo (app.tasks importa este módulo)
+        from app.tasks.daily_gazette import run_daily_pipeline  # noqa: PLC0415
+
+        queue = Queue(
+            "default",
+            connection=Redis.from_url(
+                current_app.config.get("REDIS_URL", "redis://localhost:6379/0")
+            ),
+        )
+        queue.enqueue(run_daily_pipeline, run_id, job_timeout="2h")
+    elif backend == "thread":
+        app = current_app._get_current_object()  # type: ignore[attr-defined]  # noqa: SLF001
+        _get_executor().submit(_run_with_app_context, app, run_id)
+    elif backend == "sync":
         try:
-            current_app.logger.info("Importando %d páginas...", len(paginas))
-            source.import_pages(paginas)
-
-            # Listar configs ativas para notificação
-            config_repo = SearchConfigRepository()
-            search_service = SearchService(config_repo)
-            configs = search_service.list_configs(active_only=True, user_id=None)
-            current_app.logger.info("Encontradas %d configurações ativas", len(configs))
-
-            # Processar notificações de forma síncrona (sem RQ)
-            for config in configs:
-                try:
-                    # Chamar função de notificação diretamente (síncrona)
-                    notify_search_config_sync(publish_date, config.id)
-                    current_app.logger.info(
-                        "Notificação processada para config %d", config.id
-                    )
-                except Exception:
-                    current_app.logger.exception(
-                        "Erro ao processar notificação para config %d", config.id
-                    )
-                    # Continuar com outras configurações mesmo se uma falhar
+            execute_pipeline_run(run_id)
+        except Exception:
+            # Erro já registrado na execução, consultável pelo status_url
+            current_app.logger.exception("Erro na execução %s", run_id)
+    else:
+        raise ValueError(f"TASKS_BACKEND desconhecido: {backend}")
 
-        finally:
-            source.close()
 
-    except Exception:
-        current_app.logger.exception("Erro ao processar diário")
-        raise
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Executor local (uma execução por vez por processo)."""
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="process-daily"
+        )
+    return _executor
+
+
+def _run_with_app_context(app: Any, run_id: str) -> None:
+    # Mesmo nome do job do RQ para PROFILE_JOBS
+    with app.app_context(), Profiler.for_app(app).profile("run_daily_pipeline"):
+        try:
+            execute_pipeline_run(run_id)
+        except Exception:
+            # Erro já registrado na execução
+            app.logger.exception("Erro na execução %s", run_id)
+
+
+def execute_pipeline_run(run_id: str) -> None:
+    """
+    Executa uma execução registrada, gravando o andamento de cada etapa.
+
+    Uma execução que já falhou retoma da última etapa concluída.
+    Requer app context.
+
+    Args:
+        run_id: ID da execução (``PipelineRun``)
+
+    Raises:
+        LookupError: Se a execução não existir
+    """
+    PipelineRunService(PipelineRunRepository()).execute(
+        run_id, process_daily_gazette_sync
+    )
+
+
+def process_daily_gazette_sync(
+    publish_date: date, tracker: RunTracker | None = None
+) -> None:
+    """
+    Versão síncrona do processamento de diário (sem RQ).
+
+    As notificações rodam neste processo, em paralelo limitado.
 
+    Args:
+        publish_date: Data de publicação do diário
+        tracker: Registro da execução, para gravar e retomar as etapas (opcional)
+    """
+    diarios_dir = Path(current_app.config.get("DIARIOS_DIR", "diarios"))
+    diarios_dir.mkdir(parents=True, exist_ok=True)
+    search_db = str(diarios_dir / "diarios.db")
+
+    service = GazetteService(
+        doc_repository=SQLiteDocumentRepository(search_db),
+        search_service=SearchService(SearchConfigRepository()),
+        artifacts_dir=diarios_dir / "runs",
+        notifier=lambda day, config_ids, metrics: _notify_configs(
+            day, config_ids, search_db, metrics
+        ),
+    )
+    service.process_date(publish_date, tracker)
+
+
+def _notify_configs(
+    publish_date: date,
+    config_ids: list[int],
+    search_db: str,
+    metrics: StageMetrics | None = None,
+) -> Iterator[tuple[int, BaseException | None]]:
+    """
+    Notifica as configs com até ``NOTIFY_CONCURRENCY`` threads.
+
+    Cada thread usa sua própria conexão somente leitura com o ``diarios.db``
+    e cada config roda em um app context próprio (sessão do banco própria).
+    O mailer fica em uma sessão que reaproveita a conexão entre os envios;
+    como a sessão SMTP serializa os envios, cada thread usa a sua
+    (``MailerPool``), aberta só se a thread enviar. Com concorrência 1, roda
+    na thread atual.
+    As configs de donos que preferem o resumo (``User.notify_digest``, ou
+    ``NOTIFY_DIGEST`` como padrão) vão em um resumo por destinatário, na
+    thread atual.
+    Tempos de busca, renderização e envio são somados em ``metrics``.
+
+    Yields:
+        ``(config_id, erro)`` na ordem em que as configs terminam; uma config
+        cujo webhook do Teams falhou aparece de novo no fim, com o erro
+    """
+    concurrency = current_app.config["NOTIFY_CONCURRENCY"]
+    app = current_app._get_current_object()  # type: ignore[attr-defined]  # noqa: SLF001
+    teams = TeamsChannel.for_app(app)
+
+    # Sessões de email criadas no primeiro uso: uma na thread atual (resumo
+    # e concorrência 1) ou uma por thread do pool
+    with MailerPool(app) as mailers:
+        digest = SearchService(SearchConfigRepository()).digest_recipients(
+            config_ids, default=bool(app.config.get("NOTIFY_DIGEST"))
+        )
+        if digest:
+            yield from _notify_digest(
+                publish_date, list(digest), search_db, mailers.get(), teams, metrics
+            )
+            config_ids = [c for c in config_ids if c not in digest]
+
+        if concurrency <= 1 or len(config_ids) <= 1:
+            with SearchSource(search_db, read_only=True) as source:
+                for config_id in config_ids:
+                    try:
+                        notify_search_config_sync(
+                            publish_date,
+                            config_id,
+                            source=source,
+                            mailer=mailers.get(),
+                            teams=teams,
+                            metrics=metrics,
+                        )
+                    except Exception as exc:  # noqa: BLE001 - erro devolvido ao chamador
+                        yield config_id, exc
+                    else:
+                        yield config_id, None
+        else:
 
-def notify_search_config_sync(publish_date: date, config_id: int) -> None:
+            def notify_in_thread(config_id: int) -> None:
+                with app.app_context():
+                    notify_search_config_sync(
+                        publish_date,
+                        config_id,
+                        source=sources.get(),
+                        mailer=mailers.get(),
+                        teams=teams,
+                        metrics=metrics,
+                    )
+
+            with (
+                SearchSourcePool(search_db) as sources,
+                ThreadPoolExecutor(
+                    max_workers=concurrency, thread_name_prefix="notify"
+                ) as executor,
+            ):
+                futures = {
+                    executor.submit(notify_in_thread, config_id): config_id
+                    for config_id in config_ids
+                }
+                for future in as_completed(futures):
+                    yield futures[future], future.exception()
+
+    # Emails enviados: só agora esperar os webhooks do Teams; uma falha
+    # volta como erro da config, que fica pendente no ledger
+    yield from teams.wait().items()
+
+
+def _notify_digest(
+    publish_date: date,
+    config_ids: list[int],
+    search_db: str,
+    mailer: Mailer,
+    teams: TeamsChannel,
+    metrics: StageMetrics | None = None,
+) -> Iterator[tuple[int, BaseException | None]]:
+    """Notifica as configs com um email de resumo por destinatário."""
+    configs = SearchService(SearchConfigRepository()).get_configs(config_ids)
+    with SearchSource(search_db, read_only=True) as source:
+        results = DigestService.for_app(
+            current_app, mailer, teams, metrics=metrics
+        ).notify(source, publish_date, configs)
+    for config_id in config_ids:
+        yield config_id, results.get(config_id)
+
+
+def notify_search_config_sync(
+    publish_date: date,
+    config_id: int,
+    *,
+    source: SearchSource | None = None,
+    mailer: Mailer | None = None,
+    teams: TeamsChannel | None = None,
+    metrics: StageMetrics | None = None,
+) -> None:
     """
     Versão síncrona de notify_search_config (sem criar novo app context).
     Busca config sem filtro de usuário (process-daily já listou todas).
+
+    ``source``, ``mailer`` e ``teams`` podem ser compartilhados entre
+    chamadas; sem eles, a função abre os seus. Com ``metrics``, soma os
+    tempos de busca (lookup), renderização (render) e envio (send).
+
+    Raises:
+        TeamsError: Se a função abriu o canal do Teams e a publicação falhou
     """
     config_repo = SearchConfigRepository()
     search_service = SearchService(config_repo)
@@ -206,51 +493,24 @@ def notify_search_config_sync(publish_date: date, config_id: int) -> None:
         current_app.logger.warning("Configuração %d não encontrada", config_id)
         return
 
+    owns_teams = teams is None
+    if teams is None:
+        teams = TeamsChannel.for_app(current_app)
+
     # Inicializar source de busca
-    diarios_dir = current_app.config.get("DIARIOS_DIR", "diarios")
-    search_db = str(Path(diarios_dir) / "diarios.db")
-    source = SearchSource(search_db)
+    owns_source = source is None
+    if source is None:
+        diarios_dir = current_app.config.get("DIARIOS_DIR", "diarios")
+        search_db = str(Path(diarios_dir) / "diarios.db")
+        source = SearchSource(search_db)
 
     try:
-        # Converter termos
-        search_terms = [Term(term=term.term, exact=True) for term in config.terms]
-
-        # Gerar relatório
-        report = source.lookup(Trigger.CRON, publish_date, search_terms)
-
-        # Se não houver matches, pular
-        if report.count == 0:
-            current_app.logger.info("Nenhum match encontrado para config %d", config_id)
-            return
-
-        # Enviar emails se configurado
-        if config.mail_to:
-            mailer = Mailer(current_app)
-            emails = build_notification_emails(
-                config=config,
-                report=report,
-                secret_key=str(current_app.config["SECRET_KEY"]),
-                app_base_url=str(current_app.config.get("APP_BASE_URL", "")),
-                app_env=str(current_app.config.get("APP_ENV", "development")),
-            )
-
-            try:
-                results = mailer.send(*emails)
-                csv_info = (
-                    " com CSV anexado" if config.attach_csv and report.count > 0 else ""
-                )
-                message_id = results[0].message_id if results else None
-                current_app.logger.info(
-                    "Email enviado via %s para %s (config %d)%s%s",
-                    mailer.provider_name,
-                    config.mail_to,
-                    config_id,
-                    csv_info,
-                    f" [message_id={message_id}]" if message_id else "",
-                )
-            except Exception:
-                current_app.logger.exception("Erro ao enviar email")
-                # Não falhar o job por erro de email
-
+        NotificationService.for_app(
+            current_app, mailer or Mailer(current_app), teams, metrics=metrics
+        ).notify_config(source, publish_date, config)
     finally:
-        source.close()
+        if owns_source:
+            source.close()
+        teams_errors = teams.wait() if owns_teams else {}
+    if config_id in teams_errors:
+        raise teams_errors[config_id]
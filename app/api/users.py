@@ -0,0 +1,53 @@
+"""API das preferências do usuário logado (protegida por sessão Flask-Login)."""
+
+from typing import Any
+
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import current_user, login_required
+from pydantic import ValidationError
+
+from app.models import User
+from app.schemas.user import UserPreferencesResponse, UserPreferencesUpdate
+from app.services import user_service
+from app.utils.errors import validation_error
+
+bp = Blueprint("users", __name__, url_prefix="/api/users")
+
+
+def preferences_to_dict(user: User) -> dict[str, Any]:
+    """Converte as preferências do usuário para dicionário."""
+    default = bool(current_app.config.get("NOTIFY_DIGEST"))
+    return UserPreferencesResponse(
+        email=user.email,
+        notify_digest=user.notify_digest,
+        digest=user_service.wants_digest(user, default=default),
+    ).model_dump()
+
+
+@bp.route("/me", methods=["GET"])
+@login_required
+def get_preferences() -> tuple[Any, int]:
+    """Preferências do usuário logado."""
+    return jsonify(preferences_to_dict(current_user)), 200
+
+
+@bp.route("/me", methods=["PUT"])
+@login_required
+def update_preferences() -> tuple[Any, int]:
+    """Atualiza as preferências do usuário logado."""
+    data = request.get_json()
+    if not data:
+        return validation_error({"body": "JSON inválido ou vazio"})
+
+    try:
+        preferences = UserPreferencesUpdate.model_validate(data)
+    except ValidationError as e:
+        errors = {}
+        for err in e.errors():
+            loc = err["loc"]
+            field = loc[0] if loc else "body"
+            errors[str(field)] = err["msg"]
+        return validation_error(errors)
+
+    user = user_service.update_preferences(current_user, preferences)
+    return jsonify(preferences_to_dict(user)), 200
@@ -1,10 +1,14 @@
-"""Comandos CLI do Flask (criar usuário, seed de teste)."""
+"""Comandos CLI do Flask (criar usuário, seed de teste, worker, reindexação)."""
+
+import time
+from pathlib import Path
 
 import click
 from flask import Flask
 
 from app.extensions import db
 from app.models import User
+from app.search.source import SearchSource
 
 
 def register_commands(app: Flask) -> None:
@@ -54,3 +58,64 @@ def register_commands(app: Flask) -> None:
                 click.echo(f"Criado: {email}")
             db.session.commit()
             click.echo(f"Total: {created} usuário(s) de teste criado(s).")
+
+    @app.cli.command("worker")
+    @click.argument("queues", nargs=-1)
+    @click.option("--burst", is_flag=True, help="Sai quando as filas esvaziarem")
+    @click.option(
+        "--metrics-port",
+        type=int,
+        envvar="WORKER_METRICS_PORT",
+        default=None,
+        help="Porta para expor /metrics do worker",
+    )
+    def worker(
+        queues: tuple[str, ...], *, burst: bool, metrics_port: int | None
+    ) -> None:
+        """Worker RQ com app, busca, mailer e Redis pré-carregados."""
+        from app.tasks.worker import run_worker  # noqa: PLC0415
+
+        run_worker(app, list(queues) or None, burst=burst, metrics_port=metrics_port)
+
+    @app.cli.command("outbox-worker")
+    @click.option("--burst", is_flag=True, help="Sai quando a outbox esvaziar")
+    @click.option(
+        "--interval", type=float, default=None, help="Segundos entre consultas"
+    )
+    def outbox_worker(*, burst: bool, interval: float | None) -> None:
+        """Worker que envia os emails da outbox com limite de taxa."""
+        from app.tasks.outbox import run_sender  # noqa: PLC0415
+
+        result = run_sender(app, burst=burst, poll_interval=interval)
+        click.echo(
+            f"Outbox: {result.sent} enviados, {result.retried} reagendados, "
+            f"{result.failed} com falha."
+        )
+
+    @app.cli.command("reindex-search")
+    @click.option(
+        "--force", is_flag=True, help="Recria o índice mesmo se já estiver atualizado"
+    )
+    def reindex_search(*, force: bool) -> None:
+        """Recria o índice FTS5 e a tabela de identificadores do diarios.db."""
+        diarios_dir = app.config.get("DIARIOS_DIR", "diarios")
+        Path(diarios_dir).mkdir(parents=True, exist_ok=True)
+        search_db = str(Path(diarios_dir) / "diarios.db")
+        with SearchSource(search_db) as source:
+            if source.has_prefix_index() and not force:
+                click.echo("Índice FTS já possui índices de prefixo.")
+            else:
+                started = time.perf_counter()
+                source.reindex()
+                elapsed = time.perf_counter() - started
+                click.echo(f"Índice FTS recriado em {elapsed:.1f}s ({search_db}).")
+
+            if source.has_identifier_index() and not force:
+                click.echo("Identificadores já extraídos.")
+                return
+            started = time.perf_counter()
+            pages = source.reindex_identifiers()
+            elapsed = time.perf_counter() - started
+            click.echo(
+                f"Identificadores de {pages} página(s) extraídos em {elapsed:.1f}s."
+            )
@@ -12,6 +12,21 @@ def _resolve_mail_provider(app_env: str) -> str:
     return "azure" if app_env == "production" else "smtp"
 
 
+def _parse_rate_limits(value: str) -> dict[str, float]:
+    """Converte ``"azure:20,smtp:5"`` em envios por segundo por provider."""
+    limits: dict[str, float] = {}
+    for item in value.split(","):
+        provider, _, rate = item.partition(":")
+        if provider.strip() and rate.strip():
+            limits[provider.strip().lower()] = float(rate)
+    return limits
+
+
+def _split_names(value: str) -> list[str]:
+    """Converte ``"a, b"`` em ``["a", "b"]``."""
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
 class Config:
     """Configuração base."""
 
@@ -53,6 +68,8 @@ class Config:
     AZURE_COMMUNICATION_CONNECTION_STRING = os.getenv(
         "AZURE_COMMUNICATION_CONNECTION_STRING", ""
     )
+    # Envios simultâneos em um lote (o SDK espera cada operação terminar)
+    AZURE_EMAIL_MAX_IN_FLIGHT = int(os.getenv("AZURE_EMAIL_MAX_IN_FLIGHT", "10"))
     MAIL_SERVER = os.getenv("MAIL_SMTP_HOST", "")
     MAIL_PORT = int(os.getenv("MAIL_SMTP_PORT", "587"))
     # Para Gmail na porta 587, TLS é obrigatório
@@ -80,9 +97,60 @@ class Config:
     MAIL_USERNAME = os.getenv("MAIL_SMTP_USER", "")
     MAIL_PASSWORD = os.getenv("MAIL_SMTP_PASSWORD", "")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_FROM_ADDRESS", "noreply@example.com")
+    # Mensagens por conexão SMTP reaproveitada (depois disso, reconecta)
+    MAIL_MAX_MESSAGES_PER_CONNECTION = int(
+        os.getenv("MAIL_MAX_MESSAGES_PER_CONNECTION", "100")
+    )
+    # Providers de teste de carga (memory/file): latência e erros simulados
+    MAIL_SINK_DIR = os.getenv("MAIL_SINK_DIR", "instance/mail")
+    MAIL_SINK_LATENCY_MS = float(os.getenv("MAIL_SINK_LATENCY_MS", "0"))
+    MAIL_SINK_ERROR_RATE = float(os.getenv("MAIL_SINK_ERROR_RATE", "0"))
 
     # Redis (para RQ)
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Configurações processadas por job de notificação
+    NOTIFY_CHUNK_SIZE = int(os.getenv("NOTIFY_CHUNK_SIZE", "50"))
+    # Onde roda o POST /api/tasks/process-daily: auto (RQ se o Redis responder
+    # ao iniciar; senão thread local, exceto em produção), rq, thread ou sync
+    # (na própria requisição)
+    TASKS_BACKEND = os.getenv("TASKS_BACKEND", "auto")
+    # Configs notificadas em paralelo no processamento sem RQ
+    NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", "4"))
+    # Padrão para quem não escolheu (User.notify_digest): um email de resumo por
+    # destinatário com todos os seus alertas da data
+    NOTIFY_DIGEST: bool = os.getenv("NOTIFY_DIGEST", "false").lower() == "true"
+    # Grava os emails na outbox; o envio fica com `flask outbox-worker`
+    NOTIFY_OUTBOX: bool = os.getenv("NOTIFY_OUTBOX", "false").lower() == "true"
+    # Envios por segundo por provider no worker da outbox ("azure:20,smtp:5")
+    OUTBOX_RATE_LIMITS = _parse_rate_limits(
+        os.getenv("OUTBOX_RATE_LIMITS", "azure:20,smtp:5")
+    )
+    # Emails por lote (também a maior rajada do limite de taxa)
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+    # Tentativas por email e espera inicial entre elas (dobra a cada falha)
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+    OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+    OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+    OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+    # Webhooks do Teams: POSTs simultâneos, timeout (s), retries e trechos no card
+    TEAMS_CONCURRENCY = int(os.getenv("TEAMS_CONCURRENCY", "4"))
+    TEAMS_TIMEOUT = float(os.getenv("TEAMS_TIMEOUT", "10"))
+    TEAMS_RETRIES = int(os.getenv("TEAMS_RETRIES", "3"))
+    TEAMS_MAX_HIGHLIGHTS = int(os.getenv("TEAMS_MAX_HIGHLIGHTS", "10"))
+
+    # Profiling (cProfile/tracemalloc) gravado em PROFILE_DIR
+    # (padrão: DIARIOS_DIR/profiles), mantendo os PROFILE_MAX_FILES mais novos
+    PROFILING: bool = os.getenv("PROFILING", "false").lower() == "true"
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+    PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+    # Endpoints (ex.: web.backtest_config) e jobs sempre perfilados; demais
+    # requisições só com o header X-Profile: <API_KEY>. "*" perfila todos
+    PROFILE_ROUTES = frozenset(_split_names(os.getenv("PROFILE_ROUTES", "")))
+    PROFILE_JOBS = frozenset(_split_names(os.getenv("PROFILE_JOBS", "")))
+    # Snapshot do tracemalloc na ingestão (download, extração e indexação)
+    PROFILE_TRACEMALLOC: bool = (
+        os.getenv("PROFILE_TRACEMALLOC", "false").lower() == "true"
+    )
 
     # Microsoft Entra ID (SSO)
     ENTRA_TENANT_ID = os.getenv("ENTRA_TENANT_ID", "")
@@ -126,6 +194,7 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     DATABASE_URL = "sqlite:///:memory:"
+    TASKS_BACKEND = "sync"
 
 
 # Mapeamento de nomes de configuração para classes
@@ -9,6 +9,7 @@ import requests
 
 from app.iof.common import NotFoundError, Pagina
 from app.pdf.extractor import PDFExtractor
+from app.utils.metrics import IOF_REQUEST_SECONDS, observe
 
 V1_BASE_URL = (
     "https://www.jornalminasgerais.mg.gov.br/api/v1/Jornal/ObterEdicaoPorDataPublicacao"
@@ -77,7 +78,9 @@ def consulta_por_data(publish_date: date) -> Response:
     params = urlencode({"dataPublicacao": publish_date.strftime("%Y-%m-%d")})
     url = f"{V1_BASE_URL}?{params}"
 
-    response = requests.get(url, timeout=30)
+    with observe(IOF_REQUEST_SECONDS, status="error") as labels:
+        response = requests.get(url, timeout=30)
+        labels["status"] = str(response.status_code)
 
     if response.status_code == 200:
         data = response.json()
@@ -139,13 +142,36 @@ def convert_pages(arquivo_base64: str, publish_date: date) -> list[Pagina]:
         ValueError: Se houver erro ao decodificar Base64
         RuntimeError: Se houver erro na extração
     """
-    # Decodificar Base64
+    return extract_pages(decode_caderno(arquivo_base64), publish_date)
+
+
+def decode_caderno(arquivo_base64: str) -> bytes:
+    """
+    Decodifica o PDF do caderno recebido em Base64.
+
+    Raises:
+        ValueError: Se houver erro ao decodificar Base64
+    """
     try:
-        pdf_bytes = base64.b64decode(arquivo_base64)
+        return base64.b64decode(arquivo_base64)
     except Exception as e:
         raise ValueError(f"Erro ao decodificar Base64: {e}") from e
 
-    # Extrair páginas
+
+def extract_pages(pdf_bytes: bytes, publish_date: date) -> list[Pagina]:
+    """
+    Extrai as páginas de texto do PDF do caderno.
+
+    Args:
+        pdf_bytes: Conteúdo do PDF
+        publish_date: Data de publicação
+
+    Returns:
+        Lista de páginas extraídas
+
+    Raises:
+        RuntimeError: Se houver erro na extração
+    """
     extractor = PDFExtractor()
     pdf_pages = extractor.extract_pages(pdf_bytes)
 
@@ -1,6 +1,13 @@
 """Sistema de envio de emails."""
 
-from app.mailer.mailer import Mailer
-from app.mailer.message import Attachment, Email
+from app.mailer.mailer import Mailer, MailerPool
+from app.mailer.message import Attachment, DeliveryError, DeliveryResult, Email
 
-__all__ = ["Attachment", "Email", "Mailer"]
+__all__ = [
+    "Attachment",
+    "DeliveryError",
+    "DeliveryResult",
+    "Email",
+    "Mailer",
+    "MailerPool",
+]
@@ -1,12 +1,16 @@
 """Provider Azure Communication Services Email."""
 
 import base64
+from collections import deque
 from importlib import import_module
-from typing import Any, Protocol
+from typing import Any, Protocol, cast
 
-from app.mailer.message import DeliveryResult, Email
+from app.mailer.message import DeliveryError, DeliveryResult, Email
 from app.mailer.provider import EmailProvider
 
+# Envios em andamento ao mesmo tempo em um lote
+DEFAULT_MAX_IN_FLIGHT = 10
+
 
 class _SendPoller(Protocol):
     def result(self) -> object:
@@ -51,34 +55,67 @@ class AzureEmailProvider(EmailProvider):
         return None
 
     def send(self, *emails: Email) -> list[DeliveryResult]:
-        """Envia emails usando o SDK da Azure."""
+        """
+        Envia emails usando o SDK da Azure.
+
+        Os envios são iniciados sem esperar os anteriores terminarem, com até
+        ``AZURE_EMAIL_MAX_IN_FLIGHT`` operações em andamento; o tempo de um
+        lote fica perto do de uma operação, não da soma delas.
+        """
         config_error = self.validate_configuration()
         if config_error:
             raise RuntimeError(config_error)
 
         sender_address = str(self.app.config["AZURE_EMAIL_SENDER_ADDRESS"])
+        max_in_flight = max(
+            int(
+                self.app.config.get("AZURE_EMAIL_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)
+            ),
+            1,
+        )
         client = self._get_client()
-        results: list[DeliveryResult] = []
-
-        try:
-            for email in emails:
+        outcomes: list[DeliveryResult | BaseException | None] = [None] * len(emails)
+        in_flight: deque[tuple[int, _SendPoller]] = deque()
+
+        def wait_oldest() -> None:
+            index, poller = in_flight.popleft()
+            try:
+                outcomes[index] = self._delivery_result(poller.result())
+            except Exception as exc:  # noqa: BLE001 - reportado por email
+                outcomes[index] = exc
+
+        for index, email in enumerate(emails):
+            if len(in_flight) >= max_in_flight:
+                wait_oldest()
+            try:
                 poller = client.begin_send(
                     self._build_message(sender_address=sender_address, email=email)
                 )
-                send_result = poller.result()
-                raw_message_id = getattr(send_result, "message_id", None) or getattr(
-                    send_result, "id", None
-                )
-                message_id = str(raw_message_id) if raw_message_id is not None else None
-                results.append(
-                    DeliveryResult(provider=self.provider_name, message_id=message_id)
-                )
-        except Exception as exc:
-            raise RuntimeError(
-                f"Erro ao enviar email via Azure Communication Services: {exc}"
-            ) from exc
-
-        return results
+            except Exception as exc:  # noqa: BLE001 - reportado por email
+                outcomes[index] = exc
+                continue
+            in_flight.append((index, poller))
+
+        while in_flight:
+            wait_oldest()
+
+        # Todos os envios terminaram: não há mais posições vazias
+        results = cast("list[DeliveryResult | BaseException]", outcomes)
+        errors = [o for o in results if isinstance(o, BaseException)]
+        if errors:
+            raise DeliveryError(
+                f"Erro ao enviar {len(errors)} de {len(emails)} email(s) via "
+                f"Azure Communication Services: {errors[0]}",
+                results,
+            ) from errors[0]
+        return cast("list[DeliveryResult]", results)
+
+    def _delivery_result(self, send_result: object) -> DeliveryResult:
+        raw_message_id = getattr(send_result, "message_id", None) or getattr(
+            send_result, "id", None
+        )
+        message_id = str(raw_message_id) if raw_message_id is not None else None
+        return DeliveryResult(provider=self.provider_name, message_id=message_id)
 
     def _get_client(self) -> _EmailClientProtocol:
         if self._client is None:
@@ -2,52 +2,133 @@
 
 import csv
 import io
+from collections.abc import Iterator
+from datetime import date
 
-from app.search.source import Report
+from app.search.source import Highlight, Report
 
+CSV_HEADER = ["Data Publicação", "Termo", "Página", "Conteúdo", "Link"]
 
-def generate_csv_from_report(report: Report) -> bytes:
+
+def _drain(buffer: io.StringIO) -> str:
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return value
+
+
+def iter_csv_from_report(report: Report) -> Iterator[bytes]:
     """
-    Gera um arquivo CSV a partir de um relatório de busca.
+    Gera o CSV de um relatório em blocos, uma linha por vez.
 
-    O CSV contém as seguintes colunas:
-    - Data Publicação: Data do diário oficial
-    - Termo: Termo que foi buscado
-    - Página: Número da página onde foi encontrado
-    - Conteúdo: Trecho do conteúdo onde o termo foi encontrado
-    - Link: URL direta para a página do diário
+    Percorre ``report.complete_highlights()``: mesmo quando o email mostra só
+    os trechos mais relevantes de cada termo, o CSV traz todos os resultados.
 
     Args:
         report: Relatório de busca com highlights e termos
 
+    Yields:
+        Blocos do CSV em bytes (UTF-8 com BOM para Excel)
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";", quoting=csv.QUOTE_ALL)
+
+    # Cabeçalho
+    yield _header(CSV_HEADER)
+
+    # Escrever cada highlight
+    for row in _report_rows(report):
+        writer.writerow(row)
+        yield _drain(buffer).encode("utf-8")
+
+
+class CsvRows:
+    """
+    Linhas do CSV de um relatório, montadas uma a uma (sem cabeçalho).
+
+    Permite gerar o CSV na mesma passada pelos highlights que renderiza o
+    email. Cada linha fica em bytes, para o resumo prefixar o alerta.
+    """
+
+    def __init__(self, publish_date: date) -> None:
+        self._date_str = publish_date.strftime("%d/%m/%Y")
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, delimiter=";", quoting=csv.QUOTE_ALL)
+        self.rows: list[bytes] = []
+
+    def add(self, highlight: Highlight) -> None:
+        """Acrescenta a linha de um destaque."""
+        self._writer.writerow(_highlight_row(self._date_str, highlight))
+        self.rows.append(_drain(self._buffer).encode("utf-8"))
+
+
+def csv_from_rows(rows: list[bytes]) -> bytes:
+    """CSV de um relatório (cabeçalho e linhas de ``CsvRows``)."""
+    return b"".join([_header(CSV_HEADER), *rows])
+
+
+def csv_from_sections(sections: list[tuple[str, list[bytes]]]) -> bytes:
+    """
+    CSV único para vários relatórios (email de resumo).
+
+    Igual a ``csv_from_rows``, com uma coluna ``Alerta`` na frente
+    identificando de qual alerta vem cada linha.
+
+    Args:
+        sections: Pares (nome do alerta, linhas de ``CsvRows``)
+
     Returns:
         Conteúdo do CSV em bytes (UTF-8 com BOM para Excel)
     """
-    output = io.StringIO()
+    chunks = [_header(["Alerta", *CSV_HEADER])]
+    for label, rows in sections:
+        # Mesmo formato do csv.writer com QUOTE_ALL
+        prefix = ('"' + label.replace('"', '""') + '";').encode("utf-8")
+        chunks.extend(prefix + row for row in rows)
+    return b"".join(chunks)
+
 
+def _header(columns: list[str]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";", quoting=csv.QUOTE_ALL)
     # Adicionar BOM UTF-8 para compatibilidade com Excel
-    output.write("\ufeff")
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    return _drain(buffer).encode("utf-8-sig")
 
-    writer = csv.writer(output, delimiter=";", quoting=csv.QUOTE_ALL)
 
-    # Cabeçalho
-    writer.writerow(["Data Publicação", "Termo", "Página", "Conteúdo", "Link"])
+def _highlight_row(date_str: str, highlight: Highlight) -> list[object]:
+    # Limpar conteúdo (remover tags HTML se houver)
+    content = highlight.content.replace("<b>", "").replace("</b>", "").strip()
+    return [date_str, highlight.term, highlight.page, content, highlight.page_url]
 
+
+def _report_rows(report: Report) -> Iterator[list[object]]:
     # Data formatada
     date_str = report.publish_date.strftime("%d/%m/%Y")
 
-    # Escrever cada highlight
-    for highlight in report.highlights:
-        # Limpar conteúdo (remover tags HTML se houver)
-        content = highlight.content.replace("<b>", "").replace("</b>", "").strip()
+    for highlight in report.complete_highlights():
+        yield _highlight_row(date_str, highlight)
+
+
+def generate_csv_from_report(report: Report) -> bytes:
+    """
+    Gera um arquivo CSV a partir de um relatório de busca.
 
-        writer.writerow(
-            [date_str, highlight.term, highlight.page, content, highlight.page_url]
-        )
+    O CSV contém as seguintes colunas:
+    - Data Publicação: Data do diário oficial
+    - Termo: Termo que foi buscado
+    - Página: Número da página onde foi encontrado
+    - Conteúdo: Trecho do conteúdo onde o termo foi encontrado
+    - Link: URL direta para a página do diário
 
-    # Converter para bytes (UTF-8)
-    csv_content = output.getvalue()
-    return csv_content.encode("utf-8-sig")
+    Args:
+        report: Relatório de busca com highlights e termos
+
+    Returns:
+        Conteúdo do CSV em bytes (UTF-8 com BOM para Excel)
+    """
+    return b"".join(iter_csv_from_report(report))
 
 
 def get_csv_filename(report: Report) -> str:
@@ -0,0 +1,55 @@
+"""Provider que grava os emails em arquivos ``.eml``."""
+
+import uuid
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Any
+
+from app.mailer.message import DeliveryResult, Email
+from app.mailer.sink_provider import SinkEmailProvider
+
+DEFAULT_SINK_DIR = "instance/mail"
+
+
+class FileEmailProvider(SinkEmailProvider):
+    """
+    Provider que grava cada email em ``MAIL_SINK_DIR/<message_id>.eml``.
+
+    Os arquivos abrem em qualquer cliente de email, o que serve para revisar
+    o conteúdo gerado por uma execução sem um servidor SMTP.
+    """
+
+    provider_name = "file"
+
+    def __init__(self, app: Any) -> None:
+        super().__init__(app)
+        self.directory = Path(str(app.config.get("MAIL_SINK_DIR") or DEFAULT_SINK_DIR))
+
+    def validate_configuration(self) -> str | None:
+        """Valida a taxa de erro simulada e cria o diretório dos arquivos."""
+        config_error = super().validate_configuration()
+        if config_error:
+            return config_error
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return None
+
+    def _record(self, email: Email) -> DeliveryResult:
+        message_id = uuid.uuid4().hex
+        message = EmailMessage()
+        message["Subject"] = email.subject
+        message["From"] = str(self.app.config.get("MAIL_DEFAULT_SENDER", ""))
+        message["To"] = ", ".join(email.to)
+        message["Message-ID"] = f"<{message_id}@{self.provider_name}>"
+        message.set_content(email.text)
+        if email.html:
+            message.add_alternative(email.html, subtype="html")
+        for attachment in email.attachments or []:
+            maintype, _, subtype = attachment.content_type.partition("/")
+            message.add_attachment(
+                attachment.content,
+                maintype=maintype,
+                subtype=subtype or "octet-stream",
+                filename=attachment.filename,
+            )
+        (self.directory / f"{message_id}.eml").write_bytes(bytes(message))
+        return DeliveryResult(provider=self.provider_name, message_id=message_id)
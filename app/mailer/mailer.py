@@ -1,11 +1,18 @@
 """Fachada para envio de emails usando providers configuráveis."""
 
-from typing import Any
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from threading import Lock, local
+from types import TracebackType
+from typing import Any, Self
 
 from app.mailer.azure_provider import AzureEmailProvider
+from app.mailer.file_provider import FileEmailProvider
+from app.mailer.memory_provider import MemoryEmailProvider
 from app.mailer.message import DeliveryResult, Email
 from app.mailer.provider import EmailProvider
 from app.mailer.smtp_provider import SmtpEmailProvider
+from app.utils.metrics import EMAIL_SEND_SECONDS, observe
 
 
 class Mailer:
@@ -20,6 +27,8 @@ class Mailer:
         """
         self.app = app
         self._provider: EmailProvider | None = None
+        self._sessions = 0
+        self._sessions_lock = Lock()
 
     @property
     def provider_name(self) -> str:
@@ -27,6 +36,11 @@ class Mailer:
         provider_name = str(self._get_app().config.get("MAIL_PROVIDER", "smtp")).strip()
         return provider_name.lower() or "smtp"
 
+    @property
+    def provider(self) -> EmailProvider:
+        """Provider configurado (ex.: para ler ``sent`` do provider ``memory``)."""
+        return self._get_provider()
+
     def validate_configuration(self) -> str | None:
         """Valida a configuração do provider atual."""
         return self._get_provider().validate_configuration()
@@ -41,7 +55,38 @@ class Mailer:
         Returns:
             Metadados de envio retornados pelo provider
         """
-        return self._get_provider().send(*emails)
+        provider = self._get_provider()
+        with observe(
+            EMAIL_SEND_SECONDS, provider=self.provider_name, outcome="error"
+        ) as labels:
+            results = provider.send(*emails)
+            labels["outcome"] = "ok"
+        return results
+
+    @contextmanager
+    def session(self) -> Iterator[Self]:
+        """
+        Reaproveita a conexão do provider em todos os envios do bloco.
+
+        Usado para uma execução inteira de notificações: no SMTP, evita um
+        handshake (e login) por email. Sessões aninhadas compartilham a
+        conexão da mais externa.
+
+        Yields:
+            O próprio mailer
+        """
+        provider = self._get_provider()
+        with self._sessions_lock:
+            self._sessions += 1
+            if self._sessions == 1:
+                provider.open_session()
+        try:
+            yield self
+        finally:
+            with self._sessions_lock:
+                self._sessions -= 1
+                if self._sessions == 0:
+                    provider.close_session()
 
     def send_test_email(self, to: str) -> None:
         """
@@ -75,9 +120,62 @@ class Mailer:
                 self._provider = AzureEmailProvider(app)
             elif provider_name == "smtp":
                 self._provider = SmtpEmailProvider(app)
+            elif provider_name == "memory":
+                self._provider = MemoryEmailProvider(app)
+            elif provider_name == "file":
+                self._provider = FileEmailProvider(app)
             else:
                 raise RuntimeError(
                     f"Provider de email desconhecido: {provider_name}. "
-                    "Use 'azure' ou 'smtp'."
+                    "Use 'azure', 'smtp', 'memory' ou 'file'."
                 )
         return self._provider
+
+
+class MailerPool:
+    """
+    Um ``Mailer`` em sessão por thread.
+
+    A sessão SMTP serializa os envios; threads que notificam em paralelo
+    usam cada uma a sua (uma conexão por thread), criada no primeiro uso.
+    Todas são encerradas no ``close``.
+    """
+
+    def __init__(self, app: Any) -> None:
+        """
+        Inicializa o pool.
+
+        Args:
+            app: Instância do Flask app
+        """
+        self.app = app
+        self._local = local()
+        self._sessions = ExitStack()
+        self._lock = Lock()
+
+    def get(self) -> Mailer:
+        """Retorna o mailer da thread atual."""
+        mailer: Mailer | None = getattr(self._local, "mailer", None)
+        if mailer is None:
+            with self._lock:
+                mailer = self._sessions.enter_context(Mailer(self.app).session())
+            self._local.mailer = mailer
+        return mailer
+
+    def close(self) -> None:
+        """Encerra as sessões de todas as threads."""
+        with self._lock:
+            self._sessions.close()
+
+    def __enter__(self) -> Self:
+        """Context manager entry."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Context manager exit."""
+        self.close()
@@ -0,0 +1,24 @@
+"""Provider em memória, para testes de carga e testes automatizados."""
+
+import itertools
+from typing import Any
+
+from app.mailer.message import DeliveryResult, Email
+from app.mailer.sink_provider import SinkEmailProvider
+
+
+class MemoryEmailProvider(SinkEmailProvider):
+    """Provider que guarda os emails entregues em ``sent``."""
+
+    provider_name = "memory"
+
+    def __init__(self, app: Any) -> None:
+        super().__init__(app)
+        self.sent: list[Email] = []
+        self._ids = itertools.count(1)
+
+    def _record(self, email: Email) -> DeliveryResult:
+        with self._lock:
+            self.sent.append(email)
+            message_id = f"memory-{next(self._ids)}"
+        return DeliveryResult(provider=self.provider_name, message_id=message_id)
@@ -29,3 +29,18 @@ class DeliveryResult:
 
     provider: str
     message_id: str | None = None
+
+
+class DeliveryError(RuntimeError):
+    """
+    Falha no envio de parte de um lote de emails.
+
+    ``outcomes`` segue a ordem dos emails: ``DeliveryResult`` para os
+    enviados e a exceção de cada um que falhou (ou não chegou a ser enviado).
+    """
+
+    def __init__(
+        self, message: str, outcomes: list[DeliveryResult | BaseException]
+    ) -> None:
+        super().__init__(message)
+        self.outcomes = outcomes
@@ -1,12 +1,21 @@
 """Geração de emails de notificação."""
 
+import io
 import urllib.parse
 from dataclasses import dataclass
 from datetime import date
+from functools import cache
+from pathlib import Path
 
-from jinja2 import Template
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
 
-from app.mailer.csv_generator import generate_csv_from_report, get_csv_filename
+from app.mailer.csv_generator import (
+    CsvRows,
+    csv_from_rows,
+    csv_from_sections,
+    get_csv_filename,
+)
 from app.mailer.message import Attachment, Email
 from app.mailer.unsubscribe import (
     build_unsubscribe_url,
@@ -40,25 +49,109 @@ def generate_daily_gazette_link(target_date: date) -> str:
     return base_url + encoded_payload
 
 
-NOTIFICATION_TEMPLATE = """
-Acessar Diário Oficial de {{ publish_date }}: {{ gazette_link }}
+TEMPLATES_DIR = Path(__file__).parent / "templates"
 
-Foram encontradas {{ count }} novas notificações para o Diário Oficial do dia \
-{{ publish_date }} para os termos:
-{% for term in search_terms %}
-- {{ term.term }}
-{% endfor %}
+# Marcador do rodapé (único trecho que muda por destinatário)
+_FOOTER_SLOT = "\x00rodape\x00"
 
-Os trechos destacados são:
-{% for highlight in highlights %}
-- Página {{ highlight.page }}: {{ highlight.content }}
-{% endfor %}
 
-{% if unsubscribe_url %}
-Você está recebendo este email porque foi cadastrado no alerta "{{ alert_label }}".
-Não deseja mais receber este alerta? Descadastre este email: {{ unsubscribe_url }}
-{% endif %}
-"""
+@cache
+def _environment() -> Environment:
+    """Ambiente Jinja dos emails, criado uma vez (templates compilados em cache)."""
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(["html"]),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedHighlights:
+    """Trechos de um relatório já renderizados: texto, HTML e linhas do CSV."""
+
+    text: str
+    html: Markup
+    csv_rows: list[bytes] | None = None
+
+
+def render_highlights(report: Report, *, csv: bool = False) -> RenderedHighlights:
+    """
+    Renderiza os trechos de um relatório em uma única passada.
+
+    Texto, HTML e (com ``csv``) as linhas do CSV são montados juntos, a cada
+    highlight lido do cursor, sem guardar os highlights. Com limite por
+    termo, o CSV traz a lista completa, lida do seu próprio cursor
+    (``all_highlights``).
+
+    Args:
+        report: Relatório de busca
+        csv: Se True, gera também as linhas do CSV
+
+    Returns:
+        Trechos renderizados, compartilháveis entre destinatários
+    """
+    env = _environment()
+    text_item = env.get_template("highlight.txt")
+    html_item = env.get_template("highlight.html")
+    text, html = io.StringIO(), io.StringIO()
+    rows = CsvRows(report.publish_date) if csv else None
+    # Sem limite por termo, o CSV sai desta mesma passada
+    same_pass_rows = rows if report.all_highlights is None else None
+    for highlight in report.highlights:
+        text.write(text_item.render(highlight=highlight) + "\n")
+        html.write(html_item.render(highlight=highlight) + "\n")
+        if same_pass_rows is not None:
+            same_pass_rows.add(highlight)
+    if rows is not None and report.all_highlights is not None:
+        for highlight in report.all_highlights:
+            rows.add(highlight)
+    return RenderedHighlights(
+        text=text.getvalue(),
+        # Renderizado pelo template HTML, com autoescape
+        html=Markup(html.getvalue()),  # noqa: S704
+        csv_rows=rows.rows if rows is not None else None,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedNotification:
+    """
+    Partes de um email de notificação que dependem só do relatório.
+
+    Renderizadas uma vez por relatório; ``personalize`` só preenche o rodapé
+    de descadastro de cada destinatário. O anexo é compartilhado.
+    """
+
+    subject: str
+    text: str
+    html: str
+    alert_label: str
+    attachments: list[Attachment] | None = None
+
+    def personalize(self, to: list[str], unsubscribe_url: str | None) -> Email:
+        """
+        Gera o email de um destinatário.
+
+        Args:
+            to: Lista de endereços de email
+            unsubscribe_url: URL de descadastro individual
+
+        Returns:
+            Email pronto para envio
+        """
+        env = _environment()
+        footer_data = {
+            "alert_label": self.alert_label,
+            "unsubscribe_url": unsubscribe_url or "",
+        }
+        text_footer = env.get_template("notification_footer.txt").render(footer_data)
+        html_footer = env.get_template("notification_footer.html").render(footer_data)
+        return Email(
+            to=to,
+            subject=self.subject,
+            text=self.text.replace(_FOOTER_SLOT, text_footer),
+            html=self.html.replace(_FOOTER_SLOT, html_footer),
+            attachments=self.attachments,
+        )
 
 
 @dataclass(frozen=True, slots=True)
@@ -104,12 +197,23 @@ def build_notification_emails(
     secret_key: str,
     app_base_url: str,
     app_env: str,
+    recipients: list[str] | None = None,
 ) -> list[Email]:
-    """Cria uma mensagem individual para cada destinatário do alerta."""
-    emails: list[Email] = []
-    subject = config.mail_subject or "Novas notificações - Diário Oficial"
+    """
+    Cria uma mensagem individual para cada destinatário do alerta.
+
+    ``recipients`` restringe os destinatários (ex.: só os que ainda não
+    receberam o alerta); sem ele, usa todos de ``config.mail_to``.
+    """
+    rendered = render_notification(
+        report,
+        subject=config.mail_subject,
+        attach_csv=config.attach_csv,
+        alert_label=config.label,
+    )
 
-    for recipient in config.mail_to:
+    emails: list[Email] = []
+    for recipient in config.mail_to if recipients is None else recipients:
         context = build_notification_email_context(
             config=config,
             recipient=recipient,
@@ -118,14 +222,7 @@ def build_notification_emails(
             app_env=app_env,
         )
         emails.append(
-            notification_email(
-                [context.recipient],
-                report,
-                subject=subject,
-                attach_csv=config.attach_csv,
-                alert_label=config.label,
-                unsubscribe_url=context.unsubscribe_url,
-            )
+            rendered.personalize([context.recipient], context.unsubscribe_url)
         )
 
     return emails
@@ -154,92 +251,146 @@ def notification_email(
     Returns:
         Email pronto para envio
     """
-    # Gerar link do jornal do dia
-    gazette_link = generate_daily_gazette_link(report.publish_date)
-    publish_date_formatted = report.publish_date.strftime("%d/%m/%Y")
+    rendered = render_notification(
+        report, subject=subject, attach_csv=attach_csv, alert_label=alert_label
+    )
+    return rendered.personalize(to, unsubscribe_url)
+
+
+def render_notification(
+    report: Report,
+    *,
+    subject: str | None = None,
+    attach_csv: bool = False,
+    alert_label: str = "Alerta do Diário Oficial",
+    highlights: RenderedHighlights | None = None,
+) -> RenderedNotification:
+    """
+    Renderiza as partes do email que dependem só do relatório.
+
+    Percorre os highlights uma vez para texto, HTML e CSV (ver
+    ``render_highlights``); o CSV (se pedido) é gerado uma única vez para
+    todos os destinatários.
+
+    Args:
+        report: Relatório de busca
+        subject: Assunto do email (opcional)
+        attach_csv: Se True, anexa arquivo CSV com os resultados
+        alert_label: Nome do alerta usado no rodapé do email
+        highlights: Trechos já renderizados do relatório (com as linhas do
+            CSV, se ``attach_csv``)
 
-    template = Template(NOTIFICATION_TEMPLATE)
+    Returns:
+        Email renderizado, a personalizar por destinatário
+    """
+    env = _environment()
+    with_csv = attach_csv and report.count > 0
+    if highlights is None:
+        highlights = render_highlights(report, csv=with_csv)
 
     # Preparar dados para template
     template_data = {
-        "alert_label": alert_label,
         "count": report.count,
-        "publish_date": publish_date_formatted,
-        "gazette_link": gazette_link,
-        "search_terms": [{"term": t.term} for t in report.search_terms],
-        "highlights": [
-            {"page": h.page, "content": h.content} for h in report.highlights
-        ],
-        "unsubscribe_url": unsubscribe_url or "",
+        "publish_date": report.publish_date.strftime("%d/%m/%Y"),
+        "gazette_link": generate_daily_gazette_link(report.publish_date),
+        "search_terms": report.search_terms,
+        "highlights": highlights,
+        "overflow": report.overflow(),
+        "attach_csv": attach_csv,
+        "footer": Markup(_FOOTER_SLOT),  # noqa: S704 - marcador interno
     }
+    text_body = env.get_template("notification.txt").render(template_data)
+    html_body = env.get_template("notification.html").render(template_data)
 
-    text_body = template.render(**template_data)
-
-    # Gerar HTML básico
-    html_body = f"""
-    <html>
-    <body>
-        <h2>Novas notificações - Diário Oficial</h2>
-        <p style="margin-bottom: 20px;">
-            <a href="{gazette_link}" style="background-color: #007bff; color: white; \
-padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block;">
-                Acessar Diário Oficial de {publish_date_formatted}
-            </a>
-        </p>
-        <p>Foram encontradas {report.count} novas notificações para o Diário Oficial \
-do dia {publish_date_formatted} para os termos:</p>
-        <ul>
-    """
-    for term in report.search_terms:
-        html_body += f"<li>{term.term}</li>"
-    html_body += """
-        </ul>
-        <h3>Os trechos destacados são:</h3>
-        <ul>
+    # Gerar anexo CSV se solicitado
+    attachments = None
+    if with_csv and highlights.csv_rows is not None:
+        attachments = [
+            Attachment(
+                filename=get_csv_filename(report),
+                content=csv_from_rows(highlights.csv_rows),
+                content_type="text/csv; charset=utf-8",
+            )
+        ]
+
+    return RenderedNotification(
+        subject=subject or "Novas notificações - Diário Oficial",
+        text=text_body,
+        html=html_body,
+        alert_label=alert_label,
+        attachments=attachments,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class DigestSection:
     """
-    for highlight in report.highlights:
-        html_body += f"""
-        <li>
-            <strong>Página {highlight.page}:</strong><br>
-            {highlight.content}
-        </li>
-        """
-    html_body += """
-        </ul>
-        <hr style="margin: 32px 0; border: 0; border-top: 1px solid #E5E7EB;">
-    """
-    if unsubscribe_url:
-        html_body += f"""
-        <p style="font-size: 14px; color: #4B5563; line-height: 1.6;">
-            Você está recebendo este email porque foi cadastrado no alerta
-            <strong>{alert_label}</strong>.<br>
-            <a href="{unsubscribe_url}"
-               style="color: #2563EB; text-decoration: underline;">
-                Descadastrar e-mail
-            </a>
-        </p>
-        """
-    html_body += """
-    </body>
-    </html>
+    Seção do email de resumo: o relatório de um alerta.
+
+    ``highlights`` vem de ``render_highlights`` (com as linhas do CSV, se
+    ``attach_csv``), renderizado uma vez e compartilhado entre os resumos.
     """
 
-    # Gerar anexo CSV se solicitado
+    label: str
+    report: Report
+    highlights: RenderedHighlights
+    unsubscribe_url: str
+    attach_csv: bool = False
+
+
+def digest_email(
+    to: list[str],
+    sections: list[DigestSection],
+    *,
+    publish_date: date,
+) -> Email:
+    """
+    Gera um email de resumo com uma seção por alerta.
+
+    Cada seção tem seu link de descadastro. As seções com ``attach_csv``
+    entram em um único CSV anexo, com a coluna ``Alerta``.
+
+    Args:
+        to: Lista de endereços de email
+        sections: Seções do resumo, uma por alerta
+        publish_date: Data de publicação do diário
+
+    Returns:
+        Email pronto para envio
+    """
+    publish_date_formatted = publish_date.strftime("%d/%m/%Y")
+    template_data = {
+        "sections": sections,
+        "publish_date": publish_date_formatted,
+        "gazette_link": generate_daily_gazette_link(publish_date),
+    }
+    env = _environment()
+    text_body = env.get_template("digest.txt").render(template_data)
+    html_body = env.get_template("digest.html").render(template_data)
+
     attachments = None
-    if attach_csv and report.count > 0:
-        csv_content = generate_csv_from_report(report)
-        csv_filename = get_csv_filename(report)
+    csv_sections = [
+        (section.label, rows)
+        for section in sections
+        if section.attach_csv
+        and section.report.count > 0
+        and (rows := section.highlights.csv_rows) is not None
+    ]
+    if csv_sections:
         attachments = [
             Attachment(
-                filename=csv_filename,
-                content=csv_content,
+                filename=f"resumo_{publish_date.isoformat()}.csv",
+                content=csv_from_sections(csv_sections),
                 content_type="text/csv; charset=utf-8",
             )
         ]
 
     return Email(
         to=to,
-        subject=subject or "Novas notificações - Diário Oficial",
+        subject=(
+            f"Resumo de {len(sections)} alertas - Diário Oficial de "
+            f"{publish_date_formatted}"
+        ),
         text=text_body,
         html=html_body,
         attachments=attachments,
@@ -16,4 +16,20 @@ class EmailProvider(ABC):
 
     @abstractmethod
     def send(self, *emails: Email) -> list[DeliveryResult]:
-        """Envia emails usando o provider."""
+        """
+        Envia emails usando o provider.
+
+        Returns:
+            Um resultado por email, na ordem dos emails
+
+        Raises:
+            DeliveryError: Se algum email falhar, com o resultado de cada um
+        """
+
+    def open_session(self) -> None:
+        """Inicia uma sessão de envio que reaproveita conexões (opcional)."""
+        return
+
+    def close_session(self) -> None:
+        """Encerra a sessão de envio aberta por ``open_session``."""
+        return
@@ -0,0 +1,67 @@
+"""Base dos providers de teste de carga, que não enviam emails de verdade."""
+
+import random
+import threading
+import time
+from abc import abstractmethod
+from typing import Any
+
+from app.mailer.message import DeliveryError, DeliveryResult, Email
+from app.mailer.provider import EmailProvider
+
+
+class SinkEmailProvider(EmailProvider):
+    """
+    Provider que grava os emails em vez de enviá-los.
+
+    Simula um serviço de email para testar a carga do pipeline inteiro:
+    ``MAIL_SINK_LATENCY_MS`` atrasa cada email e ``MAIL_SINK_ERROR_RATE``
+    (0 a 1) faz uma fração dos emails falhar, como faria o provider real
+    (``DeliveryError`` com o resultado de cada email).
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        self.latency = float(app.config.get("MAIL_SINK_LATENCY_MS", 0)) / 1000
+        self.error_rate = float(app.config.get("MAIL_SINK_ERROR_RATE", 0))
+        seed = app.config.get("MAIL_SINK_SEED")
+        self._random = random.Random(seed)  # noqa: S311 - só simulação
+        self._lock = threading.Lock()
+
+    def validate_configuration(self) -> str | None:
+        """Valida a taxa de erro simulada."""
+        if not 0 <= self.error_rate <= 1:
+            return "MAIL_SINK_ERROR_RATE deve estar entre 0 e 1."
+        return None
+
+    def send(self, *emails: Email) -> list[DeliveryResult]:
+        """Grava os emails, com a latência e os erros configurados."""
+        config_error = self.validate_configuration()
+        if config_error:
+            raise RuntimeError(config_error)
+
+        outcomes: list[DeliveryResult | BaseException] = []
+        for email in emails:
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                failed = self._random.random() < self.error_rate
+            if failed:
+                outcomes.append(
+                    RuntimeError(f"Falha simulada no envio para {email.to}")
+                )
+                continue
+            outcomes.append(self._record(email))
+
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        if errors:
+            raise DeliveryError(
+                f"Erro ao enviar {len(errors)} de {len(emails)} email(s) via "
+                f"{self.provider_name}: {errors[0]}",
+                outcomes,
+            )
+        return [o for o in outcomes if isinstance(o, DeliveryResult)]
+
+    @abstractmethod
+    def _record(self, email: Email) -> DeliveryResult:
+        """Grava um email entregue."""
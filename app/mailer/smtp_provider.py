@@ -1,12 +1,113 @@
 """Provider SMTP baseado em Flask-Mail."""
 
+import logging
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
 from typing import Any, cast
 
 from flask_mail import Message
 
-from app.mailer.message import DeliveryResult, Email
+from app.mailer.message import DeliveryError, DeliveryResult, Email
 from app.mailer.provider import EmailProvider
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MESSAGES_PER_CONNECTION = 100
+
+# Falhas de conexão que justificam reconectar e reenviar a mensagem
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+@dataclass
+class SmtpSessionStats:
+    """Números de uma sessão SMTP."""
+
+    messages: int
+    connections: int
+    reconnects: int
+    elapsed: float
+
+    @property
+    def messages_per_second(self) -> float:
+        """Mensagens enviadas por segundo desde a abertura da sessão."""
+        return self.messages / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class SmtpSession:
+    """
+    Conexão SMTP reaproveitada entre envios.
+
+    A conexão é aberta no primeiro envio e renovada a cada
+    ``max_messages`` mensagens. Se o servidor derrubar a conexão, a sessão
+    reconecta e reenvia a mensagem uma vez. Os envios são serializados: a
+    sessão pode ser compartilhada entre threads.
+    """
+
+    def __init__(self, mail: Any, max_messages: int | None = None) -> None:
+        self.mail = mail
+        self.max_messages = max_messages
+        self._connection: Any = None
+        self._sent_on_connection = 0
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.messages = 0
+        self.connections = 0
+        self.reconnects = 0
+
+    def send(self, message: Message) -> None:
+        """Envia uma mensagem, reconectando se o servidor caiu."""
+        with self._lock:
+            if self.max_messages and self._sent_on_connection >= self.max_messages:
+                self._disconnect()
+            try:
+                self._connect().send(message)
+            except _CONNECTION_ERRORS:
+                logger.warning("Conexão SMTP perdida, reconectando")
+                self._drop()
+                self.reconnects += 1
+                self._connect().send(message)
+            self._sent_on_connection += 1
+            self.messages += 1
+
+    def stats(self) -> SmtpSessionStats:
+        """Números da sessão até agora."""
+        return SmtpSessionStats(
+            messages=self.messages,
+            connections=self.connections,
+            reconnects=self.reconnects,
+            elapsed=time.monotonic() - self._started,
+        )
+
+    def close(self) -> None:
+        """Encerra a conexão aberta, se houver."""
+        with self._lock:
+            self._disconnect()
+
+    def _connect(self) -> Any:
+        if self._connection is None:
+            self._connection = self.mail.connect().__enter__()
+            self._sent_on_connection = 0
+            self.connections += 1
+        return self._connection
+
+    def _disconnect(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            connection.__exit__(None, None, None)
+        except (smtplib.SMTPException, OSError):
+            # A conexão já caiu: não há QUIT a enviar
+            logger.debug("Erro ao encerrar conexão SMTP", exc_info=True)
+
+    def _drop(self) -> None:
+        connection, self._connection = self._connection, None
+        host = getattr(connection, "host", None)
+        if host is not None:
+            host.close()
+
 
 class SmtpEmailProvider(EmailProvider):
     """Provider de envio via SMTP."""
@@ -15,6 +116,7 @@ class SmtpEmailProvider(EmailProvider):
 
     def __init__(self, app: Any) -> None:
         self.app = app
+        self._session: SmtpSession | None = None
 
     def validate_configuration(self) -> str | None:
         """Valida a configuração SMTP mínima para envio."""
@@ -26,25 +128,69 @@ class SmtpEmailProvider(EmailProvider):
             )
         return None
 
+    def open_session(self) -> None:
+        """Passa a reaproveitar uma conexão SMTP até ``close_session``."""
+        if self._session is None:
+            self._session = self._new_session()
+
+    def close_session(self) -> None:
+        """Encerra a conexão da sessão e registra a vazão obtida."""
+        session, self._session = self._session, None
+        if session is None:
+            return
+        session.close()
+        stats = session.stats()
+        if stats.messages:
+            logger.info(
+                "Sessão SMTP: %d mensagens em %.1fs (%.1f msg/s), "
+                "%d conexões, %d reconexões",
+                stats.messages,
+                stats.elapsed,
+                stats.messages_per_second,
+                stats.connections,
+                stats.reconnects,
+            )
+
     def send(self, *emails: Email) -> list[DeliveryResult]:
         """Envia emails usando a extensão Flask-Mail."""
         config_error = self.validate_configuration()
         if config_error:
             raise RuntimeError(config_error)
 
-        from app.extensions import mail  # noqa: PLC0415
-
         messages = [self._build_message(email) for email in emails]
+        # Fora de uma sessão, cada chamada usa uma conexão própria
+        session = self._session or self._new_session()
+        sent = 0
 
         try:
-            with mail.connect() as conn:
-                for message in messages:
-                    conn.send(message)
+            for message in messages:
+                session.send(message)
+                sent += 1
         except Exception as exc:
-            raise RuntimeError(f"Erro ao enviar email via SMTP: {exc}") from exc
+            # Os emails já aceitos pelo servidor contam como enviados
+            outcomes: list[DeliveryResult | BaseException] = [
+                DeliveryResult(provider=self.provider_name) for _ in range(sent)
+            ]
+            outcomes.extend(exc for _ in range(len(emails) - sent))
+            raise DeliveryError(
+                f"Erro ao enviar email via SMTP: {exc}", outcomes
+            ) from exc
+        finally:
+            if session is not self._session:
+                session.close()
 
         return [DeliveryResult(provider=self.provider_name) for _ in emails]
 
+    def _new_session(self) -> SmtpSession:
+        from app.extensions import mail  # noqa: PLC0415
+
+        max_messages = int(
+            self.app.config.get(
+                "MAIL_MAX_MESSAGES_PER_CONNECTION", DEFAULT_MAX_MESSAGES_PER_CONNECTION
+            )
+        )
+        return SmtpSession(mail, max_messages)
+
     def _build_message(self, email: Email) -> Message:
         recipients = cast("list[str | tuple[str, str]]", email.to.copy())
         message = Message(
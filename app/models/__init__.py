@@ -1,6 +1,31 @@
 """Modelos SQLAlchemy."""
 
-from app.models.search_config import SearchConfig, SearchTerm
+from app.models.notification_delivery import NotificationDelivery
+from app.models.outbox_email import OutboxAttachment, OutboxEmail, OutboxStatus
+from app.models.pipeline_run import (
+    ConfigStatus,
+    PipelineRun,
+    PipelineRunConfig,
+    PipelineRunStage,
+    PipelineRunStageMetrics,
+    RunStatus,
+)
+from app.models.search_config import SearchConfig, SearchConfigVersion, SearchTerm
 from app.models.user import User
 
-__all__ = ["SearchConfig", "SearchTerm", "User"]
+__all__ = [
+    "ConfigStatus",
+    "NotificationDelivery",
+    "OutboxAttachment",
+    "OutboxEmail",
+    "OutboxStatus",
+    "PipelineRun",
+    "PipelineRunConfig",
+    "PipelineRunStage",
+    "PipelineRunStageMetrics",
+    "RunStatus",
+    "SearchConfig",
+    "SearchConfigVersion",
+    "SearchTerm",
+    "User",
+]
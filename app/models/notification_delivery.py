@@ -0,0 +1,45 @@
+"""Modelo do ledger de entregas de notificações."""
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+from app.models.search_config import get_now_utc
+
+
+class NotificationDelivery(db.Model):  # type: ignore[name-defined,misc]
+    """
+    Email de notificação já entregue a um destinatário.
+
+    A chave (config, destinatário, data, hash do conteúdo) torna o envio
+    idempotente: um novo processamento da mesma data pula o que já foi
+    entregue e envia só o que faltou.
+    """
+
+    __tablename__ = "notification_deliveries"
+    __table_args__ = (
+        UniqueConstraint("config_id", "recipient", "publish_date", "content_hash"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Sem FK: o histórico de entregas continua válido se a configuração for removida
+    config_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    recipient: Mapped[str] = mapped_column(String(255), nullable=False)
+    publish_date: Mapped[date] = mapped_column(Date, nullable=False)
+    # SHA-256 (hex) do conteúdo do alerta, ver DeliveryService.content_hash
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    provider: Mapped[str] = mapped_column(String(32), nullable=False)
+    message_id: Mapped[str | None] = mapped_column(
+        String(255), nullable=True, default=None
+    )
+    delivered_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=get_now_utc
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<NotificationDelivery {self.config_id}/{self.recipient} "
+            f"{self.publish_date}>"
+        )
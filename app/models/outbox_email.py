@@ -0,0 +1,87 @@
+"""Modelo da outbox de emails de notificação."""
+
+from datetime import date, datetime
+from enum import StrEnum
+
+from sqlalchemy import Date, DateTime, Index, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+from app.models.search_config import get_now_utc
+
+
+class OutboxStatus(StrEnum):
+    """Situação de um email na outbox."""
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class OutboxEmail(db.Model):  # type: ignore[name-defined,misc]
+    """
+    Email já montado, aguardando o worker de envio.
+
+    A busca grava os emails aqui e segue; o worker (``flask outbox-worker``)
+    envia em lotes, respeitando o limite de taxa do provider, e registra as
+    entregas no ledger (``notification_deliveries``) ao concluir.
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # SHA-256 (hex) dos alertas e destinatário: o mesmo email não entra duas vezes
+    dedupe_key: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default=OutboxStatus.PENDING
+    )
+    # Provider configurado ao enfileirar (chave do limite de taxa)
+    provider: Mapped[str] = mapped_column(String(32), nullable=False)
+    publish_date: Mapped[date] = mapped_column(Date, nullable=False)
+    # JSON: [[config_id, content_hash], ...] registrados no ledger ao enviar
+    alerts: Mapped[str] = mapped_column(Text, nullable=False)
+    # JSON do Email; anexos referenciados pelo digest em email_outbox_attachments
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=get_now_utc
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    message_id: Mapped[str | None] = mapped_column(
+        String(255), nullable=True, default=None
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=get_now_utc
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, default=None
+    )
+
+    def __repr__(self) -> str:
+        return f"<OutboxEmail {self.id} ({self.status})>"
+
+
+class OutboxAttachment(db.Model):  # type: ignore[name-defined,misc]
+    """
+    Conteúdo de um anexo da outbox, gravado uma única vez.
+
+    Os emails de um alerta (um por destinatário) levam o mesmo CSV; o
+    payload de cada um guarda só o digest, e o conteúdo fica aqui.
+    """
+
+    __tablename__ = "email_outbox_attachments"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # SHA-256 (hex) do conteúdo
+    digest: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=get_now_utc
+    )
+
+    def __repr__(self) -> str:
+        return f"<OutboxAttachment {self.digest[:12]} ({len(self.content)} bytes)>"
@@ -0,0 +1,299 @@
+"""Modelos para execuções do processamento diário."""
+
+from datetime import UTC, date, datetime, time, timedelta
+from enum import StrEnum
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import (
+    JSON,
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.extensions import db
+from app.models.search_config import get_now_utc
+
+# O diário de uma data é publicado à meia-noite no horário de Brasília
+PUBLICATION_TZ = ZoneInfo("America/Sao_Paulo")
+
+
+class RunStatus(StrEnum):
+    """Situação de uma execução ou etapa."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ConfigStatus(StrEnum):
+    """Situação de uma configuração no ledger de uma execução."""
+
+    MATCHED = "matched"
+    NO_MATCH = "no_match"
+    QUEUED = "queued"
+    NOTIFIED = "notified"
+    FAILED = "failed"
+
+
+class PipelineRun(db.Model):  # type: ignore[name-defined,misc]
+    """Execução do processamento do diário de uma data."""
+
+    __tablename__ = "pipeline_runs"
+
+    # UUID em hex, devolvido pelo POST /api/tasks/process-daily
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    publish_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default=RunStatus.QUEUED
+    )
+    # "rq", "thread" ou "sync"
+    backend: Mapped[str] = mapped_column(String(16), nullable=False, default="sync")
+    error: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=get_now_utc
+    )
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, default=None
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, default=None
+    )
+
+    stages: Mapped[list["PipelineRunStage"]] = relationship(
+        "PipelineRunStage",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        order_by="PipelineRunStage.id",
+    )
+    configs: Mapped[list["PipelineRunConfig"]] = relationship(
+        "PipelineRunConfig",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        order_by="PipelineRunConfig.config_id",
+    )
+
+    @property
+    def freshness_ms(self) -> int | None:
+        """
+        Tempo entre a publicação do diário e o último alerta notificado.
+
+        Considera a meia-noite da data de publicação (``PUBLICATION_TZ``) e a
+        última config marcada como notificada no ledger, inclusive pelos
+        jobs do RQ. None se nenhuma config foi notificada.
+        """
+        notified = [
+            config.updated_at
+            for config in self.configs
+            if config.status == ConfigStatus.NOTIFIED
+        ]
+        if not notified:
+            return None
+        published = datetime.combine(self.publish_date, time(), PUBLICATION_TZ)
+        return _duration_ms(published.astimezone(UTC), max(notified))
+
+    def is_stale(self, now: datetime, max_idle: timedelta) -> bool:
+        """
+        Verifica se a execução em andamento parou (o processo morreu).
+
+        A atividade é o início da execução ou de uma etapa, o fim de uma
+        etapa ou a última atualização do ledger de configs.
+        """
+        activity = [self.created_at, self.started_at]
+        activity += [stage.started_at for stage in self.stages]
+        activity += [stage.finished_at for stage in self.stages]
+        activity += [config.updated_at for config in self.configs]
+        last = max(_naive_utc(value) for value in activity if value is not None)
+        return _naive_utc(now) - last > max_idle
+
+    @property
+    def checkpoint(self) -> str | None:
+        """Última etapa concluída (a execução retoma a partir da seguinte)."""
+        completed = [s.name for s in self.stages if s.status == RunStatus.SUCCEEDED]
+        return completed[-1] if completed else None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Representação JSON da execução e de suas etapas."""
+        return {
+            "id": self.id,
+            "publish_date": self.publish_date.isoformat(),
+            "status": self.status,
+            "backend": self.backend,
+            "error": self.error,
+            "created_at": _isoformat(self.created_at),
+            "started_at": _isoformat(self.started_at),
+            "finished_at": _isoformat(self.finished_at),
+            "duration_ms": _duration_ms(self.started_at, self.finished_at),
+            "checkpoint": self.checkpoint,
+            "freshness_ms": self.freshness_ms,
+            "stages": [stage.to_dict() for stage in self.stages],
+            "configs": {
+                status: sum(1 for config in self.configs if config.status == status)
+                for status in ConfigStatus
+            },
+        }
+
+    def __repr__(self) -> str:
+        return f"<PipelineRun {self.id}: {self.publish_date} ({self.status})>"
+
+
+class PipelineRunStage(db.Model):  # type: ignore[name-defined,misc]
+    """Etapa de uma execução (fetch, extract, index, match, notify)."""
+
+    __tablename__ = "pipeline_run_stages"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[str] = mapped_column(
+        String(32),
+        ForeignKey("pipeline_runs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    name: Mapped[str] = mapped_column(String(32), nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default=RunStatus.RUNNING
+    )
+    # Progresso dentro da etapa (ex.: configs notificadas / total)
+    done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total: Mapped[int | None] = mapped_column(Integer, nullable=True, default=None)
+    detail: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    # Contadores e tempos das subetapas (ver StageMetrics)
+    metrics: Mapped[dict[str, float] | None] = mapped_column(
+        JSON, nullable=True, default=None
+    )
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=get_now_utc
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, default=None
+    )
+
+    run: Mapped["PipelineRun"] = relationship("PipelineRun", back_populates="stages")
+    job_metrics: Mapped[list["PipelineRunStageMetrics"]] = relationship(
+        "PipelineRunStageMetrics",
+        back_populates="stage",
+        cascade="all, delete-orphan",
+        order_by="PipelineRunStageMetrics.id",
+    )
+
+    @property
+    def total_metrics(self) -> dict[str, float]:
+        """Métricas da etapa somadas às gravadas pelos jobs do RQ."""
+        # Mesma soma de ``merge_metrics`` (os modelos não importam serviços)
+        total = dict(self.metrics or {})
+        for row in self.job_metrics:
+            for name, value in row.metrics.items():
+                total[name] = round(total.get(name, 0) + value, 1)
+        return total
+
+    def to_dict(self) -> dict[str, Any]:
+        """Representação JSON da etapa."""
+        return {
+            "name": self.name,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "detail": self.detail,
+            "metrics": self.total_metrics,
+            "started_at": _isoformat(self.started_at),
+            "finished_at": _isoformat(self.finished_at),
+            "duration_ms": _duration_ms(self.started_at, self.finished_at),
+        }
+
+    def __repr__(self) -> str:
+        return f"<PipelineRunStage {self.run_id}/{self.name} ({self.status})>"
+
+
+class PipelineRunStageMetrics(db.Model):  # type: ignore[name-defined,misc]
+    """
+    Métricas de um job do RQ em uma etapa (uma linha por lote).
+
+    Os jobs terminam em paralelo: cada um insere a sua linha em vez de
+    reescrever o JSON da etapa, que perderia somas concorrentes.
+    """
+
+    __tablename__ = "pipeline_run_stage_metrics"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    stage_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("pipeline_run_stages.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    metrics: Mapped[dict[str, float]] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=get_now_utc
+    )
+
+    stage: Mapped["PipelineRunStage"] = relationship(
+        "PipelineRunStage", back_populates="job_metrics"
+    )
+
+    def __repr__(self) -> str:
+        return f"<PipelineRunStageMetrics {self.stage_id} ({self.id})>"
+
+
+class PipelineRunConfig(db.Model):  # type: ignore[name-defined,misc]
+    """Ledger por configuração: matches e situação da notificação."""
+
+    __tablename__ = "pipeline_run_configs"
+    __table_args__ = (UniqueConstraint("run_id", "config_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[str] = mapped_column(
+        String(32),
+        ForeignKey("pipeline_runs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    # Sem FK: o ledger continua válido se a configuração for removida depois
+    config_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default=ConfigStatus.MATCHED
+    )
+    matches: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=get_now_utc,
+        onupdate=get_now_utc,
+    )
+
+    run: Mapped["PipelineRun"] = relationship("PipelineRun", back_populates="configs")
+
+    def is_stale(self, now: datetime, max_idle: timedelta) -> bool:
+        """Verifica se a config está sem atualização há mais de ``max_idle``."""
+        return _naive_utc(now) - _naive_utc(self.updated_at) > max_idle
+
+    def __repr__(self) -> str:
+        return f"<PipelineRunConfig {self.run_id}/{self.config_id} ({self.status})>"
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def _duration_ms(started: datetime | None, finished: datetime | None) -> int | None:
+    if started is None or finished is None:
+        return None
+    # SQLite devolve datetimes sem fuso; os valores são sempre gravados em UTC.
+    if (started.tzinfo is None) != (finished.tzinfo is None):
+        started = _naive_utc(started)
+        finished = _naive_utc(finished)
+    return int((finished - started).total_seconds() * 1000)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
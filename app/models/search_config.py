@@ -2,19 +2,23 @@
 
 import json
 from datetime import UTC, datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     TypeDecorator,
+    event,
+    insert,
+    update,
 )
-from sqlalchemy.engine import Dialect
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.engine import Connection, Dialect
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from app.extensions import db
 
@@ -65,6 +69,18 @@ class SearchConfig(db.Model):  # type: ignore[name-defined,misc]
     """Configuração de busca no Diário Oficial."""
 
     __tablename__ = "search_configs"
+    __table_args__ = (
+        # Listagens por dono em ordem de criação (keyset: created_at, id),
+        # com e sem o filtro de ativas
+        Index(
+            "ix_search_configs_user_active_created",
+            "user_id",
+            "active",
+            "created_at",
+            "id",
+        ),
+        Index("ix_search_configs_user_created", "user_id", "created_at", "id"),
+    )
 
     # Usar Integer para compatibilidade com SQLite (autoincrement funciona melhor)
     # Em PostgreSQL, Integer suporta até 2 bilhões, suficiente para a maioria dos casos
@@ -79,6 +95,11 @@ class SearchConfig(db.Model):  # type: ignore[name-defined,misc]
     mail_subject: Mapped[str] = mapped_column(String(255), nullable=False, default="")
     teams_webhook: Mapped[str] = mapped_column(Text, nullable=True, default=None)
     active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # Limite de trechos por termo no corpo do email (None = sem limite).
+    # O total exato e o CSV completo continuam sendo enviados.
+    max_highlights_per_term: Mapped[int | None] = mapped_column(
+        Integer, nullable=True, default=None
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=get_now_utc
     )
@@ -105,10 +126,13 @@ class SearchTerm(db.Model):  # type: ignore[name-defined,misc]
     """Termo de busca associado a uma configuração."""
 
     __tablename__ = "search_terms"
+    __table_args__ = (Index("search_terms_config_idx", "search_config_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     term: Mapped[str] = mapped_column(Text, nullable=False)
     exact: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # "exact" (frase exata) ou "query" (AND/OR/NOT/NEAR, ver app.search.query)
+    syntax: Mapped[str] = mapped_column(String(16), nullable=False, default="exact")
     search_config_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("search_configs.id", ondelete="CASCADE"), nullable=False
     )
@@ -119,4 +143,41 @@ class SearchTerm(db.Model):  # type: ignore[name-defined,misc]
     )
 
     def __repr__(self) -> str:
-        return f"<SearchTerm {self.id}: {self.term} (exact={self.exact})>"
+        return f"<SearchTerm {self.id}: {self.term} (syntax={self.syntax})>"
+
+
+class SearchConfigVersion(db.Model):  # type: ignore[name-defined,misc]
+    """
+    Versão das configurações de busca (linha única).
+
+    Incrementada a cada flush que grava configs ou termos; os workers
+    comparam com a versão do seu snapshot para saber se precisam recarregar.
+    """
+
+    __tablename__ = "search_config_versions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+def bump_config_version(connection: Connection) -> None:
+    """Incrementa a versão das configurações (cria a linha se faltar)."""
+    result = connection.execute(
+        update(SearchConfigVersion)
+        .where(SearchConfigVersion.id == 1)
+        .values(version=SearchConfigVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(SearchConfigVersion).values(id=1, version=1))
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_version_on_write(session: Session, _flush_context: Any) -> None:
+    """Incrementa a versão se o flush gravou alguma config ou termo."""
+    changed = (
+        *session.new,
+        *session.deleted,
+        *(obj for obj in session.dirty if session.is_modified(obj)),
+    )
+    if any(isinstance(obj, SearchConfig | SearchTerm) for obj in changed):
+        bump_config_version(session.connection())
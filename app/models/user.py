@@ -4,7 +4,7 @@ from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
 from flask_login import UserMixin
-from sqlalchemy import DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, DateTime, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from werkzeug.security import check_password_hash, generate_password_hash
 
@@ -41,6 +41,11 @@ class User(UserMixin, db.Model):  # type: ignore[name-defined,misc]
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=get_now_utc
     )
+    # Alertas do usuário em um resumo diário por destinatário; None segue
+    # o padrão do app (NOTIFY_DIGEST)
+    notify_digest: Mapped[bool | None] = mapped_column(
+        Boolean, nullable=True, default=None
+    )
 
     # Relacionamento com configurações de busca (multi-tenancy)
     search_configs: Mapped[list["SearchConfig"]] = relationship(
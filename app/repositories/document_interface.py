@@ -1,6 +1,7 @@
 """Interface para o repositório de documentos (FTS)."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass
 from datetime import date
 from typing import Any
@@ -32,6 +33,18 @@ class DocumentRepository(ABC):
     def search(self, publish_date: date, terms: list[dict[str, Any]]) -> SearchReport:
         """Busca termos em uma data."""
 
+    @abstractmethod
+    def iter_results(
+        self, publish_date: date, terms: list[dict[str, Any]]
+    ) -> Iterator[SearchResult]:
+        """Gera os resultados da busca sem materializar a lista."""
+
+    @abstractmethod
+    def count_matches(
+        self, publish_date: date, terms_by_key: Mapping[int, list[dict[str, Any]]]
+    ) -> dict[int, int]:
+        """Conta as páginas encontradas para vários grupos de termos."""
+
     @abstractmethod
     def has_content(self, publish_date: date) -> bool:
         """Verifica se há conteúdo para a data."""
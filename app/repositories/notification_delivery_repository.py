@@ -0,0 +1,52 @@
+"""Repositório para o ledger de entregas de notificações."""
+
+from datetime import date
+
+from app.extensions import db
+from app.models.notification_delivery import NotificationDelivery
+
+
+class NotificationDeliveryRepository:
+    """Repositório para gerenciar a persistência das entregas de notificações."""
+
+    def find_recipients(
+        self, config_id: int, publish_date: date, content_hash: str
+    ) -> set[str]:
+        """Destinatários que já receberam este conteúdo para a config e data."""
+        rows = db.session.execute(
+            db.select(NotificationDelivery.recipient).where(
+                NotificationDelivery.config_id == config_id,
+                NotificationDelivery.publish_date == publish_date,
+                NotificationDelivery.content_hash == content_hash,
+            )
+        )
+        return set(rows.scalars())
+
+    def save(self, delivery: NotificationDelivery) -> NotificationDelivery:
+        """Registra uma entrega."""
+        db.session.add(delivery)
+        db.session.commit()
+        return delivery
+
+    def add_new(self, delivery: NotificationDelivery) -> bool:
+        """
+        Adiciona uma entrega à sessão, sem confirmar, se ainda não registrada.
+
+        Args:
+            delivery: Entrega
+
+        Returns:
+            False se a entrega já estava no ledger
+        """
+        exists = db.session.execute(
+            db.select(NotificationDelivery.id).where(
+                NotificationDelivery.config_id == delivery.config_id,
+                NotificationDelivery.recipient == delivery.recipient,
+                NotificationDelivery.publish_date == delivery.publish_date,
+                NotificationDelivery.content_hash == delivery.content_hash,
+            )
+        ).first()
+        if exists is not None:
+            return False
+        db.session.add(delivery)
+        return True
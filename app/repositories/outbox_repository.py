@@ -0,0 +1,89 @@
+"""Repositório para a outbox de emails."""
+
+from datetime import datetime
+from typing import cast
+
+from app.extensions import db
+from app.models.outbox_email import OutboxAttachment, OutboxEmail, OutboxStatus
+
+
+class OutboxRepository:
+    """Repositório para gerenciar a persistência da outbox de emails."""
+
+    def get_by_dedupe_key(self, dedupe_key: str) -> OutboxEmail | None:
+        """Busca um email da outbox pela chave de deduplicação."""
+        query = OutboxEmail.query.filter_by(dedupe_key=dedupe_key)
+        return cast("OutboxEmail | None", query.first())
+
+    def add(self, entry: OutboxEmail) -> None:
+        """Adiciona um email à sessão (confirmado em ``commit``)."""
+        db.session.add(entry)
+
+    def save_attachment(self, digest: str, content: bytes) -> None:
+        """Grava o conteúdo de um anexo, se ainda não houver um com o digest."""
+        exists = db.session.execute(
+            db.select(OutboxAttachment.id).where(OutboxAttachment.digest == digest)
+        ).first()
+        if exists is None:
+            db.session.add(OutboxAttachment(digest=digest, content=content))
+
+    def find_attachments(self, digests: set[str]) -> dict[str, bytes]:
+        """Conteúdo dos anexos pelo digest."""
+        if not digests:
+            return {}
+        rows = db.session.execute(
+            db.select(OutboxAttachment.digest, OutboxAttachment.content).where(
+                OutboxAttachment.digest.in_(digests)
+            )
+        )
+        return dict(rows.all())
+
+    def claim_due(self, now: datetime, limit: int) -> list[OutboxEmail]:
+        """
+        Marca como ``sending`` e devolve os emails pendentes já vencidos.
+
+        Args:
+            now: Instante atual (UTC)
+            limit: Máximo de emails
+
+        Returns:
+            Emails na ordem em que venceram
+        """
+        entries = list(
+            db.session.execute(
+                db.select(OutboxEmail)
+                .where(
+                    OutboxEmail.status == OutboxStatus.PENDING,
+                    OutboxEmail.next_attempt_at <= now,
+                )
+                .order_by(OutboxEmail.next_attempt_at, OutboxEmail.id)
+                .limit(limit)
+            ).scalars()
+        )
+        for entry in entries:
+            entry.status = OutboxStatus.SENDING
+        db.session.commit()
+        return entries
+
+    def release_stale(self) -> int:
+        """Devolve à fila os emails ``sending`` de um worker interrompido."""
+        result = db.session.execute(
+            db.update(OutboxEmail)
+            .where(OutboxEmail.status == OutboxStatus.SENDING)
+            .values(status=OutboxStatus.PENDING)
+        )
+        db.session.commit()
+        return int(result.rowcount)  # type: ignore[attr-defined]
+
+    def count_by_status(self) -> dict[str, int]:
+        """Quantidade de emails por situação."""
+        rows = db.session.execute(
+            db.select(OutboxEmail.status, db.func.count()).group_by(OutboxEmail.status)
+        )
+        counts = dict.fromkeys(OutboxStatus, 0)
+        counts.update(dict(rows.all()))
+        return {str(status): count for status, count in counts.items()}
+
+    def commit(self) -> None:
+        """Confirma as alterações pendentes na sessão."""
+        db.session.commit()
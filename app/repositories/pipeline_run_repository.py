@@ -0,0 +1,68 @@
+"""Repositório para execuções do processamento diário."""
+
+from datetime import date
+from typing import cast
+
+from app.extensions import db
+from app.models.pipeline_run import (
+    PipelineRun,
+    PipelineRunConfig,
+    PipelineRunStage,
+    PipelineRunStageMetrics,
+)
+
+
+class PipelineRunRepository:
+    """Repositório para gerenciar a persistência de execuções e etapas."""
+
+    def save(self, run: PipelineRun) -> PipelineRun:
+        """Salva uma execução (nova ou existente)."""
+        db.session.add(run)
+        db.session.commit()
+        return run
+
+    def get_by_id(self, run_id: str) -> PipelineRun | None:
+        """Busca uma execução por ID."""
+        return db.session.get(PipelineRun, run_id)
+
+    def find_latest_by_date(self, publish_date: date) -> PipelineRun | None:
+        """Busca a execução mais recente de uma data."""
+        query = PipelineRun.query.filter(PipelineRun.publish_date == publish_date)
+        return cast(
+            "PipelineRun | None",
+            query.order_by(PipelineRun.created_at.desc()).first(),
+        )
+
+    def find_since(self, publish_date: date) -> list[PipelineRun]:
+        """Execuções com data de publicação a partir de ``publish_date``."""
+        query = PipelineRun.query.filter(PipelineRun.publish_date >= publish_date)
+        return cast(
+            "list[PipelineRun]",
+            query.order_by(PipelineRun.publish_date, PipelineRun.created_at).all(),
+        )
+
+    def get_config_entry(self, run_id: str, config_id: int) -> PipelineRunConfig | None:
+        """Busca a linha do ledger de uma configuração em uma execução."""
+        query = PipelineRunConfig.query.filter_by(run_id=run_id, config_id=config_id)
+        return cast("PipelineRunConfig | None", query.first())
+
+    def find_latest_stage(self, run_id: str, name: str) -> PipelineRunStage | None:
+        """Busca a última tentativa de uma etapa em uma execução."""
+        query = PipelineRunStage.query.filter_by(run_id=run_id, name=name)
+        return cast(
+            "PipelineRunStage | None",
+            query.order_by(PipelineRunStage.id.desc()).first(),
+        )
+
+    def add_stage_metrics(self, stage_id: int, metrics: dict[str, float]) -> None:
+        """Insere as métricas de um job em uma etapa (sem alterar a etapa)."""
+        db.session.add(PipelineRunStageMetrics(stage_id=stage_id, metrics=metrics))
+        db.session.commit()
+
+    def commit(self) -> None:
+        """Confirma as alterações pendentes na sessão."""
+        db.session.commit()
+
+    def rollback(self) -> None:
+        """Descarta as alterações pendentes na sessão."""
+        db.session.rollback()
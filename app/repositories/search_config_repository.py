@@ -1,9 +1,58 @@
 """Repositório para operações de banco de dados de SearchConfig."""
 
+import base64
+import binascii
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any, cast
 
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import selectinload
+
 from app.extensions import db
-from app.models.search_config import SearchConfig, SearchTerm
+from app.models.search_config import (
+    SearchConfig,
+    SearchConfigVersion,
+    SearchTerm,
+    bump_config_version,
+)
+from app.models.user import User
+
+# Listagens carregam os termos de todas as configs em uma consulta só
+# (SELECT ... WHERE search_config_id IN (...)), em vez de uma por config
+_WITH_TERMS = selectinload(SearchConfig.terms)
+
+
+@dataclass(frozen=True, slots=True)
+class KeysetPage:
+    """Página de uma listagem por cursor."""
+
+    items: list[SearchConfig]
+    # Cursor da próxima página (None na última)
+    next_cursor: str | None
+
+
+def encode_cursor(config: SearchConfig) -> str:
+    """Cursor opaco com a posição (created_at, id) da config na listagem."""
+    raw = json.dumps([config.created_at.isoformat(), config.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Lê a posição de um cursor de ``encode_cursor``.
+
+    Raises:
+        ValueError: Se o cursor não foi gerado por ``encode_cursor``
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, config_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(config_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError("Cursor inválido") from e
 
 
 class SearchConfigRepository:
@@ -27,11 +76,51 @@ class SearchConfigRepository:
             return None
         return config
 
+    def find_by_ids(self, config_ids: list[int]) -> list[SearchConfig]:
+        """Busca várias configs por ID, com os termos (sem filtro de dono)."""
+        if not config_ids:
+            return []
+        query = SearchConfig.query.options(_WITH_TERMS).filter(
+            SearchConfig.id.in_(config_ids)
+        )
+        return cast("list[SearchConfig]", query.all())
+
+    def find_digest_recipients(
+        self, config_ids: list[int], *, default: bool
+    ) -> dict[int, list[str]]:
+        """
+        ``mail_to`` das configs cujo dono recebe os alertas em resumo.
+
+        Args:
+            config_ids: IDs das configurações
+            default: Preferência de quem não escolheu (``NOTIFY_DIGEST``)
+
+        Returns:
+            Destinatários por ID de configuração, na ordem de ``config_ids``
+        """
+        if not config_ids:
+            return {}
+        rows = db.session.execute(
+            select(SearchConfig.id, SearchConfig.mail_to, User.notify_digest)
+            .join(User, SearchConfig.user_id == User.id)
+            .where(SearchConfig.id.in_(config_ids))
+        )
+        digest = {
+            config_id: list(mail_to)
+            for config_id, mail_to, notify_digest in rows
+            if (default if notify_digest is None else notify_digest)
+        }
+        return {
+            config_id: digest[config_id]
+            for config_id in config_ids
+            if config_id in digest
+        }
+
     def find_all(
         self, *, active_only: bool = True, user_id: int | None = None
     ) -> list[SearchConfig]:
-        """Lista configs. Se user_id informado, filtra por dono; senão lista todas."""
-        query = SearchConfig.query
+        """Lista configs com os termos. Se user_id informado, filtra por dono."""
+        query = SearchConfig.query.options(_WITH_TERMS)
         if user_id is not None:
             query = query.filter(SearchConfig.user_id == user_id)
         if active_only:
@@ -46,8 +135,8 @@ class SearchConfigRepository:
         active_only: bool = True,
         user_id: int | None = None,
     ) -> Any:
-        """Lista configs com paginação."""
-        query = SearchConfig.query
+        """Lista configs com paginação, com os termos de cada página."""
+        query = SearchConfig.query.options(_WITH_TERMS)
         if user_id is not None:
             query = query.filter(SearchConfig.user_id == user_id)
         if active_only:
@@ -56,6 +145,135 @@ class SearchConfigRepository:
             page=page, per_page=per_page, error_out=False
         )
 
+    def find_page(
+        self,
+        limit: int,
+        *,
+        cursor: str | None = None,
+        active_only: bool = True,
+        user_id: int | None = None,
+    ) -> KeysetPage:
+        """
+        Lista configs por cursor, das mais novas para as mais antigas.
+
+        Em vez de OFFSET e COUNT, filtra por (created_at, id) abaixo do
+        cursor: com os índices de listagem, o custo não depende da
+        profundidade da página nem do total de configs do usuário.
+
+        Args:
+            limit: Configs por página
+            cursor: ``next_cursor`` da página anterior (None: primeira)
+
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        position = (SearchConfig.created_at, SearchConfig.id)
+        query = select(SearchConfig).options(_WITH_TERMS)
+        if user_id is not None:
+            query = query.where(SearchConfig.user_id == user_id)
+        if active_only:
+            query = query.where(SearchConfig.active)
+        if cursor is not None:
+            query = query.where(tuple_(*position) < decode_cursor(cursor))
+        # Uma linha a mais indica se há próxima página
+        items = list(
+            db.session.scalars(
+                query.order_by(*(column.desc() for column in position)).limit(limit + 1)
+            )
+        )
+        if len(items) <= limit:
+            return KeysetPage(items, None)
+        return KeysetPage(items[:limit], encode_cursor(items[limit - 1]))
+
+    def iter_by_user(
+        self, user_id: int, *, active_only: bool = False, batch_size: int = 500
+    ) -> Iterator[SearchConfig]:
+        """
+        Percorre as configs do usuário em lotes, com os termos, por ID.
+
+        Só ``batch_size`` configs ficam carregadas por vez (exportação).
+        """
+        query = (
+            select(SearchConfig)
+            .options(_WITH_TERMS)
+            .where(SearchConfig.user_id == user_id)
+            .order_by(SearchConfig.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if active_only:
+            query = query.where(SearchConfig.active)
+        yield from db.session.scalars(query)
+
+    def bulk_create(
+        self, configs: list[dict[str, Any]], terms: list[list[dict[str, Any]]]
+    ) -> list[int]:
+        """
+        Insere várias configs e seus termos em uma transação.
+
+        Usa INSERTs em lote (sem objetos do ORM) e incrementa a versão das
+        configurações, já que o flush não vê essas linhas.
+
+        Args:
+            configs: Colunas de cada config (inclusive ``user_id``)
+            terms: Colunas dos termos de cada config, na mesma ordem
+
+        Returns:
+            IDs das configs criadas, na ordem de ``configs``
+        """
+        if not configs:
+            return []
+        try:
+            ids = list(
+                db.session.scalars(
+                    insert(SearchConfig).returning(
+                        SearchConfig.id, sort_by_parameter_order=True
+                    ),
+                    configs,
+                )
+            )
+            term_rows = [
+                {**term, "search_config_id": config_id}
+                for config_id, config_terms in zip(ids, terms, strict=True)
+                for term in config_terms
+            ]
+            if term_rows:
+                db.session.execute(insert(SearchTerm), term_rows)
+            bump_config_version(db.session.connection())
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return ids
+
+    def get_version(self) -> int:
+        """Versão atual das configurações (0 se nunca gravadas)."""
+        version = db.session.scalar(
+            select(SearchConfigVersion.version).where(SearchConfigVersion.id == 1)
+        )
+        return int(version or 0)
+
+    def active_term_rows(self) -> list[tuple[int, int, str, str | None, str | None]]:
+        """
+        Termos das configs ativas como tuplas, sem carregar objetos do ORM.
+
+        Returns:
+            ``(config_id, user_id, label, termo, sintaxe)`` em ordem de config
+            e termo; configs sem termos vêm com termo e sintaxe None
+        """
+        rows = db.session.execute(
+            select(
+                SearchConfig.id,
+                SearchConfig.user_id,
+                SearchConfig.label,
+                SearchTerm.term,
+                SearchTerm.syntax,
+            )
+            .outerjoin(SearchTerm, SearchTerm.search_config_id == SearchConfig.id)
+            .where(SearchConfig.active)
+            .order_by(SearchConfig.id, SearchTerm.id)
+        )
+        return [tuple(row) for row in rows]  # type: ignore[misc]
+
     def delete(self, config: SearchConfig) -> None:
         """Remove uma configuração do banco de dados."""
         db.session.delete(config)
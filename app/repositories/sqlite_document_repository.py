@@ -2,6 +2,7 @@
 
 import json
 import sqlite3
+from collections.abc import Iterator, Mapping
 from datetime import date
 from pathlib import Path
 from typing import Any
@@ -12,6 +13,13 @@ from app.repositories.document_interface import (
     SearchReport,
     SearchResult,
 )
+from app.search.identifiers import (
+    count_identifier_pages,
+    iter_identifier_pages,
+    parse_identifier,
+    store_page_identifiers,
+)
+from app.search.query import TermSyntax, compile_term
 
 
 class SQLiteDocumentRepository(DocumentRepository):
@@ -55,6 +63,7 @@ class SQLiteDocumentRepository(DocumentRepository):
             VALUES (?, ?, ?, ?, ?)
             """
             for p in pages:
+                date_str = p["data_publicacao"].strftime("%Y-%m-%d")
                 conn.execute(
                     query,
                     (
@@ -62,50 +71,129 @@ class SQLiteDocumentRepository(DocumentRepository):
                         p["num_pagina"],
                         p.get("descricao", ""),
                         p["conteudo"],
-                        p["data_publicacao"].strftime("%Y-%m-%d"),
+                        date_str,
                     ),
                 )
+                store_page_identifiers(conn, date_str, p["num_pagina"], p["conteudo"])
             conn.commit()
         finally:
             conn.close()
 
     def search(self, publish_date: date, terms: list[dict[str, Any]]) -> SearchReport:
         """
-        Busca termos. Espera lista de dict com 'term' e 'exact'.
+        Busca termos. Espera lista de dict com 'term', 'exact' e 'syntax'.
+        """
+        results = list(self.iter_results(publish_date, terms))
+        return SearchReport(
+            publish_date=publish_date, results=results, count=len(results)
+        )
+
+    def iter_results(
+        self, publish_date: date, terms: list[dict[str, Any]]
+    ) -> Iterator[SearchResult]:
+        """
+        Gera resultados direto do cursor. A conexão fica aberta até o gerador
+        ser esgotado ou fechado.
         """
         conn = self._get_conn()
-        results: list[SearchResult] = []
         date_str = publish_date.strftime("%Y-%m-%d")
+        query = """
+        SELECT
+            doc.num_pagina,
+            snippet(documentos_fts, 0, '<b>', '</b>', '...', 32) AS trecho
+        FROM documentos_fts doc_fts
+        INNER JOIN documentos doc ON doc_fts.rowid = doc.id
+        WHERE doc.data_publicacao = ?
+        AND documentos_fts MATCH ?
+        """
 
         try:
             for term_data in terms:
                 term = term_data["term"]
-                search_term = f'"{term}"'
-
-                query = """
-                SELECT
-                    doc.num_pagina,
-                    snippet(documentos_fts, 0, '<b>', '</b>', '...', 32) AS trecho
-                FROM documentos_fts doc_fts
-                INNER JOIN documentos doc ON doc_fts.rowid = doc.id
-                WHERE doc.data_publicacao = ?
-                AND documentos_fts MATCH ?
-                """
-
-                cursor = conn.execute(query, (date_str, search_term))
-                results.extend(
-                    SearchResult(
+                syntax = term_data.get("syntax", TermSyntax.EXACT)
+                identifier = (
+                    parse_identifier(term) if syntax == TermSyntax.EXACT else None
+                )
+                if identifier is not None:
+                    for page_num, snippet in iter_identifier_pages(
+                        conn, identifier, date_str
+                    ):
+                        yield SearchResult(
+                            page=page_num,
+                            content=snippet,
+                            term=term,
+                            page_url=self._generate_url(publish_date, page_num),
+                        )
+                    continue
+
+                search_term = compile_term(term, syntax)
+
+                for row in conn.execute(query, (date_str, search_term)):
+                    yield SearchResult(
                         page=row["num_pagina"],
                         content=row["trecho"],
                         term=term,
                         page_url=self._generate_url(publish_date, row["num_pagina"]),
                     )
-                    for row in cursor
-                )
+        finally:
+            conn.close()
 
-            return SearchReport(
-                publish_date=publish_date, results=results, count=len(results)
-            )
+    def count_matches(
+        self, publish_date: date, terms_by_key: Mapping[int, list[dict[str, Any]]]
+    ) -> dict[int, int]:
+        """
+        Conta as páginas encontradas para cada grupo de termos, sem snippets.
+
+        Usa uma única conexão e conta cada termo repetido entre grupos uma vez.
+
+        Args:
+            publish_date: Data de publicação
+            terms_by_key: Termos (dict com 'term' e 'syntax') por chave, ex.:
+                ID da configuração de busca. Com 'match' e 'identifier' (ver
+                ``CompiledTerm``), usa a expressão já compilada
+
+        Returns:
+            Total de páginas encontradas por chave
+        """
+        date_str = publish_date.strftime("%Y-%m-%d")
+        query = """
+        SELECT COUNT(*)
+        FROM documentos_fts doc_fts
+        INNER JOIN documentos doc ON doc_fts.rowid = doc.id
+        WHERE doc.data_publicacao = ?
+        AND documentos_fts MATCH ?
+        """
+
+        conn = self._get_conn()
+        cache: dict[tuple[str, str], int] = {}
+        try:
+
+            def count(spec: Mapping[str, Any]) -> int:
+                term = spec["term"]
+                syntax = spec.get("syntax", TermSyntax.EXACT)
+                if (term, syntax) not in cache:
+                    if "match" in spec:
+                        identifier, match = spec["identifier"], spec["match"]
+                    else:
+                        identifier = (
+                            parse_identifier(term)
+                            if syntax == TermSyntax.EXACT
+                            else None
+                        )
+                        match = compile_term(term, syntax)
+                    if identifier is not None:
+                        cache[term, syntax] = count_identifier_pages(
+                            conn, identifier, date_str
+                        )
+                    else:
+                        row = conn.execute(query, (date_str, match)).fetchone()
+                        cache[term, syntax] = int(row[0])
+                return cache[term, syntax]
+
+            return {
+                key: sum(count(spec) for spec in terms)
+                for key, terms in terms_by_key.items()
+            }
         finally:
             conn.close()
 
@@ -1,8 +1,20 @@
 """Schemas Pydantic para validação e tipagem de SearchConfig."""
 
 from datetime import datetime
+from typing import Self
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    HttpUrl,
+    model_validator,
+)
+
+from app.search.query import QuerySyntaxError, TermSyntax, validate_term
+
+MAX_HIGHLIGHTS_PER_TERM = 500
 
 
 class SearchTermBase(BaseModel):
@@ -13,6 +25,22 @@ class SearchTermBase(BaseModel):
         default=True,
         description="Campo legado mantido por compatibilidade; a busca é sempre exata",
     )
+    syntax: TermSyntax = Field(
+        default=TermSyntax.EXACT,
+        description=(
+            "exact: frase exata (aceita prefixo com * no fim); "
+            "query: consulta com frases, prefixos, AND, OR, NOT e NEAR/n"
+        ),
+    )
+
+    @model_validator(mode="after")
+    def validate_query(self) -> Self:
+        """Garante que o termo compila para uma expressão FTS5 (consulta/prefixo)."""
+        try:
+            validate_term(self.term, self.syntax)
+        except QuerySyntaxError as e:
+            raise ValueError(f"Consulta inválida: {e}") from e
+        return self
 
 
 class SearchConfigBase(BaseModel):
@@ -36,6 +64,15 @@ class SearchConfigBase(BaseModel):
         None, description="Webhook do MS Teams (opcional)"
     )
     active: bool = Field(default=True, description="Se a configuração está ativa")
+    max_highlights_per_term: int | None = Field(
+        default=None,
+        ge=1,
+        le=MAX_HIGHLIGHTS_PER_TERM,
+        description=(
+            "Máximo de trechos por termo no email (os mais relevantes por bm25); "
+            "o CSV continua com todos os resultados. Omitido: sem limite"
+        ),
+    )
 
 
 class SearchConfigCreate(SearchConfigBase):
@@ -55,6 +92,13 @@ class SearchConfigUpdate(BaseModel):
     mail_subject: str | None = Field(None, max_length=200)
     teams_webhook: HttpUrl | None = None
     active: bool | None = None
+    # 0 remove o limite (na criação, basta omitir); None mantém o valor atual
+    max_highlights_per_term: int | None = Field(
+        default=None,
+        ge=0,
+        le=MAX_HIGHLIGHTS_PER_TERM,
+        description="Novo limite de trechos por termo; 0 remove o limite",
+    )
     terms: list[SearchTermBase] | None = Field(None, min_length=1, max_length=5)
 
 
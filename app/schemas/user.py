@@ -0,0 +1,26 @@
+"""Schemas Pydantic para as preferências do usuário."""
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class UserPreferencesUpdate(BaseModel):
+    """Schema para atualização das preferências (campos omitidos não mudam)."""
+
+    notify_digest: bool | None = Field(
+        default=None,
+        description=(
+            "Receber os alertas em um resumo diário por destinatário; "
+            "null volta ao padrão do servidor"
+        ),
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class UserPreferencesResponse(BaseModel):
+    """Schema para resposta (leitura)."""
+
+    email: str
+    notify_digest: bool | None
+    # Preferência efetiva, com o padrão do servidor aplicado
+    digest: bool
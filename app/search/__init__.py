@@ -1,5 +1,33 @@
 """Motor de busca SQLite FTS5."""
 
-from app.search.source import Highlight, Report, SearchSource, Term, Trigger
+from app.search.identifiers import (
+    Identifier,
+    IdentifierType,
+    extract_identifiers,
+    parse_identifier,
+)
+from app.search.query import QuerySyntaxError, TermSyntax, compile_term
+from app.search.source import (
+    Highlight,
+    HighlightStream,
+    Report,
+    SearchSource,
+    Term,
+    Trigger,
+)
 
-__all__ = ["Highlight", "Report", "SearchSource", "Term", "Trigger"]
+__all__ = [
+    "Highlight",
+    "HighlightStream",
+    "Identifier",
+    "IdentifierType",
+    "QuerySyntaxError",
+    "Report",
+    "SearchSource",
+    "Term",
+    "TermSyntax",
+    "Trigger",
+    "compile_term",
+    "extract_identifiers",
+    "parse_identifier",
+]
@@ -0,0 +1,228 @@
+"""Extração e índice exato de identificadores (CNPJ, CPF, processo SEI, contrato).
+
+Esses números aparecem com pontuação diferente em cada ato (``12.345.678/0001-95``,
+``12345678000195``...) e o tokenizador do FTS5 os quebra em pedaços. Na
+importação, cada página tem seus identificadores extraídos, normalizados e
+gravados em ``identificadores`` (chave ``identifier_type, value,
+data_publicacao, num_pagina``). Termos com formato de identificador são
+respondidos por essa árvore B em vez do FTS.
+"""
+
+import re
+import sqlite3
+from collections.abc import Iterator
+from dataclasses import dataclass
+from enum import StrEnum
+
+SNIPPET_RADIUS = 120
+
+
+class IdentifierType(StrEnum):
+    """Tipos de identificador reconhecidos."""
+
+    CNPJ = "cnpj"
+    CPF = "cpf"
+    PROCESSO_SEI = "processo_sei"
+    CONTRATO = "contrato"
+
+
+@dataclass(frozen=True, slots=True)
+class Identifier:
+    """Identificador normalizado."""
+
+    identifier_type: IdentifierType
+    value: str
+
+
+_PATTERNS: dict[IdentifierType, re.Pattern[str]] = {
+    # 1500.01.0012345/2024-12
+    IdentifierType.PROCESSO_SEI: re.compile(
+        r"(?<![\d.])\d{4}\.?\d{2}\.?\d{7}/\d{4}-?\d{2}(?!\d)"
+    ),
+    # 12.345.678/0001-95
+    IdentifierType.CNPJ: re.compile(
+        r"(?<![\d.])\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}(?!\d)"
+    ),
+    # 123.456.789-09 (CPFs mascarados com * são ignorados)
+    IdentifierType.CPF: re.compile(r"(?<![\d.*])\d{3}\.?\d{3}\.?\d{3}-?\d{2}(?![\d*])"),
+    # Contrato nº 045/2024
+    IdentifierType.CONTRATO: re.compile(
+        r"\bcontrato\s+(?:n[º°o]?\.?\s*)?(\d{1,6})\s*/\s*(\d{4})\b",
+        re.IGNORECASE,
+    ),
+}
+
+
+def _digits(text: str) -> str:
+    return "".join(char for char in text if char.isdigit())
+
+
+def _check_digit(digits: str, weights: range | list[int]) -> int:
+    total = sum(
+        int(digit) * weight for digit, weight in zip(digits, weights, strict=False)
+    )
+    remainder = total % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+
+def _valid_cpf(digits: str) -> bool:
+    if len(digits) != 11 or digits == digits[0] * 11:
+        return False
+    first = _check_digit(digits[:9], range(10, 1, -1))
+    second = _check_digit(digits[:10], range(11, 1, -1))
+    return digits[-2:] == f"{first}{second}"
+
+
+def _valid_cnpj(digits: str) -> bool:
+    if len(digits) != 14 or digits == digits[0] * 14:
+        return False
+    weights = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    first = _check_digit(digits[:12], weights)
+    second = _check_digit(digits[:13], [6, *weights])
+    return digits[-2:] == f"{first}{second}"
+
+
+def _normalize(identifier_type: IdentifierType, match: re.Match[str]) -> str | None:
+    if identifier_type == IdentifierType.CONTRATO:
+        return f"{int(match.group(1))}/{match.group(2)}"
+    digits = _digits(match.group())
+    if identifier_type == IdentifierType.CNPJ:
+        return digits if _valid_cnpj(digits) else None
+    if identifier_type == IdentifierType.CPF:
+        return digits if _valid_cpf(digits) else None
+    return digits
+
+
+def _iter_matches(text: str) -> Iterator[tuple[Identifier, re.Match[str]]]:
+    for identifier_type, pattern in _PATTERNS.items():
+        for match in pattern.finditer(text):
+            value = _normalize(identifier_type, match)
+            if value is not None:
+                yield Identifier(identifier_type, value), match
+
+
+def extract_identifiers(text: str) -> set[Identifier]:
+    """
+    Extrai os identificadores normalizados de um texto.
+
+    Args:
+        text: Conteúdo de uma página
+
+    Returns:
+        Identificadores distintos encontrados
+    """
+    return {identifier for identifier, _ in _iter_matches(text)}
+
+
+def parse_identifier(term: str) -> Identifier | None:
+    """
+    Reconhece um termo de busca que é, por inteiro, um identificador.
+
+    Args:
+        term: Texto do termo
+
+    Returns:
+        Identificador normalizado, ou None se o termo deve ir para o FTS
+    """
+    text = term.strip()
+    for identifier_type, pattern in _PATTERNS.items():
+        match = pattern.fullmatch(text)
+        if match is not None:
+            value = _normalize(identifier_type, match)
+            if value is not None:
+                return Identifier(identifier_type, value)
+    return None
+
+
+def identifier_snippet(content: str, identifier: Identifier) -> str:
+    """
+    Monta um trecho da página em volta do identificador, no formato do FTS5.
+
+    Args:
+        content: Conteúdo da página
+        identifier: Identificador procurado
+
+    Returns:
+        Trecho com o identificador entre ``<b>`` e ``</b>``
+    """
+    for found, match in _iter_matches(content):
+        if found != identifier:
+            continue
+        start = max(match.start() - SNIPPET_RADIUS, 0)
+        end = min(match.end() + SNIPPET_RADIUS, len(content))
+        before = " ".join(content[start : match.start()].split())
+        after = " ".join(content[match.end() : end].split())
+        prefix = "..." if start > 0 else ""
+        suffix = "..." if end < len(content) else ""
+        return f"{prefix}{before} <b>{match.group()}</b> {after}{suffix}".strip()
+    return ""
+
+
+def store_page_identifiers(
+    conn: sqlite3.Connection, date_str: str, page_num: int, content: str
+) -> None:
+    """Substitui os identificadores gravados para uma página (sem commit)."""
+    conn.execute(
+        "DELETE FROM identificadores WHERE data_publicacao = ? AND num_pagina = ?",
+        (date_str, page_num),
+    )
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO identificadores
+        (identifier_type, value, data_publicacao, num_pagina)
+        VALUES (?, ?, ?, ?)
+        """,
+        [
+            (str(identifier.identifier_type), identifier.value, date_str, page_num)
+            for identifier in extract_identifiers(content)
+        ],
+    )
+
+
+def iter_identifier_pages(
+    conn: sqlite3.Connection,
+    identifier: Identifier,
+    date_str: str,
+    limit: int | None = None,
+) -> Iterator[tuple[int, str]]:
+    """Gera ``(num_pagina, trecho)`` das páginas de uma data com o identificador."""
+    query = """
+    SELECT doc.num_pagina, doc.conteudo
+    FROM identificadores ident
+    INNER JOIN documentos doc
+        ON doc.data_publicacao = ident.data_publicacao
+        AND doc.num_pagina = ident.num_pagina
+    WHERE ident.identifier_type = ?
+    AND ident.value = ?
+    AND ident.data_publicacao = ?
+    ORDER BY ident.num_pagina
+    """
+    params: tuple[str | int, ...] = (
+        str(identifier.identifier_type),
+        identifier.value,
+        date_str,
+    )
+    if limit is not None:
+        query += "LIMIT ?"
+        params = (*params, limit)
+
+    cursor = conn.execute(query, params)
+    try:
+        for row in cursor:
+            yield row[0], identifier_snippet(row[1], identifier)
+    finally:
+        cursor.close()
+
+
+def count_identifier_pages(
+    conn: sqlite3.Connection, identifier: Identifier, date_str: str
+) -> int:
+    """Conta as páginas de uma data que contêm o identificador."""
+    row = conn.execute(
+        """
+        SELECT COUNT(*) FROM identificadores
+        WHERE identifier_type = ? AND value = ? AND data_publicacao = ?
+        """,
+        (str(identifier.identifier_type), identifier.value, date_str),
+    ).fetchone()
+    return int(row[0])
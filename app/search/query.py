@@ -0,0 +1,264 @@
+"""Linguagem de consulta dos termos de busca compilada para FTS5 MATCH.
+
+Sintaxe aceita em termos do tipo ``query``:
+
+- palavras soltas (``licitação``) e frases entre aspas (``"pregão eletrônico"``);
+- prefixos com ``*`` no fim da palavra ou da frase (``licita*``, ``"pregão ele"*``);
+- ``AND`` (também implícito entre operandos), ``OR`` e ``NOT``;
+- ``NEAR/n`` entre palavras ou frases (``contrato NEAR/5 aditivo``);
+- parênteses para agrupar.
+
+Operadores só são reconhecidos em maiúsculas, como no FTS5. A precedência é a
+mesma do FTS5 (``NEAR`` > ``NOT`` > ``AND`` > ``OR``) e a saída é sempre
+parentizada, então o resultado não depende da precedência do SQLite.
+"""
+
+import contextlib
+import re
+from dataclasses import dataclass
+from enum import StrEnum
+
+DEFAULT_NEAR_DISTANCE = 10
+MAX_NEAR_DISTANCE = 100
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<phrase>"(?:[^"]|"")*"\*?)
+    | (?P<lparen>\()
+    | (?P<rparen>\))
+    | (?P<word>[^\s()"]+)
+    """,
+    re.VERBOSE,
+)
+_NEAR_RE = re.compile(r"NEAR(?:/(\d+))?")
+_OPERATORS = {"AND", "OR", "NOT"}
+MIN_PREFIX_LENGTH = 2
+
+
+class TermSyntax(StrEnum):
+    """Como o texto de um termo é interpretado."""
+
+    EXACT = "exact"
+    QUERY = "query"
+
+
+class QuerySyntaxError(ValueError):
+    """Erro de sintaxe na consulta de um termo."""
+
+
+@dataclass(frozen=True, slots=True)
+class _Token:
+    kind: str
+    value: str
+    near_distance: int | None = None
+    prefix: bool = False
+
+
+def quote_phrase(text: str, *, prefix: bool = False) -> str:
+    """
+    Escapa um texto como frase exata do FTS5 (aspas internas duplicadas).
+
+    Com ``prefix=True`` o último token da frase vira uma busca por prefixo
+    (``"licita"*``), atendida pelos índices ``prefix`` de ``documentos_fts``.
+    """
+    quoted = '"' + text.replace('"', '""') + '"'
+    return f"{quoted}*" if prefix else quoted
+
+
+def _split_prefix(text: str) -> tuple[str, bool]:
+    """Separa o ``*`` final de um termo e valida o tamanho do prefixo."""
+    if not text.endswith("*"):
+        if "*" in text:
+            raise QuerySyntaxError(f"'*' só é permitido no fim do termo: {text}")
+        return text, False
+    stem = text[:-1].rstrip()
+    if "*" in stem:
+        raise QuerySyntaxError(f"'*' só é permitido no fim do termo: {text}")
+    last_token = stem.rsplit(maxsplit=1)[-1] if stem else ""
+    if len(last_token) < MIN_PREFIX_LENGTH:
+        raise QuerySyntaxError(
+            f"Prefixo deve ter ao menos {MIN_PREFIX_LENGTH} caracteres: {text}"
+        )
+    return stem, True
+
+
+def _tokenize(query: str) -> list[_Token]:
+    tokens: list[_Token] = []
+    position = 0
+    while position < len(query):
+        if query[position].isspace():
+            position += 1
+            continue
+        match = _TOKEN_RE.match(query, position)
+        if match is None:
+            raise QuerySyntaxError("Aspas sem fechamento na consulta")
+        position = match.end()
+        kind = match.lastgroup or "word"
+        value = match.group()
+        if kind == "phrase":
+            prefix = value.endswith("*")
+            phrase = value[1 : -2 if prefix else -1].replace('""', '"').strip()
+            if not phrase:
+                raise QuerySyntaxError("Frase vazia na consulta")
+            if prefix:
+                phrase, prefix = _split_prefix(f"{phrase}*")
+            tokens.append(_Token("phrase", phrase, prefix=prefix))
+        elif kind == "word" and value in _OPERATORS:
+            tokens.append(_Token(value, value))
+        elif kind == "word" and (near := _NEAR_RE.fullmatch(value)):
+            distance = int(near.group(1) or DEFAULT_NEAR_DISTANCE)
+            if distance > MAX_NEAR_DISTANCE:
+                raise QuerySyntaxError(
+                    f"Distância do NEAR deve ser no máximo {MAX_NEAR_DISTANCE}"
+                )
+            tokens.append(_Token("NEAR", value, near_distance=distance))
+        elif kind == "word":
+            word, prefix = _split_prefix(value)
+            tokens.append(_Token("phrase", word, prefix=prefix))
+        else:
+            tokens.append(_Token(kind, value))
+    if not tokens:
+        raise QuerySyntaxError("Consulta vazia")
+    return tokens
+
+
+class _Parser:
+    """Parser descendente recursivo que emite a expressão FTS5 diretamente."""
+
+    def __init__(self, tokens: list[_Token]) -> None:
+        self.tokens = tokens
+        self.position = 0
+
+    def parse(self) -> str:
+        expression = self._or()
+        if self.position < len(self.tokens):
+            raise QuerySyntaxError(
+                f"Token inesperado na consulta: {self.tokens[self.position].value}"
+            )
+        return expression
+
+    def _peek(self) -> _Token | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def _take(self) -> _Token:
+        token = self._peek()
+        if token is None:
+            raise QuerySyntaxError("Consulta termina de forma inesperada")
+        self.position += 1
+        return token
+
+    def _or(self) -> str:
+        operands = [self._and()]
+        while (token := self._peek()) is not None and token.kind == "OR":
+            self._take()
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else f"({' OR '.join(operands)})"
+
+    def _and(self) -> str:
+        operands = [self._not()]
+        while (token := self._peek()) is not None and token.kind not in {
+            "OR",
+            "rparen",
+        }:
+            if token.kind == "AND":
+                self._take()
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else f"({' AND '.join(operands)})"
+
+    def _not(self) -> str:
+        expression = self._near()
+        while (token := self._peek()) is not None and token.kind == "NOT":
+            self._take()
+            expression = f"({expression} NOT {self._near()})"
+        return expression
+
+    def _near(self) -> str:
+        token = self._peek()
+        if token is None or token.kind != "phrase":
+            return self._group()
+
+        first = self._take()
+        phrases = [quote_phrase(first.value, prefix=first.prefix)]
+        distance: int | None = None
+        while (token := self._peek()) is not None and token.kind == "NEAR":
+            self._take()
+            if distance is not None and token.near_distance != distance:
+                raise QuerySyntaxError("NEAR encadeado deve usar a mesma distância")
+            distance = token.near_distance
+            operand = self._take()
+            if operand.kind != "phrase":
+                raise QuerySyntaxError("NEAR aceita apenas palavras ou frases")
+            phrases.append(quote_phrase(operand.value, prefix=operand.prefix))
+
+        if distance is None:
+            return phrases[0]
+        return f"NEAR({' '.join(phrases)}, {distance})"
+
+    def _group(self) -> str:
+        token = self._take()
+        if token.kind != "lparen":
+            raise QuerySyntaxError(f"Token inesperado na consulta: {token.value}")
+        expression = self._or()
+        if self._take().kind != "rparen":
+            raise QuerySyntaxError("Parêntese sem fechamento na consulta")
+        return expression
+
+
+def compile_query(query: str) -> str:
+    """
+    Compila uma consulta na sintaxe dos termos para uma expressão FTS5 MATCH.
+
+    Args:
+        query: Texto da consulta
+
+    Returns:
+        Expressão pronta para ``documentos_fts MATCH ?``
+
+    Raises:
+        QuerySyntaxError: Se a consulta for inválida
+    """
+    return _Parser(_tokenize(query)).parse()
+
+
+def validate_term(term: str, syntax: str = TermSyntax.EXACT) -> None:
+    """
+    Valida um termo antes de salvá-lo.
+
+    Consultas precisam compilar; termos exatos com ``*`` precisam ser um
+    prefixo válido (``*`` só no fim, com ao menos ``MIN_PREFIX_LENGTH``
+    caracteres na última palavra).
+
+    Raises:
+        QuerySyntaxError: Se o termo for inválido
+    """
+    if syntax == TermSyntax.QUERY:
+        compile_query(term)
+    elif "*" in term:
+        _split_prefix(term.strip())
+
+
+def compile_term(term: str, syntax: str = TermSyntax.EXACT) -> str:
+    """
+    Compila um termo cadastrado para a expressão FTS5 MATCH.
+
+    Termos ``exact`` viram uma única frase exata, como sempre foi; um ``*`` no
+    fim transforma a última palavra da frase em prefixo (``licita*``).
+
+    Args:
+        term: Texto do termo
+        syntax: ``exact`` ou ``query``
+
+    Returns:
+        Expressão pronta para ``documentos_fts MATCH ?``
+    """
+    if syntax == TermSyntax.QUERY:
+        return compile_query(term)
+    text = term.strip()
+    if text.endswith("*"):
+        # Termos exatos nunca falham: um "*" inválido continua sendo texto.
+        with contextlib.suppress(QuerySyntaxError):
+            stem, _ = _split_prefix(text)
+            return quote_phrase(stem, prefix=True)
+    return quote_phrase(term)
@@ -8,10 +8,14 @@ CREATE TABLE IF NOT EXISTS documentos (
 );
 CREATE UNIQUE INDEX IF NOT EXISTS idx_documentos_data_publicacao_num_pagina ON documentos(data_publicacao, num_pagina);
 
+-- prefix='2 3 4' mantém índices de prefixo para consultas como licita*.
+-- Bancos criados antes disso são migrados com SearchSource.reindex()
+-- (flask reindex-search).
 CREATE VIRTUAL TABLE IF NOT EXISTS documentos_fts USING fts5(
     conteudo,
     content='documentos',
-    content_rowid='id'
+    content_rowid='id',
+    prefix='2 3 4'
 );
 
 CREATE TRIGGER IF NOT EXISTS documentos_ai AFTER INSERT ON documentos BEGIN
@@ -29,3 +33,14 @@ CREATE TRIGGER IF NOT EXISTS documentos_au AFTER UPDATE ON documentos BEGIN
   VALUES (new.id, new.conteudo);
 END;
 
+-- Identificadores normalizados (CNPJ, CPF, processo SEI, contrato) extraídos
+-- de cada página na importação. A chave primária é a árvore B usada para
+-- responder termos com formato de identificador sem passar pelo FTS.
+CREATE TABLE IF NOT EXISTS identificadores (
+    identifier_type TEXT NOT NULL,
+    value TEXT NOT NULL,
+    data_publicacao TIMESTAMP NOT NULL,
+    num_pagina INTEGER NOT NULL,
+    PRIMARY KEY (identifier_type, value, data_publicacao, num_pagina)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_identificadores_data_publicacao_num_pagina ON identificadores(data_publicacao, num_pagina);
@@ -2,7 +2,10 @@
 
 import json
 import sqlite3
-from dataclasses import dataclass
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import date
 from enum import StrEnum
 from pathlib import Path
@@ -10,6 +13,16 @@ from types import TracebackType
 from typing import Self
 from urllib.parse import quote
 
+from app.search.identifiers import (
+    Identifier,
+    count_identifier_pages,
+    iter_identifier_pages,
+    parse_identifier,
+    store_page_identifiers,
+)
+from app.search.query import TermSyntax, compile_term
+from app.utils.metrics import FTS_QUERY_SECONDS, observe
+
 
 class Trigger(StrEnum):
     """Tipo de trigger que gerou a busca."""
@@ -24,6 +37,17 @@ class Term:
 
     term: str
     exact: bool = True
+    syntax: str = TermSyntax.EXACT
+
+    def match_expression(self) -> str:
+        """Expressão FTS5 MATCH do termo (frase exata ou consulta compilada)."""
+        return compile_term(self.term, self.syntax)
+
+    def identifier(self) -> Identifier | None:
+        """Identificador (CNPJ, CPF, processo, contrato) representado pelo termo."""
+        if self.syntax != TermSyntax.EXACT:
+            return None
+        return parse_identifier(self.term)
 
 
 @dataclass
@@ -38,13 +62,48 @@ class Highlight:
 
 @dataclass
 class Report:
-    """Relatório de busca."""
+    """Relatório de busca.
+
+    ``highlights`` pode ser uma lista materializada (``lookup``) ou um
+    ``HighlightStream`` (``stream``), que roda a consulta a cada iteração.
+
+    Com ``limit_per_term``, ``highlights`` traz só os trechos mais relevantes de
+    cada termo, ``count`` continua sendo o total exato e ``all_highlights``
+    percorre a lista completa (usada no CSV).
+    """
 
     publish_date: date
-    highlights: list[Highlight]
+    highlights: Iterable[Highlight]
     search_terms: list[Term]
     trigger: Trigger
     count: int
+    limit_per_term: int | None = None
+    term_counts: dict[str, int] = field(default_factory=dict)
+    all_highlights: Iterable[Highlight] | None = None
+
+    def query_seconds(self) -> float:
+        """Tempo gasto até agora nas consultas dos highlights lidos sob demanda."""
+        return sum(
+            highlights.query_seconds
+            for highlights in (self.highlights, self.all_highlights)
+            if isinstance(highlights, HighlightStream)
+        )
+
+    def complete_highlights(self) -> Iterable[Highlight]:
+        """Retorna todos os destaques, ignorando o limite por termo."""
+        if self.all_highlights is None:
+            return self.highlights
+        return self.all_highlights
+
+    def overflow(self) -> dict[str, int]:
+        """Quantidade de destaques omitidos por termo por causa do limite."""
+        if self.limit_per_term is None:
+            return {}
+        return {
+            term: total - self.limit_per_term
+            for term, total in self.term_counts.items()
+            if total > self.limit_per_term
+        }
 
 
 @dataclass
@@ -90,17 +149,68 @@ def pagina_url(publish_date: date, page_num: int, notebook_id: int = 326074) ->
     return base_url + encoded_payload
 
 
+FTS_PREFIX_INDEXES = "2 3 4"
+
+
+class HighlightStream:
+    """
+    Iterável sobre os highlights de uma consulta, lidos sob demanda.
+
+    Cada iteração roda a consulta (FTS, bm25 e snippets) e percorre o cursor
+    linha a linha, sem guardar as linhas: a memória não cresce com o número
+    de highlights. Quem precisa de vários formatos os monta em uma única
+    passada (ver ``render_highlights``). Um relatório sem destinatários
+    pendentes nunca executa a consulta.
+
+    O tempo gasto no cursor é somado em ``query_seconds`` e medido em
+    ``FTS_QUERY_SECONDS`` (``method="stream"``) ao fim de cada iteração.
+    """
+
+    def __init__(
+        self,
+        source: "SearchSource",
+        publish_date: date,
+        terms: list[Term],
+        limit_per_term: int | None = None,
+    ) -> None:
+        self._source = source
+        self._publish_date = publish_date
+        self._terms = terms
+        self._limit_per_term = limit_per_term
+        self.query_seconds = 0.0
+
+    def __iter__(self) -> Iterator[Highlight]:
+        rows = self._source.iter_highlights(
+            self._publish_date, self._terms, limit_per_term=self._limit_per_term
+        )
+        spent = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                highlight = next(rows, None)
+                spent += time.perf_counter() - started
+                if highlight is None:
+                    return
+                yield highlight
+        finally:
+            self.query_seconds += spent
+            FTS_QUERY_SECONDS.labels(method="stream").observe(spent)
+
+
 class SearchSource:
     """Fonte de dados para busca full-text usando SQLite FTS5."""
 
-    def __init__(self, db_path: str) -> None:
+    def __init__(self, db_path: str, *, read_only: bool = False) -> None:
         """
         Inicializa a fonte de busca.
 
         Args:
             db_path: Caminho para o arquivo SQLite
+            read_only: Abre a conexão em modo somente leitura (``mode=ro``),
+                sem criar o schema. O banco precisa existir.
         """
         self.db_path = db_path
+        self.read_only = read_only
 
         # Configurar pragmas do SQLite
         pragmas = [
@@ -111,7 +221,17 @@ class SearchSource:
         ]
 
         # Criar conexão
-        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0)
+        if read_only:
+            self.conn = sqlite3.connect(
+                f"{Path(db_path).resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                timeout=5.0,
+            )
+            # journal_mode é do arquivo e não pode ser alterado em modo ro
+            pragmas = [p for p in pragmas if p[0] != "journal_mode"]
+        else:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0)
         self.conn.row_factory = sqlite3.Row
 
         # Aplicar pragmas
@@ -119,7 +239,8 @@ class SearchSource:
             self.conn.execute(f"PRAGMA {pragma} = {value}")
 
         # Criar schema
-        self._init_schema()
+        if not read_only:
+            self._init_schema()
 
     def _init_schema(self) -> None:
         """Inicializa o schema do banco de dados."""
@@ -130,10 +251,109 @@ class SearchSource:
         self.conn.executescript(schema)
         self.conn.commit()
 
+    def has_prefix_index(self, prefix: str = FTS_PREFIX_INDEXES) -> bool:
+        """
+        Verifica se ``documentos_fts`` foi criada com os índices de prefixo.
+
+        Args:
+            prefix: Tamanhos de prefixo esperados (ex.: ``"2 3 4"``)
+
+        Returns:
+            True se a tabela FTS já usa exatamente esses índices
+        """
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'documentos_fts'"
+        ).fetchone()
+        return row is not None and f"prefix='{prefix}'" in str(row["sql"])
+
+    def reindex(self, prefix: str | None = FTS_PREFIX_INDEXES) -> None:
+        """
+        Recria ``documentos_fts`` e reconstrói o índice a partir de ``documentos``.
+
+        Usado para adicionar (ou remover, com ``prefix=None``) os índices de
+        prefixo em bancos existentes, já que o FTS5 não permite alterá-los. O
+        tempo é proporcional ao tamanho do acervo.
+
+        Args:
+            prefix: Tamanhos de prefixo separados por espaço, ou None para
+                recriar sem índices de prefixo
+
+        Raises:
+            ValueError: Se ``prefix`` não for uma lista de inteiros
+        """
+        options = ["conteudo", "content='documentos'", "content_rowid='id'"]
+        if prefix:
+            if not all(size.isdigit() for size in prefix.split()):
+                raise ValueError(f"Prefixos inválidos: {prefix!r}")
+            options.append(f"prefix='{' '.join(prefix.split())}'")
+
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.execute("DROP TABLE IF EXISTS documentos_fts")
+            self.conn.execute(
+                f"CREATE VIRTUAL TABLE documentos_fts USING fts5({', '.join(options)})"
+            )
+            self.conn.execute(
+                "INSERT INTO documentos_fts(documentos_fts) VALUES('rebuild')"
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def has_identifier_index(self) -> bool:
+        """
+        Verifica se os identificadores do acervo já foram extraídos.
+
+        Returns:
+            False se há documentos mas ``identificadores`` está vazia
+        """
+        row = self.conn.execute(
+            """
+            SELECT EXISTS(SELECT 1 FROM identificadores)
+                OR NOT EXISTS(SELECT 1 FROM documentos)
+            """
+        ).fetchone()
+        return bool(row[0])
+
+    def reindex_identifiers(self) -> int:
+        """
+        Reextrai os identificadores de todas as páginas de ``documentos``.
+
+        Necessário uma única vez em bancos importados antes da tabela
+        ``identificadores`` existir.
+
+        Returns:
+            Quantidade de páginas processadas
+        """
+        pages = 0
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.execute("DELETE FROM identificadores")
+            cursor = self.conn.execute(
+                "SELECT data_publicacao, num_pagina, conteudo FROM documentos"
+            )
+            for row in cursor:
+                store_page_identifiers(
+                    self.conn,
+                    row["data_publicacao"],
+                    row["num_pagina"],
+                    row["conteudo"],
+                )
+                pages += 1
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return pages
+
     def import_pages(self, pages: list[Pagina]) -> None:
         """
         Importa páginas para o banco de dados.
 
+        Os identificadores de cada página são extraídos e gravados na mesma
+        transação.
+
         Args:
             pages: Lista de páginas para importar
         """
@@ -146,6 +366,7 @@ class SearchSource:
         cursor = self.conn.cursor()
         try:
             for page in pages:
+                date_str = page.data_publicacao.strftime("%Y-%m-%d")
                 cursor.execute(
                     query,
                     (
@@ -153,65 +374,221 @@ class SearchSource:
                         page.num_pagina,
                         page.descricao,
                         page.conteudo,
-                        page.data_publicacao.strftime("%Y-%m-%d"),
+                        date_str,
                     ),
                 )
+                store_page_identifiers(
+                    self.conn, date_str, page.num_pagina, page.conteudo
+                )
             self.conn.commit()
         except Exception:
             self.conn.rollback()
             raise
 
-    def lookup(self, trigger: Trigger, publish_date: date, terms: list[Term]) -> Report:
+    def iter_highlights(
+        self,
+        publish_date: date,
+        terms: list[Term],
+        *,
+        limit_per_term: int | None = None,
+    ) -> Iterator[Highlight]:
         """
-        Busca termos nos documentos de uma data específica.
+        Gera os destaques dos termos em uma data, linha a linha do cursor.
 
         Args:
-            trigger: Tipo de trigger (backtest ou cron)
             publish_date: Data de publicação
             terms: Lista de termos para buscar
+            limit_per_term: Se informado, apenas os N destaques mais relevantes
+                (bm25) de cada termo, do mais para o menos relevante
 
-        Returns:
-            Relatório com os resultados da busca
+        Termos com formato de identificador são respondidos pela tabela
+        ``identificadores`` (em ordem de página) em vez do FTS.
+
+        Yields:
+            Destaques na ordem dos termos
         """
-        highlights: list[Highlight] = []
         date_str = publish_date.strftime("%Y-%m-%d")
+        query = """
+        SELECT
+            doc.num_pagina,
+            snippet(documentos_fts, 0, '<b>', '</b>', '...', 32) AS trecho
+        FROM documentos_fts doc_fts
+        INNER JOIN documentos doc ON doc_fts.rowid = doc.id
+        WHERE doc.data_publicacao = ?
+        AND documentos_fts MATCH ?
+        """
+        if limit_per_term is not None:
+            query += "ORDER BY bm25(documentos_fts) LIMIT ?"
 
         for term in terms:
-            # O sistema opera somente com busca exata.
-            search_term = f'"{term.term}"'
-
-            query = """
-            SELECT
-                doc.num_pagina,
-                snippet(documentos_fts, 0, '<b>', '</b>', '...', 32) AS trecho
-            FROM documentos_fts doc_fts
-            INNER JOIN documentos doc ON doc_fts.rowid = doc.id
-            WHERE doc.data_publicacao = ?
-            AND documentos_fts MATCH ?
-            """
-
-            cursor = self.conn.cursor()
-            cursor.execute(query, (date_str, search_term))
+            identifier = term.identifier()
+            if identifier is not None:
+                for page_num, snippet in iter_identifier_pages(
+                    self.conn, identifier, date_str, limit_per_term
+                ):
+                    yield Highlight(
+                        page=page_num,
+                        content=snippet,
+                        term=term.term,
+                        page_url=pagina_url(publish_date, page_num),
+                    )
+                continue
 
-            for row in cursor.fetchall():
-                page_num = row["num_pagina"]
-                content = row["trecho"]
+            params: tuple[str | int, ...] = (date_str, term.match_expression())
+            if limit_per_term is not None:
+                params = (*params, limit_per_term)
 
-                highlights.append(
-                    Highlight(
+            cursor = self.conn.cursor()
+            try:
+                for row in cursor.execute(query, params):
+                    page_num = row["num_pagina"]
+                    yield Highlight(
                         page=page_num,
-                        content=content,
+                        content=row["trecho"],
                         term=term.term,
                         page_url=pagina_url(publish_date, page_num),
                     )
-                )
+            finally:
+                cursor.close()
+
+    def term_counts(self, publish_date: date, terms: list[Term]) -> dict[str, int]:
+        """
+        Conta os destaques de cada termo em uma data sem gerar snippets.
+
+        Args:
+            publish_date: Data de publicação
+            terms: Lista de termos para buscar
+
+        Returns:
+            Total de páginas encontradas por termo
+        """
+        date_str = publish_date.strftime("%Y-%m-%d")
+        query = """
+        SELECT COUNT(*)
+        FROM documentos_fts doc_fts
+        INNER JOIN documentos doc ON doc_fts.rowid = doc.id
+        WHERE doc.data_publicacao = ?
+        AND documentos_fts MATCH ?
+        """
+
+        counts: dict[str, int] = {}
+        cursor = self.conn.cursor()
+        for term in terms:
+            identifier = term.identifier()
+            if identifier is not None:
+                count = count_identifier_pages(self.conn, identifier, date_str)
+            else:
+                cursor.execute(query, (date_str, term.match_expression()))
+                count = int(cursor.fetchone()[0])
+            counts[term.term] = counts.get(term.term, 0) + count
+        return counts
+
+    def count_matches(self, publish_date: date, terms: list[Term]) -> int:
+        """
+        Conta os destaques dos termos em uma data sem gerar snippets.
+
+        Args:
+            publish_date: Data de publicação
+            terms: Lista de termos para buscar
+
+        Returns:
+            Total de páginas encontradas somando todos os termos
+        """
+        return sum(self.term_counts(publish_date, terms).values())
+
+    def lookup(
+        self,
+        trigger: Trigger,
+        publish_date: date,
+        terms: list[Term],
+        *,
+        limit_per_term: int | None = None,
+    ) -> Report:
+        """
+        Busca termos nos documentos de uma data específica.
+
+        Args:
+            trigger: Tipo de trigger (backtest ou cron)
+            publish_date: Data de publicação
+            terms: Lista de termos para buscar
+            limit_per_term: Máximo de destaques por termo (os mais relevantes)
+
+        Returns:
+            Relatório com os resultados da busca
+        """
+        with observe(FTS_QUERY_SECONDS, method="lookup"):
+            highlights = list(
+                self.iter_highlights(publish_date, terms, limit_per_term=limit_per_term)
+            )
+            term_counts = (
+                self.term_counts(publish_date, terms)
+                if limit_per_term is not None
+                else None
+            )
+
+        if term_counts is None:
+            return Report(
+                publish_date=publish_date,
+                highlights=highlights,
+                search_terms=terms,
+                trigger=trigger,
+                count=len(highlights),
+            )
 
         return Report(
             publish_date=publish_date,
             highlights=highlights,
             search_terms=terms,
             trigger=trigger,
-            count=len(highlights),
+            count=sum(term_counts.values()),
+            limit_per_term=limit_per_term,
+            term_counts=term_counts,
+            all_highlights=HighlightStream(self, publish_date, terms),
+        )
+
+    def stream(
+        self,
+        trigger: Trigger,
+        publish_date: date,
+        terms: list[Term],
+        *,
+        limit_per_term: int | None = None,
+    ) -> Report:
+        """
+        Busca termos devolvendo um relatório com highlights sob demanda.
+
+        O total é obtido com ``COUNT(*)`` e os highlights só são lidos
+        quando o relatório é percorrido, direto do cursor. A conexão precisa
+        continuar aberta até lá.
+
+        Args:
+            trigger: Tipo de trigger (backtest ou cron)
+            publish_date: Data de publicação
+            terms: Lista de termos para buscar
+            limit_per_term: Máximo de destaques por termo (os mais relevantes)
+
+        Returns:
+            Relatório cujo ``highlights`` é um ``HighlightStream``
+        """
+        # Só as contagens rodam aqui; a consulta dos highlights é medida
+        # (method="stream") quando o HighlightStream é lido
+        with observe(FTS_QUERY_SECONDS, method="count"):
+            term_counts = self.term_counts(publish_date, terms)
+        return Report(
+            publish_date=publish_date,
+            highlights=HighlightStream(
+                self, publish_date, terms, limit_per_term=limit_per_term
+            ),
+            search_terms=terms,
+            trigger=trigger,
+            count=sum(term_counts.values()),
+            limit_per_term=limit_per_term,
+            term_counts=term_counts,
+            all_highlights=(
+                HighlightStream(self, publish_date, terms)
+                if limit_per_term is not None
+                else None
+            ),
         )
 
     def has_pages(self, publish_date: date) -> bool:
@@ -250,3 +627,55 @@ class SearchSource:
     ) -> None:
         """Context manager exit."""
         self.close()
+
+
+class SearchSourcePool:
+    """
+    Uma ``SearchSource`` somente leitura por thread.
+
+    Conexões SQLite não devem ser usadas por duas threads ao mesmo tempo; o
+    pool entrega a cada thread a sua, criada no primeiro uso, e fecha todas
+    no ``close``.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Inicializa o pool.
+
+        Args:
+            db_path: Caminho para o arquivo SQLite (já existente)
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._sources: list[SearchSource] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> SearchSource:
+        """Retorna a conexão da thread atual."""
+        source: SearchSource | None = getattr(self._local, "source", None)
+        if source is None:
+            source = SearchSource(self.db_path, read_only=True)
+            self._local.source = source
+            with self._lock:
+                self._sources.append(source)
+        return source
+
+    def close(self) -> None:
+        """Fecha as conexões de todas as threads."""
+        with self._lock:
+            for source in self._sources:
+                source.close()
+            self._sources.clear()
+
+    def __enter__(self) -> Self:
+        """Context manager entry."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Context manager exit."""
+        self.close()
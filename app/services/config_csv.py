@@ -0,0 +1,94 @@
+"""Formato CSV da importação/exportação em lote de configurações.
+
+Uma configuração por linha, com cabeçalho. Listas (``mail_to``, ``terms`` e
+``query_terms``) são separadas por ``;``: ``terms`` são frases exatas e
+``query_terms`` termos com a sintaxe de consulta (``app.search.query``).
+Células vazias usam o padrão do campo.
+"""
+
+import csv
+import io
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from app.models.search_config import SearchConfig
+from app.search.query import TermSyntax
+
+COLUMNS = (
+    "label",
+    "terms",
+    "query_terms",
+    "mail_to",
+    "mail_subject",
+    "teams_webhook",
+    "attach_csv",
+    "active",
+    "max_highlights_per_term",
+)
+LIST_SEPARATOR = ";"
+
+
+def _split(value: str) -> list[str]:
+    return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+
+
+def parse_rows(text: str) -> list[tuple[int, dict[str, Any]]]:
+    """
+    Lê o CSV em dados no formato de ``SearchConfigCreate``.
+
+    Returns:
+        Pares (linha no arquivo, dados); a primeira linha de dados é a 2
+    """
+    reader = csv.DictReader(io.StringIO(text.removeprefix("\ufeff")))
+    rows = []
+    for record in reader:
+        values = {
+            key.strip(): value.strip()
+            for key, value in record.items()
+            if key and isinstance(value, str) and value.strip()
+        }
+        data: dict[str, Any] = {
+            key: value for key, value in values.items() if key in COLUMNS
+        }
+        data["terms"] = [{"term": term} for term in _split(values.get("terms", ""))] + [
+            {"term": term, "syntax": TermSyntax.QUERY}
+            for term in _split(values.get("query_terms", ""))
+        ]
+        data.pop("query_terms", None)
+        if "mail_to" in values:
+            data["mail_to"] = _split(values["mail_to"])
+        rows.append((reader.line_num, data))
+    return rows
+
+
+def to_row(config: SearchConfig) -> dict[str, Any]:
+    """Linha do CSV para uma configuração (lida de volta por ``parse_rows``)."""
+    return {
+        "label": config.label,
+        "terms": LIST_SEPARATOR.join(
+            t.term for t in config.terms if t.syntax != TermSyntax.QUERY
+        ),
+        "query_terms": LIST_SEPARATOR.join(
+            t.term for t in config.terms if t.syntax == TermSyntax.QUERY
+        ),
+        "mail_to": LIST_SEPARATOR.join(config.mail_to),
+        "mail_subject": config.mail_subject,
+        "teams_webhook": config.teams_webhook or "",
+        "attach_csv": str(config.attach_csv).lower(),
+        "active": str(config.active).lower(),
+        "max_highlights_per_term": config.max_highlights_per_term or "",
+    }
+
+
+def stream(configs: Iterable[SearchConfig]) -> Iterator[str]:
+    """Gera o CSV linha a linha (cabeçalho primeiro)."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for config in configs:
+        writer.writerow(to_row(config))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
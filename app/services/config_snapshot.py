@@ -0,0 +1,142 @@
+"""Snapshot somente leitura das configurações ativas para o match."""
+
+import logging
+import threading
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from app.repositories.search_config_repository import SearchConfigRepository
+from app.search.identifiers import parse_identifier
+from app.search.query import TermSyntax, compile_term
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from app.search.identifiers import Identifier
+
+logger = logging.getLogger(__name__)
+
+# Chave do cache em ``app.extensions`` (um snapshot por app e processo)
+EXTENSION_KEY = "config_snapshot"
+
+
+class CompiledTerm:
+    """Termo com a expressão FTS5 (ou o identificador) já compilada."""
+
+    __slots__ = ("identifier", "match", "syntax", "term")
+
+    def __init__(self, term: str, syntax: str) -> None:
+        self.term = term
+        self.syntax = syntax
+        self.identifier: Identifier | None = (
+            parse_identifier(term) if syntax == TermSyntax.EXACT else None
+        )
+        # Identificadores são contados pela tabela própria, não pelo FTS
+        self.match: str | None = (
+            compile_term(term, syntax) if self.identifier is None else None
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Formato de ``DocumentRepository.count_matches``."""
+        return {
+            "term": self.term,
+            "syntax": self.syntax,
+            "identifier": self.identifier,
+            "match": self.match,
+        }
+
+
+class ConfigRecord:
+    """Configuração ativa no snapshot: só o que o match precisa."""
+
+    __slots__ = ("id", "label", "terms", "user_id")
+
+    def __init__(
+        self, config_id: int, user_id: int, label: str, terms: tuple[CompiledTerm, ...]
+    ) -> None:
+        self.id = config_id
+        self.user_id = user_id
+        self.label = label
+        self.terms = terms
+
+
+class ConfigSnapshot:
+    """Configurações ativas em uma versão, sem objetos do ORM."""
+
+    __slots__ = ("configs", "terms_by_key", "version")
+
+    def __init__(self, version: int, configs: tuple[ConfigRecord, ...]) -> None:
+        self.version = version
+        self.configs = configs
+        # Pronto para ``count_matches``; compartilhado, então somente leitura
+        self.terms_by_key: Mapping[int, list[dict[str, Any]]] = MappingProxyType(
+            {config.id: [term.as_dict() for term in config.terms] for config in configs}
+        )
+
+    @property
+    def config_ids(self) -> list[int]:
+        """IDs das configurações ativas."""
+        return [config.id for config in self.configs]
+
+    @classmethod
+    def load(cls, repository: SearchConfigRepository, version: int) -> "ConfigSnapshot":
+        """Monta o snapshot a partir das tuplas de ``active_term_rows``."""
+        configs: list[ConfigRecord] = []
+        terms: list[CompiledTerm] = []
+        current: tuple[int, int, str] | None = None
+        for config_id, user_id, label, term, syntax in repository.active_term_rows():
+            if current is None or current[0] != config_id:
+                if current is not None:
+                    configs.append(ConfigRecord(*current, tuple(terms)))
+                current, terms = (config_id, user_id, label), []
+            if term is not None:
+                terms.append(CompiledTerm(term, syntax or TermSyntax.EXACT))
+        if current is not None:
+            configs.append(ConfigRecord(*current, tuple(terms)))
+        return cls(version, tuple(configs))
+
+
+class ConfigSnapshotCache:
+    """
+    Snapshot das configurações ativas, recarregado só quando a versão muda.
+
+    Cada chamada a ``get`` lê só a versão (uma consulta de uma linha); o
+    snapshot é remontado quando alguma config ou termo foi gravado desde o
+    último carregamento (ver ``SearchConfigVersion``).
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: ConfigSnapshot | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_app(cls, app: Any) -> "ConfigSnapshotCache":
+        """Cache do app no processo atual (criado no primeiro uso)."""
+        cache = app.extensions.get(EXTENSION_KEY)
+        if cache is None:
+            cache = app.extensions.setdefault(EXTENSION_KEY, cls())
+        return cache  # type: ignore[no-any-return]
+
+    def get(self, repository: SearchConfigRepository) -> ConfigSnapshot:
+        """
+        Snapshot na versão atual.
+
+        A versão é lida antes das configs: uma gravação entre as duas
+        consultas deixa o snapshot mais novo que a versão e ele é
+        recarregado na próxima chamada, nunca o contrário.
+        """
+        version = repository.get_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = ConfigSnapshot.load(repository, version)
+                self._snapshot = snapshot
+                logger.info(
+                    "Snapshot de configs carregado: versão %d, %d configs",
+                    version,
+                    len(snapshot.configs),
+                )
+        return snapshot
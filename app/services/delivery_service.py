@@ -0,0 +1,171 @@
+"""Serviço para envios idempotentes de notificações."""
+
+import hashlib
+import json
+from datetime import date
+from typing import Any
+
+from app.mailer.mailer import Mailer
+from app.mailer.message import DeliveryError, DeliveryResult, Email
+from app.mailer.unsubscribe import normalize_email
+from app.models.notification_delivery import NotificationDelivery
+from app.models.search_config import SearchConfig
+from app.repositories.notification_delivery_repository import (
+    NotificationDeliveryRepository,
+)
+from app.search.source import Report
+from app.services.outbox_service import OutboxService
+
+
+class DeliveryService:
+    """
+    Envia notificações consultando o ledger de entregas.
+
+    Cada email entregue é registrado por (config, destinatário, data, hash do
+    conteúdo); reprocessar a mesma data envia só o que ainda não foi entregue.
+    Com uma outbox, os emails são gravados nela e o worker de envio registra
+    as entregas.
+    """
+
+    def __init__(
+        self,
+        repository: NotificationDeliveryRepository,
+        outbox: OutboxService | None = None,
+    ) -> None:
+        self.repository = repository
+        self.outbox = outbox
+
+    @classmethod
+    def for_app(cls, app: Any) -> "DeliveryService":
+        """Cria o serviço, com a outbox se ``NOTIFY_OUTBOX`` estiver ativo."""
+        outbox = OutboxService.for_app(app) if app.config.get("NOTIFY_OUTBOX") else None
+        return cls(NotificationDeliveryRepository(), outbox)
+
+    @staticmethod
+    def content_hash(config: SearchConfig, report: Report) -> str:
+        """
+        Hash do conteúdo do alerta, calculado antes de montar os emails.
+
+        Usa o que define o email (termos, totais por termo, assunto, limite e
+        anexo) sem percorrer os highlights: se o diário da data for
+        reimportado com outro conteúdo, os totais mudam e o alerta é enviado
+        de novo.
+
+        Args:
+            config: Configuração de busca
+            report: Relatório da busca para a data
+
+        Returns:
+            SHA-256 em hexadecimal
+        """
+        payload = {
+            "publish_date": report.publish_date.isoformat(),
+            "terms": [[term.term, term.syntax] for term in report.search_terms],
+            "term_counts": sorted(report.term_counts.items()),
+            "count": report.count,
+            "limit_per_term": report.limit_per_term,
+            "subject": config.mail_subject,
+            "attach_csv": config.attach_csv,
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def pending_recipients(
+        self, config: SearchConfig, publish_date: date, content_hash: str
+    ) -> list[str]:
+        """
+        Destinatários da configuração que ainda não receberam o conteúdo.
+
+        Args:
+            config: Configuração de busca
+            publish_date: Data de publicação
+            content_hash: Hash do conteúdo (``content_hash``)
+
+        Returns:
+            Destinatários pendentes, na ordem de ``config.mail_to``; endereços
+            repetidos (após ``normalize_email``) entram uma vez só
+        """
+        delivered = self.repository.find_recipients(
+            config.id, publish_date, content_hash
+        )
+        seen = set(delivered)
+        recipients = []
+        for recipient in config.mail_to or []:
+            normalized = normalize_email(recipient)
+            if normalized not in seen:
+                seen.add(normalized)
+                recipients.append(recipient)
+        return recipients
+
+    def send(
+        self,
+        mailer: Mailer,
+        config_id: int,
+        publish_date: date,
+        content_hash: str,
+        emails: list[Email],
+    ) -> list[DeliveryResult]:
+        """
+        Envia os emails em um lote, registrando cada entrega.
+
+        Um erro é propagado depois de registrar os emails que o provider
+        entregou; esses não são reenviados na próxima tentativa. Com outbox,
+        só grava os emails nela.
+
+        Args:
+            mailer: Mailer usado no envio
+            config_id: ID da configuração de busca
+            publish_date: Data de publicação
+            content_hash: Hash do conteúdo (``content_hash``)
+            emails: Emails individuais (um destinatário cada)
+
+        Returns:
+            Metadados de envio, na ordem dos emails (vazio com outbox)
+        """
+        if self.outbox is not None:
+            self.outbox.enqueue(
+                emails,
+                provider=mailer.provider_name,
+                publish_date=publish_date,
+                alerts=[(config_id, content_hash)],
+            )
+            return []
+
+        error: DeliveryError | None = None
+        try:
+            outcomes: list[DeliveryResult | BaseException] = list(mailer.send(*emails))
+        except DeliveryError as exc:
+            error = exc
+            outcomes = exc.outcomes
+
+        results: list[DeliveryResult] = []
+        for email, outcome in zip(emails, outcomes, strict=False):
+            if isinstance(outcome, BaseException):
+                continue
+            for recipient in email.to:
+                self.record(config_id, recipient, publish_date, content_hash, outcome)
+            results.append(outcome)
+
+        if error is not None:
+            raise error
+        return results
+
+    def record(
+        self,
+        config_id: int,
+        recipient: str,
+        publish_date: date,
+        content_hash: str,
+        result: DeliveryResult,
+    ) -> None:
+        """Registra a entrega de um alerta a um destinatário."""
+        self.repository.save(
+            NotificationDelivery(
+                config_id=config_id,
+                recipient=normalize_email(recipient),
+                publish_date=publish_date,
+                content_hash=content_hash,
+                provider=result.provider,
+                message_id=result.message_id,
+            )
+        )
@@ -0,0 +1,316 @@
+"""Serviço para o email de resumo diário por destinatário."""
+
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from app.mailer.mailer import Mailer
+from app.mailer.message import DeliveryResult, Email
+from app.mailer.notification import (
+    DigestSection,
+    RenderedHighlights,
+    RenderedNotification,
+    build_notification_email_context,
+    digest_email,
+    render_highlights,
+    render_notification,
+)
+from app.mailer.unsubscribe import normalize_email
+from app.models.search_config import SearchConfig
+from app.search.source import Report, SearchSource, Term, Trigger
+from app.services.delivery_service import DeliveryService
+from app.services.pipeline_metrics import StageMetrics
+from app.services.teams_service import TeamsChannel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _RenderedAlert:
+    """
+    Renderização de um alerta, compartilhada entre os destinatários.
+
+    Os trechos (e as linhas do CSV) são lidos do cursor uma vez; o email de
+    notificação simples (com o anexo) é montado no primeiro destinatário que
+    só recebe este alerta e reaproveitado pelos demais.
+    """
+
+    config: SearchConfig
+    report: Report
+    highlights: RenderedHighlights
+    _notification: RenderedNotification | None = None
+
+    def notification(self) -> RenderedNotification:
+        """Email de notificação do alerta, a personalizar por destinatário."""
+        if self._notification is None:
+            self._notification = render_notification(
+                self.report,
+                subject=self.config.mail_subject,
+                attach_csv=self.config.attach_csv,
+                alert_label=self.config.label,
+                highlights=self.highlights,
+            )
+        return self._notification
+
+
+@dataclass(frozen=True, slots=True)
+class _PendingAlert:
+    """Alerta com match ainda não entregue a um destinatário."""
+
+    rendered: _RenderedAlert
+    content_hash: str
+    recipient: str
+
+    @property
+    def config(self) -> SearchConfig:
+        """Configuração do alerta."""
+        return self.rendered.config
+
+
+def digest_batches(recipients: dict[int, list[str]], size: int) -> list[list[int]]:
+    """
+    Divide as configs do resumo em lotes de até ``size``, sem separar quem
+    compartilha destinatários.
+
+    Configs ligadas por um destinatário (direta ou indiretamente) ficam no
+    mesmo lote, para que cada pessoa receba um único resumo; um grupo maior
+    que ``size`` vira um lote só.
+
+    Args:
+        recipients: ``mail_to`` por ID de configuração
+        size: Configs por lote
+
+    Returns:
+        IDs por lote, na ordem de ``recipients``
+    """
+    parent = {config_id: config_id for config_id in recipients}
+
+    def root(config_id: int) -> int:
+        while parent[config_id] != config_id:
+            parent[config_id] = parent[parent[config_id]]
+            config_id = parent[config_id]
+        return config_id
+
+    first_config: dict[str, int] = {}
+    for config_id, mail_to in recipients.items():
+        for recipient in mail_to:
+            other = first_config.setdefault(normalize_email(recipient), config_id)
+            parent[root(config_id)] = root(other)
+
+    groups: dict[int, list[int]] = {}
+    for config_id in recipients:
+        groups.setdefault(root(config_id), []).append(config_id)
+
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    for group in groups.values():
+        if batch and len(batch) + len(group) > size:
+            batches.append(batch)
+            batch = []
+        batch.extend(group)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class DigestService:
+    """
+    Agrupa os alertas de uma data por destinatário, em um email por pessoa.
+
+    Quem está no ``mail_to`` de vários alertas recebe um único email com uma
+    seção (e um link de descadastro) por alerta; quem está em um só recebe o
+    email de notificação de sempre. As entregas passam pelo ledger de
+    ``DeliveryService``, por alerta. Tempos de busca, renderização e envio
+    são somados em ``metrics``.
+    """
+
+    def __init__(
+        self,
+        deliveries: DeliveryService,
+        mailer: Mailer,
+        *,
+        secret_key: str,
+        app_base_url: str,
+        app_env: str,
+        teams: TeamsChannel | None = None,
+        metrics: StageMetrics | None = None,
+    ) -> None:
+        self.deliveries = deliveries
+        self.mailer = mailer
+        self.teams = teams
+        self.metrics = metrics or StageMetrics()
+        self.secret_key = secret_key
+        self.app_base_url = app_base_url
+        self.app_env = app_env
+
+    @classmethod
+    def for_app(
+        cls,
+        app: Any,
+        mailer: Mailer,
+        teams: TeamsChannel | None = None,
+        *,
+        metrics: StageMetrics | None = None,
+    ) -> "DigestService":
+        """Cria o serviço com as configurações de links do app."""
+        return cls(
+            DeliveryService.for_app(app),
+            mailer,
+            secret_key=str(app.config["SECRET_KEY"]),
+            app_base_url=str(app.config.get("APP_BASE_URL", "")),
+            app_env=str(app.config.get("APP_ENV", "development")),
+            teams=teams or TeamsChannel.for_app(app),
+            metrics=metrics,
+        )
+
+    def notify(
+        self, source: SearchSource, publish_date: date, configs: list[SearchConfig]
+    ) -> dict[int, BaseException | None]:
+        """
+        Envia os resumos de uma data.
+
+        Args:
+            source: Fonte de busca, aberta até o fim do envio
+            publish_date: Data de publicação
+            configs: Configurações a notificar
+
+        Returns:
+            Erro por ID de configuração (None se não houve erro). Um erro no
+            envio de um resumo conta para todos os alertas dele; uma falha no
+            Teams, para o alerta publicado.
+        """
+        results: dict[int, BaseException | None] = {}
+        by_recipient: dict[str, list[_PendingAlert]] = {}
+
+        for config in configs:
+            results[config.id] = None
+            self.metrics.add("configs")
+            try:
+                pending = self._pending_alerts(source, publish_date, config)
+            except Exception as exc:  # noqa: BLE001 - erro devolvido ao chamador
+                results[config.id] = exc
+                continue
+            for alert in pending:
+                by_recipient.setdefault(normalize_email(alert.recipient), []).append(
+                    alert
+                )
+
+        for recipient, alerts in by_recipient.items():
+            try:
+                self._send(publish_date, alerts)
+            except Exception as exc:
+                logger.exception("Erro ao enviar resumo para %s", recipient)
+                for alert in alerts:
+                    results[alert.config.id] = exc
+
+        if self.teams is not None:
+            # Emails enviados: só agora esperar os webhooks do Teams
+            for config_id, error in self.teams.wait().items():
+                results[config_id] = results.get(config_id) or error
+
+        logger.info(
+            "Resumo de %s: %d configs, %d destinatários",
+            publish_date,
+            len(configs),
+            len(by_recipient),
+        )
+        return results
+
+    def _pending_alerts(
+        self, source: SearchSource, publish_date: date, config: SearchConfig
+    ) -> list[_PendingAlert]:
+        """Relatório da config e destinatários que ainda não o receberam."""
+        if not (config.mail_to or config.teams_webhook):
+            return []
+        with self.metrics.timer("lookup"):
+            report = source.stream(
+                Trigger.CRON,
+                publish_date,
+                [
+                    Term(term=term.term, exact=True, syntax=term.syntax)
+                    for term in config.terms
+                ],
+                limit_per_term=config.max_highlights_per_term,
+            )
+        self.metrics.add("matches", report.count)
+        if report.count == 0:
+            return []
+        content_hash = self.deliveries.content_hash(config, report)
+        recipients = self.deliveries.pending_recipients(
+            config, publish_date, content_hash
+        )
+        if self.teams is not None:
+            # O Teams é por alerta, não por destinatário
+            with self.metrics.timer("lookup"):
+                self.teams.post(config, report, publish_date, content_hash)
+        if not recipients:
+            return []
+        # Uma passada pelo cursor para todos os resumos; a leitura dos
+        # highlights conta como busca
+        with self.metrics.timer("render", inner=("lookup", report.query_seconds)):
+            rendered = _RenderedAlert(
+                config, report, render_highlights(report, csv=config.attach_csv)
+            )
+        return [
+            _PendingAlert(rendered, content_hash, recipient) for recipient in recipients
+        ]
+
+    def _send(self, publish_date: date, alerts: list[_PendingAlert]) -> None:
+        """Envia um email (resumo ou notificação simples) e registra as entregas."""
+        recipient = alerts[0].recipient
+        with self.metrics.timer("render"):
+            email = self._render(publish_date, recipient, alerts)
+        self.metrics.add("emails")
+
+        if self.deliveries.outbox is not None:
+            self.deliveries.outbox.enqueue(
+                [email],
+                provider=self.mailer.provider_name,
+                publish_date=publish_date,
+                alerts=[(alert.config.id, alert.content_hash) for alert in alerts],
+            )
+            return
+
+        with self.metrics.timer("send"):
+            result = self._deliver(email)
+        for alert in alerts:
+            self.deliveries.record(
+                alert.config.id, recipient, publish_date, alert.content_hash, result
+            )
+
+    def _render(
+        self, publish_date: date, recipient: str, alerts: list[_PendingAlert]
+    ) -> Email:
+        if len(alerts) == 1:
+            alert = alerts[0]
+            return alert.rendered.notification().personalize(
+                [recipient], self._unsubscribe_url(alert.config, recipient)
+            )
+        return digest_email(
+            [recipient],
+            [self._section(alert) for alert in alerts],
+            publish_date=publish_date,
+        )
+
+    def _section(self, alert: _PendingAlert) -> DigestSection:
+        return DigestSection(
+            label=alert.config.label,
+            report=alert.rendered.report,
+            highlights=alert.rendered.highlights,
+            unsubscribe_url=self._unsubscribe_url(alert.config, alert.recipient),
+            attach_csv=alert.config.attach_csv,
+        )
+
+    def _unsubscribe_url(self, config: SearchConfig, recipient: str) -> str:
+        return build_notification_email_context(
+            config=config,
+            recipient=recipient,
+            secret_key=self.secret_key,
+            app_base_url=self.app_base_url,
+            app_env=self.app_env,
+        ).unsubscribe_url
+
+    def _deliver(self, email: Email) -> DeliveryResult:
+        sent = self.mailer.send(email)
+        return sent[0] if sent else DeliveryResult(provider=self.mailer.provider_name)
@@ -1,7 +1,12 @@
 """Serviço para processamento do Diário Oficial."""
 
+import json
 import logging
+import shutil
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager, nullcontext
 from datetime import date
+from pathlib import Path
 from typing import Any
 
 from flask import current_app
@@ -9,52 +14,182 @@ from redis import Redis
 from rq import Queue
 
 from app.iof.common import NotFoundError
-from app.iof.v1.consulta import consulta_por_data, convert_pages
+from app.iof.v1.consulta import consulta_por_data, decode_caderno, extract_pages
+from app.models.pipeline_run import ConfigStatus, PipelineRunStage
 from app.repositories.document_interface import DocumentRepository
+from app.services.digest_service import digest_batches
+from app.services.pipeline_metrics import StageMetrics
+from app.services.pipeline_run_service import RunTracker
 from app.services.search_service import SearchService
+from app.utils.profiling import Profiler
 
 # Importar a função de notificação localmente para evitar ciclo de importação.
 # Como notify.py importa SearchService, e SearchService é usado aqui,
-# temos um potencial ciclo se importarmos notify_search_config no topo.
+# temos um potencial ciclo se importarmos notify_search_configs no topo.
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_NOTIFY_CHUNK_SIZE = 50
+
+# Artefatos de uma execução, para retomar sem baixar/extrair de novo
+CADERNO_ARTIFACT = "caderno.b64"
+PAGES_ARTIFACT = "paginas.json"
+
+# Notifica configs de uma data e gera (config_id, erro) conforme terminam,
+# somando tempos (lookup, render, send) e contadores nas métricas da etapa
+Notifier = Callable[
+    [date, list[int], StageMetrics], Iterable[tuple[int, BaseException | None]]
+]
+
+
+class NotificationError(Exception):
+    """Uma ou mais configurações falharam na etapa de notificação."""
+
 
 class GazetteService:
-    """Serviço de domínio para orquestrar o processamento do diário."""
+    """
+    Serviço de domínio para orquestrar o processamento do diário.
+
+    O processamento é dividido em etapas (fetch, extract, index, match e
+    notify). Com um ``RunTracker``, cada etapa concluída fica registrada na
+    execução, com suas métricas (bytes, páginas, matches, emails e tempos
+    das subetapas), e seus artefatos em ``artifacts_dir/<run_id>``: uma
+    nova tentativa da mesma execução pula o que já foi feito e notifica só
+    as configurações pendentes.
+    """
 
     def __init__(
         self,
         doc_repository: DocumentRepository,
         search_service: SearchService,
         queue_connection: Any | None = None,
+        notify_chunk_size: int | None = None,
+        *,
+        artifacts_dir: Path | None = None,
+        notifier: Notifier | None = None,
     ) -> None:
         self.doc_repo = doc_repository
         self.search_service = search_service
         self.queue_connection = queue_connection
+        self.notify_chunk_size = notify_chunk_size
+        self.artifacts_dir = artifacts_dir
+        # Sem notifier, as notificações são enfileiradas no RQ
+        self.notifier = notifier
 
-    def process_date(self, publish_date: date) -> None:
+    def process_date(
+        self, publish_date: date, tracker: RunTracker | None = None
+    ) -> None:
         """
         Baixa, processa e indexa o diário de uma data.
 
-        1. Consulta API IOF
-        2. Extrai texto do PDF
-        3. Salva no Repositório de Documentos
-        4. Enfileira notificações
+        1. Consulta API IOF (fetch)
+        2. Extrai texto do PDF (extract)
+        3. Salva no Repositório de Documentos (index)
+        4. Conta os matches de cada configuração ativa (match)
+        5. Notifica as configurações com match (notify)
+
+        Args:
+            publish_date: Data de publicação do diário
+            tracker: Registro da execução, para gravar e retomar as etapas
+
+        Raises:
+            NotificationError: Se alguma configuração falhar ao notificar
         """
         logger.info("Iniciando processamento para %s", publish_date)
+        if tracker and tracker.run.checkpoint:
+            logger.info(
+                "Retomando execução %s após a etapa %s",
+                tracker.run_id,
+                tracker.run.checkpoint,
+            )
 
         try:
-            # 1. Consultar API
-            try:
-                response = consulta_por_data(publish_date)
-            except NotFoundError:
-                logger.info("Nenhum diário encontrado para %s", publish_date)
+            # Com PROFILE_TRACEMALLOC, grava o pico de memória da ingestão
+            with Profiler.for_app(current_app).memory(f"ingest-{publish_date}"):
+                indexed = self._ingest(publish_date, tracker)
+            if not indexed:
                 return
 
-            # 2. Extrair Texto (Isso poderia ser um serviço separado PDFService)
-            arquivo_b64 = response.dados.arquivo_caderno_principal.arquivo
-            paginas_iof = convert_pages(arquivo_b64, publish_date)
+            config_ids = self._match(publish_date, tracker)
+            self._notify(publish_date, config_ids, tracker)
+
+        except Exception:
+            logger.exception("Erro ao processar diário %s", publish_date)
+            raise
+
+        self._discard_artifacts(tracker)
+
+    def _ingest(self, publish_date: date, tracker: RunTracker | None) -> bool:
+        """
+        Baixa, extrai e indexa o diário (etapas fetch, extract e index).
+
+        Uma execução retomada depois da indexação (ex.: um job de notificação
+        falhou) não baixa nem extrai de novo: as páginas já estão no índice
+        e os artefatos já podem ter sido removidos.
+
+        Returns:
+            False se não há diário na data
+        """
+        if tracker and tracker.completed("index"):
+            return True
+
+        pages_data = self._extract(publish_date, tracker)
+        if pages_data is None:
+            return False
+
+        with _stage(tracker, "index") as stage:
+            logger.info("Importando %d páginas...", len(pages_data))
+            self.doc_repo.save_pages(pages_data)
+            if tracker and stage:
+                tracker.progress(stage, len(pages_data), len(pages_data))
+                tracker.record_metrics(stage, {"pages": len(pages_data)})
+        return True
+
+    def _extract(
+        self, publish_date: date, tracker: RunTracker | None
+    ) -> list[dict[str, Any]] | None:
+        """Etapas fetch e extract. None se não há diário na data."""
+        artifacts = self._artifacts(tracker)
+        pages_path = artifacts / PAGES_ARTIFACT if artifacts else None
+        if tracker and tracker.completed("extract") and pages_path:
+            if pages_path.exists():
+                return _load_pages(pages_path)
+            logger.warning("Artefato %s não encontrado, extraindo de novo", pages_path)
+
+        caderno_path = artifacts / CADERNO_ARTIFACT if artifacts else None
+        arquivo_b64: str | None = None
+        if (
+            tracker
+            and tracker.completed("fetch")
+            and caderno_path
+            and caderno_path.exists()
+        ):
+            arquivo_b64 = caderno_path.read_text(encoding="utf-8")
+
+        if arquivo_b64 is None:
+            # 1. Consultar API
+            with _stage(tracker, "fetch") as stage:
+                try:
+                    response = consulta_por_data(publish_date)
+                except NotFoundError:
+                    logger.info("Nenhum diário encontrado para %s", publish_date)
+                    if stage:
+                        stage.detail = "Nenhum diário encontrado"
+                    return None
+                arquivo_b64 = response.dados.arquivo_caderno_principal.arquivo
+                if caderno_path:
+                    _write_artifact(caderno_path, arquivo_b64)
+                if tracker and stage:
+                    tracker.record_metrics(stage, {"bytes": len(arquivo_b64)})
+
+        # 2. Extrair Texto (Isso poderia ser um serviço separado PDFService)
+        with _stage(tracker, "extract") as stage:
+            metrics = StageMetrics()
+            with metrics.timer("decode"):
+                pdf_bytes = decode_caderno(arquivo_b64)
+            with metrics.timer("extract"):
+                paginas_iof = extract_pages(pdf_bytes, publish_date)
+            metrics.add("bytes", len(pdf_bytes))
 
             # Converter para formato do repositório (dict)
             pages_data = [
@@ -67,28 +202,143 @@ class GazetteService:
                 }
                 for p in paginas_iof
             ]
+            if pages_path:
+                _dump_pages(pages_path, pages_data)
+            metrics.add("pages", len(pages_data))
+            if tracker and stage:
+                tracker.progress(stage, len(pages_data), len(pages_data))
+                tracker.record_metrics(stage, metrics.as_dict())
+        return pages_data
 
-            # 3. Salvar
-            logger.info("Importando %d páginas...", len(pages_data))
-            self.doc_repo.save_pages(pages_data)
+    def _match(self, publish_date: date, tracker: RunTracker | None) -> list[int]:
+        """Etapa match: IDs das configurações ativas com match na data."""
+        if tracker and tracker.completed("match"):
+            return tracker.pending_configs()
 
-            # 4. Notificar
-            self._enqueue_notifications(publish_date)
+        with _stage(tracker, "match") as stage:
+            snapshot = self.search_service.active_snapshot()
+            configs = snapshot.configs
+            logger.info(
+                "Encontradas %d configurações ativas (versão %d)",
+                len(configs),
+                snapshot.version,
+            )
+            counts = self.doc_repo.count_matches(publish_date, snapshot.terms_by_key)
+            config_ids = [config_id for config_id, n in counts.items() if n > 0]
+            if tracker and stage:
+                tracker.record_matches(counts)
+                tracker.progress(
+                    stage, len(configs), len(configs), f"{len(config_ids)} com match"
+                )
+                tracker.record_metrics(
+                    stage,
+                    {
+                        "configs": len(configs),
+                        "configs_matched": len(config_ids),
+                        "matches": sum(counts.values()),
+                    },
+                )
+        return config_ids
 
-        except Exception:
-            logger.exception("Erro ao processar diário %s", publish_date)
-            raise
+    def _notify(
+        self, publish_date: date, config_ids: list[int], tracker: RunTracker | None
+    ) -> None:
+        """Etapa notify: notifica ou enfileira as configurações com match."""
+        with _stage(tracker, "notify") as stage:
+            if not config_ids:
+                return
+            if self.notifier is None:
+                # Os jobs somam lookup/render/send nesta etapa ao terminar
+                self._enqueue_notifications(
+                    publish_date, config_ids, tracker.run_id if tracker else None
+                )
+                if tracker:
+                    tracker.mark_configs(config_ids, ConfigStatus.QUEUED)
+                return
+
+            metrics = StageMetrics()
+            done: set[int] = set()
+            failed: set[int] = set()
+            # Uma config pode voltar com erro depois de concluída (o webhook do
+            # Teams é esperado só no fim); o último resultado vale
+            for config_id, error in self.notifier(publish_date, config_ids, metrics):
+                done.add(config_id)
+                if error is None:
+                    logger.info("Notificação processada para config %d", config_id)
+                else:
+                    # Continuar com outras configurações mesmo se uma falhar
+                    failed.add(config_id)
+                    logger.error(
+                        "Erro ao processar notificação para config %d",
+                        config_id,
+                        exc_info=error,
+                    )
+                if tracker and stage:
+                    tracker.mark_configs(
+                        [config_id],
+                        ConfigStatus.FAILED if error else ConfigStatus.NOTIFIED,
+                        str(error) if error else None,
+                    )
+                    tracker.progress(
+                        stage,
+                        len(done),
+                        len(config_ids),
+                        f"{len(failed)} com erro" if failed else None,
+                    )
+
+            if tracker and stage:
+                tracker.record_metrics(stage, metrics.as_dict())
+
+            if failed:
+                # Falhar a etapa: uma nova tentativa notifica só essas configs
+                raise NotificationError(
+                    f"{len(failed)} de {len(config_ids)} configurações com erro"
+                )
+
+    def _artifacts(self, tracker: RunTracker | None) -> Path | None:
+        """Diretório dos artefatos da execução, se houver."""
+        if tracker is None or self.artifacts_dir is None:
+            return None
+        path = self.artifacts_dir / tracker.run_id
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _discard_artifacts(self, tracker: RunTracker | None) -> None:
+        """Remove os artefatos de uma execução concluída."""
+        if tracker is None or self.artifacts_dir is None:
+            return
+        shutil.rmtree(self.artifacts_dir / tracker.run_id, ignore_errors=True)
+
+    def _enqueue_notifications(
+        self,
+        publish_date: date,
+        config_ids: list[int] | None = None,
+        run_id: str | None = None,
+    ) -> None:
+        """
+        Enfileira jobs de notificação em lotes de configs.
+
+        As configs de donos que preferem o resumo diário vão para jobs de
+        resumo, em lotes que não separam destinatários em comum; as demais,
+        para jobs de notificação por config.
 
-    def _enqueue_notifications(self, publish_date: date) -> None:
-        """Enfileira jobs de notificação para todas as configs ativas."""
-        configs = self.search_service.list_configs(active_only=True)
-        logger.info("Encontradas %d configurações ativas", len(configs))
+        Args:
+            publish_date: Data de publicação do diário
+            config_ids: IDs das configurações; sem eles, todas as ativas
+            run_id: Execução cujo ledger os jobs atualizam
+        """
+        if config_ids is None:
+            config_ids = self.search_service.active_snapshot().config_ids
+            logger.info("Encontradas %d configurações ativas", len(config_ids))
 
-        if not configs:
+        if not config_ids:
             return
 
         # Importar aqui para evitar ciclo se não for injetado
-        from app.tasks.notify import notify_search_config  # noqa: PLC0415
+        from app.tasks.notify import (  # noqa: PLC0415
+            notify_digest,
+            notify_search_configs,
+        )
 
         conn = self.queue_connection
         if not conn:
@@ -99,11 +349,65 @@ class GazetteService:
 
         queue = Queue("default", connection=conn)
 
-        for config in configs:
+        chunk_size = max(self.notify_chunk_size or self._configured_chunk_size(), 1)
+        digest = self.search_service.digest_recipients(
+            config_ids, default=bool(current_app.config.get("NOTIFY_DIGEST"))
+        )
+        # O resumo agrupa por destinatário: configs com destinatários em comum
+        # ficam no mesmo job
+        for chunk in digest_batches(digest, chunk_size):
+            queue.enqueue(
+                notify_digest,
+                publish_date.isoformat(),
+                chunk,
+                run_id=run_id,
+                job_timeout="30m",
+            )
+            logger.info("Job de resumo enfileirado para %d configs", len(chunk))
+
+        config_ids = [config_id for config_id in config_ids if config_id not in digest]
+        for start in range(0, len(config_ids), chunk_size):
+            chunk = config_ids[start : start + chunk_size]
             queue.enqueue(
-                notify_search_config,
+                notify_search_configs,
                 publish_date.isoformat(),
-                config.id,
-                job_timeout="10m",
+                chunk,
+                run_id=run_id,
+                job_timeout="30m",
             )
-            logger.info("Job enfileirado para config %s", config.id)
+            logger.info("Job enfileirado para %d configs: %s", len(chunk), chunk)
+
+    @staticmethod
+    def _configured_chunk_size() -> int:
+        return int(
+            current_app.config.get("NOTIFY_CHUNK_SIZE", DEFAULT_NOTIFY_CHUNK_SIZE)
+        )
+
+
+def _stage(
+    tracker: RunTracker | None, name: str
+) -> AbstractContextManager[PipelineRunStage | None]:
+    return tracker.stage(name) if tracker else nullcontext()
+
+
+def _dump_pages(path: Path, pages: list[dict[str, Any]]) -> None:
+    data = [
+        {**page, "data_publicacao": page["data_publicacao"].isoformat()}
+        for page in pages
+    ]
+    _write_artifact(path, json.dumps(data, ensure_ascii=False))
+
+
+def _write_artifact(path: Path, content: str) -> None:
+    # Gravar em arquivo temporário: um artefato pela metade não é retomado
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def _load_pages(path: Path) -> list[dict[str, Any]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [
+        {**page, "data_publicacao": date.fromisoformat(page["data_publicacao"])}
+        for page in data
+    ]
@@ -0,0 +1,154 @@
+"""Serviço para notificar uma configuração de busca (um email por destinatário)."""
+
+import logging
+from datetime import date
+from typing import Any
+
+from app.mailer.mailer import Mailer
+from app.mailer.notification import build_notification_emails
+from app.models.search_config import SearchConfig
+from app.search.source import SearchSource, Term, Trigger
+from app.services.delivery_service import DeliveryService
+from app.services.pipeline_metrics import StageMetrics
+from app.services.teams_service import TeamsChannel
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationService:
+    """
+    Busca os termos de uma configuração e entrega o alerta.
+
+    Publica o card no Teams (em segundo plano) e envia os emails só aos
+    destinatários que ainda não receberam o conteúdo (ledger de
+    ``DeliveryService``), ou os grava na outbox. Usado pelos jobs do RQ e
+    pelo processamento síncrono. Tempos de busca, renderização e envio são
+    somados em ``metrics``.
+    """
+
+    def __init__(
+        self,
+        deliveries: DeliveryService,
+        mailer: Mailer,
+        teams: TeamsChannel,
+        *,
+        secret_key: str,
+        app_base_url: str,
+        app_env: str,
+        metrics: StageMetrics | None = None,
+    ) -> None:
+        self.deliveries = deliveries
+        self.mailer = mailer
+        self.teams = teams
+        self.metrics = metrics or StageMetrics()
+        self.secret_key = secret_key
+        self.app_base_url = app_base_url
+        self.app_env = app_env
+
+    @classmethod
+    def for_app(
+        cls,
+        app: Any,
+        mailer: Mailer,
+        teams: TeamsChannel,
+        *,
+        metrics: StageMetrics | None = None,
+    ) -> "NotificationService":
+        """Cria o serviço com as configurações de links e a outbox do app."""
+        return cls(
+            DeliveryService.for_app(app),
+            mailer,
+            teams,
+            secret_key=str(app.config["SECRET_KEY"]),
+            app_base_url=str(app.config.get("APP_BASE_URL", "")),
+            app_env=str(app.config.get("APP_ENV", "development")),
+            metrics=metrics,
+        )
+
+    def notify_config(
+        self, source: SearchSource, publish_date: date, config: SearchConfig
+    ) -> bool:
+        """
+        Notifica uma configuração.
+
+        Um erro de envio é propagado (depois de registrar o que foi entregue):
+        a config fica pendente no ledger da execução para a próxima tentativa.
+
+        Args:
+            source: Fonte de busca, aberta até o fim do envio
+            publish_date: Data de publicação
+            config: Configuração de busca
+
+        Returns:
+            True se algum alerta foi enviado (ou enfileirado) agora
+        """
+        metrics = self.metrics
+        metrics.add("configs")
+        search_terms = [
+            Term(term=term.term, exact=True, syntax=term.syntax)
+            for term in config.terms
+        ]
+
+        # Gerar relatório (highlights lidos do cursor sob demanda)
+        with metrics.timer("lookup"):
+            report = source.stream(
+                Trigger.CRON,
+                publish_date,
+                search_terms,
+                limit_per_term=config.max_highlights_per_term,
+            )
+        metrics.add("matches", report.count)
+
+        if report.count == 0:
+            logger.info("Nenhum match encontrado para config %s", config.id)
+            return False
+
+        content_hash = self.deliveries.content_hash(config, report)
+        # Pular destinatários que já receberam este conteúdo (reprocessamento)
+        recipients = self.deliveries.pending_recipients(
+            config, publish_date, content_hash
+        )
+
+        # O card é montado aqui (os primeiros trechos, em um cursor próprio) e
+        # publicado em segundo plano, junto com os emails
+        with metrics.timer("lookup"):
+            posted = self.teams.post(config, report, publish_date, content_hash)
+
+        if not recipients:
+            if config.mail_to:
+                logger.info("Notificação já entregue para config %s", config.id)
+            return posted
+
+        # Os highlights são lidos do cursor durante a renderização (uma
+        # passada); esse tempo conta como busca
+        with metrics.timer("render", inner=("lookup", report.query_seconds)):
+            emails = build_notification_emails(
+                config=config,
+                report=report,
+                secret_key=self.secret_key,
+                app_base_url=self.app_base_url,
+                app_env=self.app_env,
+                recipients=recipients,
+            )
+        with metrics.timer("send"):
+            results = self.deliveries.send(
+                self.mailer, config.id, publish_date, content_hash, emails
+            )
+        metrics.add("emails", len(emails))
+
+        csv_info = " com CSV anexado" if config.attach_csv else ""
+        message_id = results[0].message_id if results else None
+        action = (
+            "enfileirado na outbox"
+            if self.deliveries.outbox
+            else f"enviado via {self.mailer.provider_name}"
+        )
+        logger.info(
+            "Email %s para %s (config %s)%s%s",
+            action,
+            recipients,
+            config.id,
+            csv_info,
+            f" [message_id={message_id}]" if message_id else "",
+        )
+        return True
@@ -0,0 +1,414 @@
+"""Serviço da outbox: emails persistidos e enviados por um worker dedicado."""
+
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from app.mailer.mailer import Mailer
+from app.mailer.message import Attachment, DeliveryError, DeliveryResult, Email
+from app.mailer.unsubscribe import normalize_email
+from app.models.notification_delivery import NotificationDelivery
+from app.models.outbox_email import OutboxEmail, OutboxStatus
+from app.models.search_config import get_now_utc
+from app.repositories.notification_delivery_repository import (
+    NotificationDeliveryRepository,
+)
+from app.repositories.outbox_repository import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_BACKOFF_SECONDS = 30.0
+DEFAULT_BACKOFF_MAX_SECONDS = 3600.0
+DEFAULT_RATE_PER_SECOND = 5.0
+
+
+class TokenBucket:
+    """
+    Limite de taxa por token bucket.
+
+    Os tokens se acumulam a ``rate`` por segundo até ``capacity`` (a maior
+    rajada permitida); cada email enviado consome um token.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate deve ser positivo e capacity pelo menos 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Consome tokens, esperando até que estejam disponíveis.
+
+        Args:
+            tokens: Quantidade (limitada a ``capacity``)
+
+        Returns:
+            Segundos de espera
+        """
+        tokens = min(tokens, int(self.capacity))
+        waited = 0.0
+        while True:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return waited
+            delay = (tokens - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class ProviderBuckets:
+    """
+    Um token bucket por provider, criado no primeiro uso.
+
+    Cada email da outbox guarda o provider configurado ao enfileirar; o
+    worker consome tokens do bucket desse provider, com a taxa de
+    ``rates[provider]`` (ou ``default_rate``).
+    """
+
+    def __init__(
+        self,
+        rates: Mapping[str, float],
+        capacity: float,
+        *,
+        default_rate: float = DEFAULT_RATE_PER_SECOND,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rates = dict(rates)
+        self.capacity = max(capacity, 1)
+        self.default_rate = default_rate
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def get(self, provider: str) -> TokenBucket:
+        """Bucket do provider."""
+        bucket = self._buckets.get(provider)
+        if bucket is None:
+            rate = float(self.rates.get(provider, self.default_rate))
+            bucket = TokenBucket(
+                rate, self.capacity, clock=self._clock, sleep=self._sleep
+            )
+            self._buckets[provider] = bucket
+        return bucket
+
+    def acquire(self, providers: Iterable[str]) -> float:
+        """
+        Consome um token por email no bucket do provider de cada um.
+
+        Args:
+            providers: Provider de cada email
+
+        Returns:
+            Segundos de espera
+        """
+        return sum(
+            self.get(provider).acquire(count)
+            for provider, count in Counter(providers).items()
+        )
+
+
+@dataclass
+class DrainResult:
+    """Resultado de um lote do worker de envio."""
+
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+class OutboxService:
+    """
+    Enfileira emails montados e os envia em lotes.
+
+    A busca chama ``enqueue`` e segue sem depender do provider; o worker de
+    envio chama ``drain`` em laço. Um email que falha volta para a fila com
+    espera exponencial (``backoff``) e, depois de ``max_attempts``
+    tentativas, fica como ``failed``. Cada email enviado é registrado no
+    ledger de entregas para os alertas que ele carrega.
+    """
+
+    def __init__(
+        self,
+        repository: OutboxRepository,
+        deliveries: NotificationDeliveryRepository,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+        backoff_max_seconds: float = DEFAULT_BACKOFF_MAX_SECONDS,
+    ) -> None:
+        self.repository = repository
+        self.deliveries = deliveries
+        self.batch_size = max(batch_size, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+    @classmethod
+    def for_app(cls, app: Any) -> "OutboxService":
+        """Cria o serviço com os limites configurados no app."""
+        return cls(
+            OutboxRepository(),
+            NotificationDeliveryRepository(),
+            batch_size=int(app.config.get("OUTBOX_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+            max_attempts=int(
+                app.config.get("OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+            ),
+            backoff_seconds=float(
+                app.config.get("OUTBOX_BACKOFF_SECONDS", DEFAULT_BACKOFF_SECONDS)
+            ),
+            backoff_max_seconds=float(
+                app.config.get(
+                    "OUTBOX_BACKOFF_MAX_SECONDS", DEFAULT_BACKOFF_MAX_SECONDS
+                )
+            ),
+        )
+
+    def enqueue(
+        self,
+        emails: Iterable[Email],
+        *,
+        provider: str,
+        publish_date: date,
+        alerts: list[tuple[int, str]],
+    ) -> int:
+        """
+        Grava emails na outbox.
+
+        Um email igual (mesmos alertas e destinatário) ainda pendente ou já
+        enviado não é gravado de novo; um que falhou de vez volta à fila. O
+        conteúdo dos anexos é gravado uma vez (pelo digest), não em cada
+        email: os destinatários de um alerta recebem o mesmo CSV.
+
+        Args:
+            emails: Emails individuais (um destinatário cada)
+            provider: Provider que fará o envio
+            publish_date: Data de publicação
+            alerts: ``(config_id, content_hash)`` de cada alerta dos emails
+
+        Returns:
+            Quantidade de emails enfileirados
+        """
+        alerts_json = json.dumps(sorted(alerts))
+        stored: set[str] = set()
+        queued = 0
+        for email in emails:
+            dedupe_key = _dedupe_key(publish_date, alerts_json, email.to)
+            entry = self.repository.get_by_dedupe_key(dedupe_key)
+            if entry is not None and entry.status != OutboxStatus.FAILED:
+                continue
+            if entry is None:
+                entry = OutboxEmail(dedupe_key=dedupe_key)
+                self.repository.add(entry)
+            entry.status = OutboxStatus.PENDING
+            entry.provider = provider
+            entry.publish_date = publish_date
+            entry.alerts = alerts_json
+            entry.payload = _dump_email(email)
+            for attachment in email.attachments or []:
+                digest = _digest(attachment.content)
+                if digest not in stored:
+                    self.repository.save_attachment(digest, attachment.content)
+                    stored.add(digest)
+            entry.attempts = 0
+            entry.next_attempt_at = get_now_utc()
+            entry.last_error = None
+            queued += 1
+        self.repository.commit()
+        return queued
+
+    def drain(
+        self, mailer: Mailer, buckets: ProviderBuckets, now: datetime | None = None
+    ) -> DrainResult:
+        """
+        Envia um lote de emails vencidos.
+
+        Args:
+            mailer: Mailer usado no envio
+            buckets: Limites de taxa, aplicados pelo provider de cada email
+            now: Instante atual (padrão: agora, em UTC)
+
+        Returns:
+            Contagem do lote; ``claimed`` 0 indica outbox sem emails vencidos
+        """
+        now = now or get_now_utc()
+        limit = min(self.batch_size, int(buckets.capacity))
+        entries = self.repository.claim_due(now, limit)
+        if not entries:
+            return DrainResult()
+
+        buckets.acquire(entry.provider for entry in entries)
+        payloads = [json.loads(entry.payload) for entry in entries]
+        contents = self.repository.find_attachments(
+            {
+                item["digest"]
+                for payload in payloads
+                for item in payload["attachments"]
+                if "digest" in item
+            }
+        )
+        emails = [_load_email(payload, contents) for payload in payloads]
+        try:
+            outcomes: list[DeliveryResult | BaseException] = list(mailer.send(*emails))
+        except DeliveryError as exc:
+            outcomes = exc.outcomes
+        except Exception as exc:  # noqa: BLE001 - o lote volta para a fila
+            outcomes = [exc for _ in emails]
+
+        result = DrainResult(claimed=len(entries))
+        for entry, email, outcome in zip(entries, emails, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                self._retry(entry, outcome, now, result)
+            else:
+                self._delivered(entry, email, outcome, now)
+                result.sent += 1
+        self.repository.commit()
+        return result
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Espera antes da próxima tentativa, dobrando a cada falha."""
+        seconds = self.backoff_seconds * 2 ** max(attempts - 1, 0)
+        return timedelta(seconds=min(seconds, self.backoff_max_seconds))
+
+    def release_stale(self) -> int:
+        """Devolve à fila os emails que um worker interrompido deixou em envio."""
+        return self.repository.release_stale()
+
+    def _retry(
+        self,
+        entry: OutboxEmail,
+        error: BaseException,
+        now: datetime,
+        result: DrainResult,
+    ) -> None:
+        entry.attempts += 1
+        entry.last_error = str(error)
+        if entry.attempts >= self.max_attempts:
+            entry.status = OutboxStatus.FAILED
+            result.failed += 1
+            logger.error(
+                "Email %d da outbox falhou após %d tentativas: %s",
+                entry.id,
+                entry.attempts,
+                error,
+            )
+            return
+        entry.status = OutboxStatus.PENDING
+        entry.next_attempt_at = now + self.backoff(entry.attempts)
+        result.retried += 1
+        logger.warning(
+            "Email %d da outbox falhou (tentativa %d), nova tentativa em %s: %s",
+            entry.id,
+            entry.attempts,
+            entry.next_attempt_at,
+            error,
+        )
+
+    def _delivered(
+        self,
+        entry: OutboxEmail,
+        email: Email,
+        outcome: DeliveryResult,
+        now: datetime,
+    ) -> None:
+        entry.status = OutboxStatus.SENT
+        entry.attempts += 1
+        entry.sent_at = now
+        entry.message_id = outcome.message_id
+        entry.last_error = None
+        # Na mesma transação do status: um commit aqui, antes do fim do lote,
+        # deixaria emails já enviados como ``sending`` se algo falhasse depois.
+        # Uma entrega já registrada (ex.: envio direto anterior) conta como feita.
+        for config_id, content_hash in json.loads(entry.alerts):
+            for recipient in email.to:
+                self.deliveries.add_new(
+                    NotificationDelivery(
+                        config_id=config_id,
+                        recipient=normalize_email(recipient),
+                        publish_date=entry.publish_date,
+                        content_hash=content_hash,
+                        provider=outcome.provider,
+                        message_id=outcome.message_id,
+                    )
+                )
+
+
+def _dedupe_key(publish_date: date, alerts_json: str, to: list[str]) -> str:
+    payload = [publish_date.isoformat(), alerts_json, sorted(map(normalize_email, to))]
+    encoded = json.dumps(payload, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _dump_email(email: Email) -> str:
+    return json.dumps(
+        {
+            "to": email.to,
+            "subject": email.subject,
+            "text": email.text,
+            "html": email.html,
+            "attachments": [
+                {
+                    "filename": attachment.filename,
+                    "digest": _digest(attachment.content),
+                    "content_type": attachment.content_type,
+                }
+                for attachment in email.attachments or []
+            ],
+        },
+        ensure_ascii=False,
+    )
+
+
+def _load_email(data: dict[str, Any], contents: dict[str, bytes]) -> Email:
+    attachments = [
+        Attachment(
+            filename=item["filename"],
+            # Emails gravados antes da tabela de anexos trazem o conteúdo em base64
+            content=(
+                contents[item["digest"]]
+                if "digest" in item
+                else base64.b64decode(item["content"])
+            ),
+            content_type=item["content_type"],
+        )
+        for item in data["attachments"]
+    ]
+    return Email(
+        to=data["to"],
+        subject=data["subject"],
+        text=data["text"],
+        html=data["html"],
+        attachments=attachments or None,
+    )
@@ -0,0 +1,66 @@
+"""Contadores e tempos das etapas do processamento diário."""
+
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+
+
+class StageMetrics:
+    """
+    Acumula contadores (páginas, bytes, matches, emails) e tempos de uma etapa.
+
+    Os tempos de ``timer`` somam em ``<nome>_ms``: com várias configs, o
+    valor é o total gasto na subetapa (ex.: ``render_ms``), não o tempo de
+    parede. Pode ser compartilhado entre threads.
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float = 1) -> None:
+        """Soma ``value`` ao contador ``name``."""
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    @contextmanager
+    def timer(
+        self, name: str, *, inner: tuple[str, Callable[[], float]] | None = None
+    ) -> Iterator[None]:
+        """
+        Soma a duração do bloco em ``<name>_ms``.
+
+        Com ``inner`` (nome e relógio em segundos), o quanto o relógio andar
+        durante o bloco vai para ``<nome>_ms`` e sai de ``<name>_ms`` (ex.:
+        consultas lidas sob demanda durante a renderização contam na busca).
+        """
+        started = time.perf_counter()
+        inner_started = inner[1]() if inner else 0.0
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if inner:
+                nested = inner[1]() - inner_started
+                self.add(f"{inner[0]}_ms", nested * 1000)
+                elapsed -= nested
+            self.add(f"{name}_ms", elapsed * 1000)
+
+    def as_dict(self) -> dict[str, float]:
+        """Valores acumulados (tempos arredondados a 0,1 ms)."""
+        with self._lock:
+            return {
+                name: round(value, 1) if name.endswith("_ms") else value
+                for name, value in self._values.items()
+            }
+
+
+def merge_metrics(
+    current: Mapping[str, float] | None, values: Mapping[str, float]
+) -> dict[str, float]:
+    """Soma ``values`` às métricas já gravadas de uma etapa."""
+    merged = dict(current or {})
+    for name, value in values.items():
+        merged[name] = round(merged.get(name, 0) + value, 1)
+    return merged
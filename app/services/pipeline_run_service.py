@@ -0,0 +1,411 @@
+"""Serviço para registrar execuções do processamento diário e suas etapas."""
+
+import math
+import time
+import uuid
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from app.models.pipeline_run import (
+    ConfigStatus,
+    PipelineRun,
+    PipelineRunConfig,
+    PipelineRunStage,
+    RunStatus,
+)
+from app.models.search_config import get_now_utc
+from app.repositories.pipeline_run_repository import PipelineRunRepository
+from app.services.pipeline_metrics import merge_metrics
+
+# Intervalo mínimo entre commits de progresso dentro de uma etapa
+PROGRESS_COMMIT_INTERVAL = 1.0
+
+# Configs que a etapa notify ainda precisa processar em uma retomada
+PENDING_CONFIG_STATUSES = (ConfigStatus.MATCHED, ConfigStatus.FAILED)
+
+# Sem atividade por mais tempo que isso, uma execução em andamento ou uma
+# config enfileirada é dada como abandonada: o job do RQ que a processava
+# já passou do job_timeout (no máximo 2h) ou o processo morreu
+STALE_AFTER = timedelta(hours=2)
+
+
+class RunInProgressError(Exception):
+    """Já existe uma execução em andamento para a data."""
+
+    def __init__(self, run: PipelineRun) -> None:
+        super().__init__(f"Execução {run.id} em andamento para {run.publish_date}")
+        self.run = run
+
+
+class RunTracker:
+    """
+    Registra o andamento de uma execução no banco.
+
+    Cada mudança de etapa é gravada na hora, para que ``GET
+    /api/tasks/runs/<id>`` acompanhe a execução de outro processo.
+    """
+
+    def __init__(self, run: PipelineRun, repository: PipelineRunRepository) -> None:
+        self.run = run
+        self.repository = repository
+        self._last_progress_commit = 0.0
+
+    @property
+    def run_id(self) -> str:
+        """ID da execução."""
+        return self.run.id
+
+    def start(self) -> None:
+        """Marca a execução como iniciada."""
+        self.run.status = RunStatus.RUNNING
+        self.run.started_at = get_now_utc()
+        self.run.finished_at = None
+        self.run.error = None
+        self.repository.commit()
+
+    @contextmanager
+    def stage(self, name: str, total: int | None = None) -> Iterator[PipelineRunStage]:
+        """
+        Abre uma etapa e a fecha com sucesso ou falha ao sair do bloco.
+
+        Args:
+            name: Nome da etapa (``fetch``, ``extract``, ``index``, ``match``,
+                ``notify``)
+            total: Total de itens da etapa, se conhecido
+
+        Yields:
+            Registro da etapa, para ``progress``
+        """
+        stage = PipelineRunStage(name=name, status=RunStatus.RUNNING, total=total)
+        self.run.stages.append(stage)
+        self.repository.commit()
+        try:
+            yield stage
+        except BaseException as exc:
+            self.repository.rollback()
+            stage.status = RunStatus.FAILED
+            stage.detail = str(exc) or type(exc).__name__
+            stage.finished_at = get_now_utc()
+            self.repository.commit()
+            raise
+        stage.status = RunStatus.SUCCEEDED
+        stage.finished_at = get_now_utc()
+        self.repository.commit()
+
+    def progress(
+        self,
+        stage: PipelineRunStage,
+        done: int,
+        total: int | None = None,
+        detail: str | None = None,
+    ) -> None:
+        """
+        Atualiza o progresso de uma etapa.
+
+        O commit acontece no máximo a cada ``PROGRESS_COMMIT_INTERVAL``
+        segundos (e sempre no último item), para não gravar a cada config.
+        """
+        stage.done = done
+        if total is not None:
+            stage.total = total
+        if detail is not None:
+            stage.detail = detail
+
+        now = time.monotonic()
+        finished = stage.total is not None and done >= stage.total
+        if finished or now - self._last_progress_commit >= PROGRESS_COMMIT_INTERVAL:
+            self._last_progress_commit = now
+            self.repository.commit()
+
+    def record_metrics(
+        self, stage: PipelineRunStage, values: Mapping[str, float]
+    ) -> None:
+        """
+        Soma contadores e tempos às métricas de uma etapa.
+
+        Args:
+            stage: Etapa aberta por ``stage``
+            values: Métricas a somar (ex.: ``StageMetrics.as_dict()``)
+        """
+        if values:
+            stage.metrics = merge_metrics(stage.metrics, values)
+            self.repository.commit()
+
+    def completed(self, name: str) -> bool:
+        """Verifica se a etapa já foi concluída (em uma tentativa anterior)."""
+        return any(
+            stage.name == name and stage.status == RunStatus.SUCCEEDED
+            for stage in self.run.stages
+        )
+
+    def record_matches(self, counts: dict[int, int]) -> None:
+        """
+        Grava no ledger o total de matches de cada configuração.
+
+        Args:
+            counts: Matches por ID de configuração
+        """
+        existing = {entry.config_id: entry for entry in self.run.configs}
+        for config_id, matches in counts.items():
+            entry = existing.get(config_id)
+            if entry is None:
+                entry = PipelineRunConfig(config_id=config_id)
+                self.run.configs.append(entry)
+            entry.matches = matches
+            entry.status = ConfigStatus.MATCHED if matches else ConfigStatus.NO_MATCH
+        self.repository.commit()
+
+    def pending_configs(self) -> list[int]:
+        """
+        IDs das configurações com match ainda não notificadas (ou com erro).
+
+        Inclui as enfileiradas cujo job do RQ não terminou em ``STALE_AFTER``.
+        """
+        now = get_now_utc()
+        return [
+            entry.config_id for entry in self.run.configs if _is_pending(entry, now)
+        ]
+
+    def mark_configs(
+        self, config_ids: list[int], status: str, error: str | None = None
+    ) -> None:
+        """
+        Atualiza a situação de configurações no ledger.
+
+        Notificações (com sucesso ou erro) contam uma tentativa.
+
+        Args:
+            config_ids: IDs das configurações
+            status: Nova situação (``ConfigStatus``)
+            error: Mensagem de erro, se houver
+        """
+        ids = set(config_ids)
+        for entry in self.run.configs:
+            if entry.config_id not in ids:
+                continue
+            entry.status = status
+            entry.error = error
+            if status in (ConfigStatus.NOTIFIED, ConfigStatus.FAILED):
+                entry.attempts += 1
+        self.repository.commit()
+
+    def succeed(self) -> None:
+        """Marca a execução como concluída."""
+        self.run.status = RunStatus.SUCCEEDED
+        self.run.finished_at = get_now_utc()
+        self.repository.commit()
+
+    def fail(self, error: BaseException) -> None:
+        """Marca a execução como falha."""
+        self.repository.rollback()
+        self.run.status = RunStatus.FAILED
+        self.run.error = str(error) or type(error).__name__
+        self.run.finished_at = get_now_utc()
+        self.repository.commit()
+
+
+class PipelineRunService:
+    """Serviço para criar e consultar execuções do processamento diário."""
+
+    def __init__(self, repository: PipelineRunRepository) -> None:
+        self.repository = repository
+
+    def create_run(self, publish_date: date, backend: str) -> PipelineRun:
+        """
+        Registra uma execução na fila.
+
+        Args:
+            publish_date: Data do diário a processar
+            backend: Onde a execução roda (``rq``, ``thread`` ou ``sync``)
+
+        Returns:
+            Execução criada
+        """
+        run = PipelineRun(
+            id=uuid.uuid4().hex,
+            publish_date=publish_date,
+            status=RunStatus.QUEUED,
+            backend=backend,
+        )
+        return self.repository.save(run)
+
+    def open_run(
+        self, publish_date: date, backend: str, *, resume: bool = False
+    ) -> tuple[PipelineRun, bool]:
+        """
+        Retoma a última execução da data, se falhou, ou registra uma nova.
+
+        Uma execução retomada pula as etapas já concluídas e notifica só as
+        configurações pendentes. Também é retomada uma execução concluída
+        com configurações que falharam (ou cujo job sumiu) nos jobs de
+        notificação do RQ, e uma em andamento sem atividade há mais de
+        ``STALE_AFTER``.
+
+        Args:
+            publish_date: Data do diário a processar
+            backend: Onde a execução roda (``rq``, ``thread`` ou ``sync``)
+            resume: Retomar mesmo uma execução em andamento recente (pedido
+                manual, quando se sabe que o processo que a executava morreu)
+
+        Returns:
+            Execução e se ela foi retomada
+
+        Raises:
+            RunInProgressError: Se há uma execução em andamento e ``resume``
+                não foi pedido
+        """
+        latest = self.repository.find_latest_by_date(publish_date)
+        now = get_now_utc()
+        if latest is None or (
+            latest.status == RunStatus.SUCCEEDED
+            and not any(_is_pending(c, now) for c in latest.configs)
+        ):
+            return self.create_run(publish_date, backend), False
+        if (
+            latest.status in (RunStatus.QUEUED, RunStatus.RUNNING)
+            and not resume
+            and not latest.is_stale(now, STALE_AFTER)
+        ):
+            raise RunInProgressError(latest)
+
+        latest.status = RunStatus.QUEUED
+        latest.backend = backend
+        self.repository.commit()
+        return latest, True
+
+    def execute(
+        self, run_id: str, pipeline: Callable[[date, RunTracker], None]
+    ) -> None:
+        """
+        Executa uma execução registrada, gravando início, fim e erro.
+
+        Args:
+            run_id: ID da execução
+            pipeline: Função que processa a data, etapa por etapa
+
+        Raises:
+            LookupError: Se a execução não existir
+        """
+        tracker = self.tracker(run_id)
+        if tracker is None:
+            raise LookupError(f"Execução {run_id} não encontrada")
+
+        tracker.start()
+        try:
+            pipeline(tracker.run.publish_date, tracker)
+        except Exception as exc:
+            tracker.fail(exc)
+            raise
+        tracker.succeed()
+
+    def mark_config(
+        self, run_id: str, config_id: int, status: str, error: str | None = None
+    ) -> None:
+        """
+        Atualiza a situação de uma configuração no ledger de uma execução.
+
+        Usado pelos jobs de notificação, que rodam fora do tracker.
+        """
+        entry = self.repository.get_config_entry(run_id, config_id)
+        if entry is None:
+            return
+        entry.status = status
+        entry.error = error
+        entry.attempts += 1
+        self.repository.commit()
+
+    def record_stage_metrics(
+        self, run_id: str, stage_name: str, values: Mapping[str, float]
+    ) -> None:
+        """
+        Soma métricas à última etapa ``stage_name`` de uma execução.
+
+        Usado pelos jobs de notificação do RQ, que rodam depois da etapa
+        notify ter enfileirado os jobs. Cada job grava uma linha própria
+        (somada em ``PipelineRunStage.total_metrics``): jobs que terminam
+        juntos não sobrescrevem as métricas uns dos outros.
+        """
+        if not values:
+            return
+        stage = self.repository.find_latest_stage(run_id, stage_name)
+        if stage is None:
+            return
+        self.repository.add_stage_metrics(stage.id, dict(values))
+
+    def stage_report(self, since: date) -> dict[str, Any]:
+        """
+        Latência por etapa e freshness das execuções desde uma data.
+
+        Para cada etapa, resume a duração (média, p50, p95 e máximo) das
+        tentativas concluídas e soma as métricas; a freshness é o tempo
+        entre a publicação do diário e o último alerta de cada execução.
+
+        Args:
+            since: Primeira data de publicação considerada
+
+        Returns:
+            Resumo em JSON
+        """
+        runs = self.repository.find_since(since)
+        durations: dict[str, list[int]] = {}
+        totals: dict[str, dict[str, float]] = {}
+        for run in runs:
+            for stage in run.stages:
+                if stage.status != RunStatus.SUCCEEDED:
+                    continue
+                duration = stage.to_dict()["duration_ms"]
+                if duration is not None:
+                    durations.setdefault(stage.name, []).append(duration)
+                totals[stage.name] = merge_metrics(
+                    totals.get(stage.name), stage.total_metrics
+                )
+        freshness = [run.freshness_ms for run in runs if run.freshness_ms is not None]
+        return {
+            "since": since.isoformat(),
+            "runs": len(runs),
+            "stages": {
+                name: {
+                    "count": len(values),
+                    "duration_ms": _summary(values),
+                    "metrics": totals.get(name, {}),
+                }
+                for name, values in durations.items()
+            },
+            "freshness_ms": _summary(freshness),
+        }
+
+    def get_run(self, run_id: str) -> PipelineRun | None:
+        """Busca uma execução por ID."""
+        return self.repository.get_by_id(run_id)
+
+    def tracker(self, run_id: str) -> RunTracker | None:
+        """Retorna o tracker de uma execução existente."""
+        run = self.repository.get_by_id(run_id)
+        if run is None:
+            return None
+        return RunTracker(run, self.repository)
+
+
+def _is_pending(entry: PipelineRunConfig, now: datetime) -> bool:
+    if entry.status in PENDING_CONFIG_STATUSES:
+        return True
+    return entry.status == ConfigStatus.QUEUED and entry.is_stale(now, STALE_AFTER)
+
+
+def _summary(values: list[int]) -> dict[str, int] | None:
+    """Média, p50, p95 e máximo (percentis pelo posto mais próximo)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def percentile(p: int) -> int:
+        return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+    return {
+        "avg": round(sum(ordered) / len(ordered)),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "max": ordered[-1],
+    }
@@ -1,12 +1,20 @@
 """Serviço para gerenciar configurações de busca."""
 
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from typing import Any
 
+from flask import current_app
+from pydantic import ValidationError
+
 from app.mailer.unsubscribe import normalize_email
 from app.models.search_config import SearchConfig, SearchTerm
-from app.repositories.search_config_repository import SearchConfigRepository
+from app.repositories.search_config_repository import (
+    KeysetPage,
+    SearchConfigRepository,
+)
 from app.schemas.search_config import SearchConfigCreate, SearchConfigUpdate
+from app.services.config_snapshot import ConfigSnapshot, ConfigSnapshotCache
 
 
 @dataclass(frozen=True, slots=True)
@@ -19,6 +27,38 @@ class UnsubscribeResult:
     deactivated: bool = False
 
 
+@dataclass(frozen=True, slots=True)
+class BulkImportResult:
+    """Resultado de uma importação em lote (nada é gravado se houver erros)."""
+
+    ids: list[int] = field(default_factory=list)
+    # "<linha>.<campo>" -> mensagem de validação
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+def _config_columns(config_data: SearchConfigCreate) -> dict[str, Any]:
+    """Colunas de SearchConfig a partir do schema de criação."""
+    return {
+        "label": config_data.label,
+        "attach_csv": config_data.attach_csv,
+        "mail_to": [str(e) for e in config_data.mail_to],
+        "mail_subject": config_data.mail_subject or "",
+        "teams_webhook": (
+            str(config_data.teams_webhook) if config_data.teams_webhook else None
+        ),
+        "active": config_data.active,
+        "max_highlights_per_term": config_data.max_highlights_per_term,
+    }
+
+
+def _term_columns(config_data: SearchConfigCreate) -> list[dict[str, Any]]:
+    """Colunas de SearchTerm para cada termo do schema de criação."""
+    return [
+        {"term": term.term, "exact": True, "syntax": term.syntax}
+        for term in config_data.terms
+    ]
+
+
 class SearchService:
     """Serviço para operações CRUD de configurações de busca (multi-tenant)."""
 
@@ -38,24 +78,48 @@ class SearchService:
         Returns:
             Configuração salva
         """
-        mail_to = [str(e) for e in config_data.mail_to] if config_data.mail_to else []
-        webhook = str(config_data.teams_webhook) if config_data.teams_webhook else None
-
-        config = SearchConfig(
-            user_id=user_id,
-            label=config_data.label,
-            attach_csv=config_data.attach_csv,
-            mail_to=mail_to,
-            mail_subject=config_data.mail_subject or "",
-            teams_webhook=webhook,
-            active=config_data.active,
-        )
+        config = SearchConfig(user_id=user_id, **_config_columns(config_data))
+        config.terms = [SearchTerm(**term) for term in _term_columns(config_data)]
+        return self.repository.save(config)
 
-        for term_data in config_data.terms:
-            term = SearchTerm(term=term_data.term, exact=True)
-            config.terms.append(term)
+    def import_configs(
+        self, rows: Iterable[tuple[int, Any]], user_id: int
+    ) -> BulkImportResult:
+        """
+        Valida e cria várias configurações de uma vez (tudo ou nada).
 
-        return self.repository.save(config)
+        Cada linha passa por ``SearchConfigCreate``; se alguma for inválida,
+        nenhuma é gravada e o resultado traz os erros de todas as linhas.
+
+        Args:
+            rows: Pares (número da linha, dados da config)
+            user_id: ID do usuário dono das configurações
+
+        Returns:
+            IDs criados, ou os erros por linha e campo
+        """
+        configs: list[dict[str, Any]] = []
+        terms: list[list[dict[str, Any]]] = []
+        errors: dict[str, str] = {}
+        for row, data in rows:
+            try:
+                config_data = SearchConfigCreate.model_validate(data)
+            except ValidationError as e:
+                for err in e.errors():
+                    loc = ".".join(str(part) for part in err["loc"])
+                    errors[f"{row}.{loc}" if loc else str(row)] = err["msg"]
+                continue
+            configs.append({"user_id": user_id, **_config_columns(config_data)})
+            terms.append(_term_columns(config_data))
+        if errors:
+            return BulkImportResult(errors=errors)
+        return BulkImportResult(ids=self.repository.bulk_create(configs, terms))
+
+    def export_configs(
+        self, user_id: int, *, active_only: bool = False
+    ) -> Iterator[SearchConfig]:
+        """Percorre as configurações do usuário em lotes (exportação)."""
+        return self.repository.iter_by_user(user_id, active_only=active_only)
 
     def get_config(
         self, config_id: int, user_id: int | None = None
@@ -65,6 +129,27 @@ class SearchService:
         """
         return self.repository.get_by_id(config_id, user_id=user_id)
 
+    def get_configs(self, config_ids: list[int]) -> list[SearchConfig]:
+        """
+        Busca várias configurações por ID, sem filtro de dono (uso em jobs).
+        """
+        return self.repository.find_by_ids(config_ids)
+
+    def digest_recipients(
+        self, config_ids: list[int], *, default: bool
+    ) -> dict[int, list[str]]:
+        """
+        Destinatários das configs que vão no resumo diário (preferência do dono).
+
+        Args:
+            config_ids: IDs das configurações
+            default: Preferência de quem não escolheu (``NOTIFY_DIGEST``)
+
+        Returns:
+            ``mail_to`` por ID, só das configs no resumo, na ordem de ``config_ids``
+        """
+        return self.repository.find_digest_recipients(config_ids, default=default)
+
     def list_configs(
         self, *, active_only: bool = True, user_id: int | None = None
     ) -> list[SearchConfig]:
@@ -73,6 +158,15 @@ class SearchService:
         """
         return self.repository.find_all(active_only=active_only, user_id=user_id)
 
+    def active_snapshot(self) -> ConfigSnapshot:
+        """
+        Configurações ativas com os termos compilados, sem objetos do ORM.
+
+        O snapshot fica em cache no processo e só é recarregado quando
+        alguma configuração foi gravada desde o último carregamento.
+        """
+        return ConfigSnapshotCache.for_app(current_app).get(self.repository)
+
     def list_configs_paginated(
         self,
         page: int,
@@ -88,6 +182,24 @@ class SearchService:
             page, per_page, active_only=active_only, user_id=user_id
         )
 
+    def list_configs_page(
+        self,
+        limit: int,
+        *,
+        cursor: str | None = None,
+        active_only: bool = True,
+        user_id: int | None = None,
+    ) -> KeysetPage:
+        """
+        Lista configurações por cursor (mais novas primeiro).
+
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        return self.repository.find_page(
+            limit, cursor=cursor, active_only=active_only, user_id=user_id
+        )
+
     def update_config(
         self,
         config_id: int,
@@ -114,6 +226,8 @@ class SearchService:
             config.teams_webhook = str(config_data.teams_webhook)
         if config_data.active is not None:
             config.active = config_data.active
+        if config_data.max_highlights_per_term is not None:
+            config.max_highlights_per_term = config_data.max_highlights_per_term or None
 
         # Atualizar termos apenas se a lista foi fornecida (mesmo que vazia)
         if config_data.terms is not None:
@@ -128,6 +242,7 @@ class SearchService:
                 term = SearchTerm(
                     term=term_data.term,
                     exact=True,
+                    syntax=term_data.syntax,
                     search_config_id=config.id,
                 )
                 self.repository.add_term(term)
@@ -0,0 +1,286 @@
+"""Canal de notificação por webhook do Microsoft Teams."""
+
+import itertools
+import logging
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.mailer.message import DeliveryResult
+from app.mailer.notification import generate_daily_gazette_link
+from app.models.search_config import SearchConfig
+from app.search.source import Report
+from app.services.delivery_service import DeliveryService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 3
+DEFAULT_MAX_HIGHLIGHTS = 10
+
+# "Destinatário" do canal no ledger de entregas
+TEAMS_RECIPIENT = "teams"
+
+_BOLD = re.compile(r"</?b>")
+
+
+class TeamsError(Exception):
+    """Falha ao publicar um alerta no webhook do Teams."""
+
+
+def teams_card(
+    config: SearchConfig, report: Report, max_highlights: int = DEFAULT_MAX_HIGHLIGHTS
+) -> dict[str, Any]:
+    """
+    Mensagem do Teams com o relatório em um adaptive card.
+
+    Args:
+        config: Configuração de busca
+        report: Relatório da busca
+        max_highlights: Máximo de trechos no card (o Teams limita o tamanho)
+
+    Returns:
+        Corpo JSON do POST para o webhook
+    """
+    publish_date = report.publish_date.strftime("%d/%m/%Y")
+    body: list[dict[str, Any]] = [
+        {
+            "type": "TextBlock",
+            "text": config.label,
+            "weight": "Bolder",
+            "size": "Medium",
+            "wrap": True,
+        },
+        {
+            "type": "TextBlock",
+            "text": f"{report.count} ocorrência(s) no Diário Oficial de {publish_date}",
+            "wrap": True,
+        },
+        {
+            "type": "FactSet",
+            "facts": [
+                {"title": term.term, "value": str(report.term_counts.get(term.term, 0))}
+                for term in report.search_terms
+            ],
+        },
+    ]
+    shown = 0
+    for highlight in itertools.islice(report.highlights, max_highlights):
+        shown += 1
+        body.append(
+            {
+                "type": "TextBlock",
+                # Trechos do FTS marcam o termo com <b>; no card, markdown
+                "text": f"**Página {highlight.page}:** "
+                + _BOLD.sub("**", highlight.content),
+                "wrap": True,
+                "separator": True,
+            }
+        )
+    if report.count > shown:
+        body.append(
+            {
+                "type": "TextBlock",
+                "text": f"E mais {report.count - shown} ocorrência(s).",
+                "isSubtle": True,
+                "wrap": True,
+            }
+        )
+    return {
+        "type": "message",
+        "attachments": [
+            {
+                "contentType": "application/vnd.microsoft.card.adaptive",
+                "content": {
+                    "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+                    "type": "AdaptiveCard",
+                    "version": "1.4",
+                    "body": body,
+                    "actions": [
+                        {
+                            "type": "Action.OpenUrl",
+                            "title": "Abrir Diário Oficial",
+                            "url": generate_daily_gazette_link(report.publish_date),
+                        }
+                    ],
+                },
+            }
+        ],
+    }
+
+
+class TeamsClient:
+    """
+    Cliente HTTP compartilhado para os webhooks do Teams.
+
+    Uma sessão ``requests`` com pool de conexões e retries (429 e 5xx, com
+    espera exponencial e respeito ao ``Retry-After``) e um pool de threads
+    limitado: ``submit`` devolve na hora e o POST roda em segundo plano.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+    ) -> None:
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=concurrency,
+            pool_maxsize=concurrency,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(concurrency, 1), thread_name_prefix="teams"
+        )
+
+    def submit(self, url: str, payload: dict[str, Any]) -> Future[None]:
+        """Agenda o POST de uma mensagem no webhook."""
+        return self._executor.submit(self.post, url, payload)
+
+    def post(self, url: str, payload: dict[str, Any]) -> None:
+        """
+        Publica uma mensagem no webhook.
+
+        Raises:
+            requests.RequestException: Se o webhook falhar depois dos retries
+        """
+        response = self.session.post(url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self) -> None:
+        """Espera os POSTs em andamento e fecha as conexões."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+
+_client: TeamsClient | None = None
+_client_lock = threading.Lock()
+
+
+def shared_client(app: Any) -> TeamsClient:
+    """Cliente do processo, criado no primeiro uso com a configuração do app."""
+    global _client  # noqa: PLW0603
+    with _client_lock:
+        if _client is None:
+            _client = TeamsClient(
+                concurrency=int(
+                    app.config.get("TEAMS_CONCURRENCY", DEFAULT_CONCURRENCY)
+                ),
+                timeout=float(app.config.get("TEAMS_TIMEOUT", DEFAULT_TIMEOUT)),
+                retries=int(app.config.get("TEAMS_RETRIES", DEFAULT_RETRIES)),
+            )
+        return _client
+
+
+class TeamsChannel:
+    """
+    Publicações no Teams de uma execução de notificações.
+
+    ``post`` monta o card na thread atual (os trechos vêm do cursor do
+    ``diarios.db``) e só o POST vai para o pool do ``TeamsClient``: o envio
+    dos emails segue sem esperar o webhook. ``wait``, ao fim da execução,
+    coleta os resultados e registra as entregas no ledger, com o
+    destinatário ``teams``; reprocessar a data não publica de novo.
+    """
+
+    def __init__(
+        self,
+        client: TeamsClient,
+        deliveries: DeliveryService,
+        max_highlights: int = DEFAULT_MAX_HIGHLIGHTS,
+    ) -> None:
+        self.client = client
+        self.deliveries = deliveries
+        self.max_highlights = max_highlights
+        self._lock = threading.Lock()
+        self._pending: list[tuple[int, date, str, Future[None]]] = []
+
+    @classmethod
+    def for_app(cls, app: Any) -> "TeamsChannel":
+        """Canal com o cliente compartilhado do processo."""
+        return cls(
+            shared_client(app),
+            DeliveryService.for_app(app),
+            int(app.config.get("TEAMS_MAX_HIGHLIGHTS", DEFAULT_MAX_HIGHLIGHTS)),
+        )
+
+    def post(
+        self,
+        config: SearchConfig,
+        report: Report,
+        publish_date: date,
+        content_hash: str,
+    ) -> bool:
+        """
+        Agenda a publicação do relatório no webhook da configuração.
+
+        Args:
+            config: Configuração de busca (com ``teams_webhook``)
+            report: Relatório da busca, com match
+            publish_date: Data de publicação
+            content_hash: Hash do conteúdo (``DeliveryService.content_hash``)
+
+        Returns:
+            True se a publicação foi agendada
+        """
+        if not config.teams_webhook:
+            return False
+        delivered = self.deliveries.repository.find_recipients(
+            config.id, publish_date, content_hash
+        )
+        if TEAMS_RECIPIENT in delivered:
+            return False
+        future = self.client.submit(
+            config.teams_webhook, teams_card(config, report, self.max_highlights)
+        )
+        with self._lock:
+            self._pending.append((config.id, publish_date, content_hash, future))
+        return True
+
+    def wait(self) -> dict[int, TeamsError]:
+        """
+        Espera as publicações agendadas e registra as entregues.
+
+        Returns:
+            Erro por ID de configuração, só das que não publicaram. O email
+            já saiu; quem chama marca a config como falha no ledger da
+            execução, e uma nova tentativa publica só o que faltou.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        errors: dict[int, TeamsError] = {}
+        for config_id, publish_date, content_hash, future in pending:
+            error = future.exception()
+            if error is not None:
+                logger.error(
+                    "Erro ao publicar no Teams para config %d: %s", config_id, error
+                )
+                failure = TeamsError(f"Falha ao publicar no Teams: {error}")
+                failure.__cause__ = error
+                errors[config_id] = failure
+                continue
+            self.deliveries.record(
+                config_id,
+                TEAMS_RECIPIENT,
+                publish_date,
+                content_hash,
+                DeliveryResult(provider="teams"),
+            )
+        return errors
@@ -1,6 +1,8 @@
-"""Serviço de usuários (limite para futura integração Entra ID)."""
+"""Serviço de usuários (preferências e limite para futura integração Entra ID)."""
 
+from app.extensions import db
 from app.models import User
+from app.schemas.user import UserPreferencesUpdate
 
 # Limite de usuários únicos para cadastro via Entra ID (primeiros 100).
 # Não usado no fluxo local (sem autocadastro); reservado para callback Entra.
@@ -16,3 +18,25 @@ def can_register_new_user() -> bool:
     (mostrar "limite atingido"), mas permitir login dos já cadastrados.
     """
     return bool(User.query.filter_by(auth_provider="entra").count() < USER_CAP_ENTRA)
+
+
+def wants_digest(user: User, *, default: bool) -> bool:
+    """Indica se os alertas do usuário vão no resumo diário."""
+    return default if user.notify_digest is None else user.notify_digest
+
+
+def update_preferences(user: User, preferences: UserPreferencesUpdate) -> User:
+    """
+    Atualiza as preferências informadas (``null`` volta ao padrão do servidor).
+
+    Args:
+        user: Usuário
+        preferences: Preferências; campos omitidos não mudam
+
+    Returns:
+        O usuário atualizado
+    """
+    if "notify_digest" in preferences.model_fields_set:
+        user.notify_digest = preferences.notify_digest
+    db.session.commit()
+    return user
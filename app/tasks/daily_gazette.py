@@ -4,48 +4,68 @@ import traceback
 from datetime import date
 from pathlib import Path
 
-from redis import Redis
-
-from app import create_app
+from app.repositories.pipeline_run_repository import PipelineRunRepository
 from app.repositories.search_config_repository import SearchConfigRepository
 from app.repositories.sqlite_document_repository import SQLiteDocumentRepository
 from app.services.gazette_service import GazetteService
+from app.services.pipeline_run_service import (
+    PipelineRunService,
+    RunInProgressError,
+)
 from app.services.search_service import SearchService
+from app.tasks.worker import job_runtime
 
 
 def process_daily_gazette(publish_date: date) -> None:
     """
     Processa o diário oficial de uma data específica.
 
+    Registra uma execução (ou retoma a última, se falhou ou se está parada
+    há mais de ``STALE_AFTER``) e enfileira as notificações em lotes. Com
+    uma execução da data em andamento (ex.: cron duplicado), não faz nada.
+
     Args:
         publish_date: Data de publicação do diário
     """
-    app = create_app()
-    with app.app_context():
+    with job_runtime("process_daily_gazette") as runtime:
+        app = runtime.app
         try:
             # Configurar dependências
-            diarios_dir = app.config.get("DIARIOS_DIR", "diarios")
-            search_db = str(Path(diarios_dir) / "diarios.db")
-
-            doc_repo = SQLiteDocumentRepository(search_db)
+            doc_repo = SQLiteDocumentRepository(runtime.search_db)
             config_repo = SearchConfigRepository()
             search_service = SearchService(config_repo)
 
-            # Redis connection para enfileiramento
-            redis_conn = Redis.from_url(
-                app.config.get("REDIS_URL", "redis://localhost:6379/0")
-            )
-
-            # Instanciar e executar serviço
+            # Instanciar e executar serviço (Redis do runtime para enfileiramento)
             service = GazetteService(
                 doc_repository=doc_repo,
                 search_service=search_service,
-                queue_connection=redis_conn,
+                queue_connection=runtime.redis,
+                artifacts_dir=Path(runtime.search_db).parent / "runs",
             )
 
-            service.process_date(publish_date)
+            run_service = PipelineRunService(PipelineRunRepository())
+            try:
+                run, _ = run_service.open_run(publish_date, "rq")
+            except RunInProgressError as exc:
+                app.logger.warning("%s: job ignorado", exc)
+                return
+            run_service.execute(run.id, service.process_date)
 
         except Exception:
             app.logger.exception("Erro na task process_daily_gazette")
             traceback.print_exc()
             raise
+
+
+def run_daily_pipeline(run_id: str) -> None:
+    """
+    Executa uma execução registrada por ``POST /api/tasks/process-daily``.
+
+    Args:
+        run_id: ID da execução (``PipelineRun``)
+    """
+    # Importar aqui para evitar ciclo (app.api.tasks enfileira este job)
+    from app.api.tasks import execute_pipeline_run  # noqa: PLC0415
+
+    with job_runtime("run_daily_pipeline"):
+        execute_pipeline_run(run_id)
@@ -1,92 +1,170 @@
 """Worker para enviar notificações."""
 
 from datetime import date
-from pathlib import Path
 
-from app import create_app
-from app.mailer.mailer import Mailer
-from app.mailer.notification import build_notification_emails
+from app.extensions import db
+from app.models.pipeline_run import ConfigStatus
+from app.repositories.pipeline_run_repository import PipelineRunRepository
 from app.repositories.search_config_repository import SearchConfigRepository
-from app.search.source import SearchSource, Term, Trigger
+from app.services.digest_service import DigestService
+from app.services.notification_service import NotificationService
+from app.services.pipeline_metrics import StageMetrics
+from app.services.pipeline_run_service import PipelineRunService
 from app.services.search_service import SearchService
+from app.services.teams_service import TeamsChannel
+from app.tasks.worker import job_runtime
 
 
-def notify_search_config(publish_date_str: str, config_id: int) -> None:
+def notify_search_configs(
+    publish_date_str: str, config_ids: list[int], run_id: str | None = None
+) -> dict[str, list[int]]:
     """
-    Envia notificações para uma configuração de busca.
+    Envia notificações para um lote de configurações de busca.
+
+    O lote compartilha um app context, uma conexão com o banco de busca e um
+    mailer (os do worker, quando pré-carregado) com uma conexão SMTP só. Um
+    erro em uma configuração é registrado e não interrompe as demais; o job
+    não falha para não reenviar o lote inteiro em um retry. As publicações no
+    Teams rodam em segundo plano e o lote só as espera depois dos emails.
+    Os tempos de busca, renderização e envio do lote são somados à etapa
+    notify da execução.
 
     Args:
         publish_date_str: Data de publicação no formato ISO (YYYY-MM-DD)
-        config_id: ID da configuração de busca
+        config_ids: IDs das configurações de busca
+        run_id: Execução do processamento diário cujo ledger é atualizado
+
+    Returns:
+        IDs por resultado: ``notified``, ``skipped`` (sem match, sem
+        destinatário ou não encontrada) e ``failed``
     """
-    app = create_app()
-    with app.app_context():
-        try:
-            # Parsear data
-            publish_date = date.fromisoformat(publish_date_str)
-
-            # Buscar configuração (sem filtro de usuário
-            # job já validado pelo processamento)
-            config_repo = SearchConfigRepository()
-            search_service = SearchService(config_repo)
-            config = search_service.get_config(config_id, user_id=None)
-            if not config:
-                app.logger.warning("Configuração %s não encontrada", config_id)
-                return
+    with (
+        job_runtime("notify_search_configs") as runtime,
+        runtime.mailer.session(),
+    ):
+        app = runtime.app
+        publish_date = date.fromisoformat(publish_date_str)
+        summary: dict[str, list[int]] = {"notified": [], "skipped": [], "failed": []}
 
-            # Inicializar source de busca
-            diarios_dir = app.config.get("DIARIOS_DIR", "diarios")
-            search_db = str(Path(diarios_dir) / "diarios.db")
-            source = SearchSource(search_db)
+        # Buscar configurações (sem filtro de usuário
+        # job já validado pelo processamento)
+        search_service = SearchService(SearchConfigRepository())
+        run_service = PipelineRunService(PipelineRunRepository())
+        teams = TeamsChannel.for_app(app)
+        metrics = StageMetrics()
+        notifications = NotificationService.for_app(
+            app, runtime.mailer, teams, metrics=metrics
+        )
+        configs = {
+            config.id: config for config in search_service.get_configs(config_ids)
+        }
+
+        for config_id in config_ids:
+            config = configs.get(config_id)
+            if config is None:
+                app.logger.warning("Configuração %s não encontrada", config_id)
+                summary["skipped"].append(config_id)
+                continue
 
             try:
-                # Converter termos
-                search_terms = [
-                    Term(term=term.term, exact=True) for term in config.terms
-                ]
-
-                # Gerar relatório
-                report = source.lookup(Trigger.CRON, publish_date, search_terms)
-
-                # Se não houver matches, pular
-                if report.count == 0:
-                    app.logger.info("Nenhum match encontrado para config %s", config_id)
-                    return
-
-                # Enviar emails se configurado
-                if config.mail_to:
-                    mailer = Mailer(app)
-                    emails = build_notification_emails(
-                        config=config,
-                        report=report,
-                        secret_key=str(app.config["SECRET_KEY"]),
-                        app_base_url=str(app.config.get("APP_BASE_URL", "")),
-                        app_env=str(app.config.get("APP_ENV", "development")),
+                notified = notifications.notify_config(
+                    runtime.source, publish_date, config
+                )
+            except Exception as exc:
+                app.logger.exception(
+                    "Erro ao processar notificação para config %s", config_id
+                )
+                db.session.rollback()
+                summary["failed"].append(config_id)
+                if run_id:
+                    run_service.mark_config(
+                        run_id, config_id, ConfigStatus.FAILED, str(exc)
                     )
+                continue
+
+            summary["notified" if notified else "skipped"].append(config_id)
+            if run_id:
+                run_service.mark_config(run_id, config_id, ConfigStatus.NOTIFIED)
+
+        # Emails já enviados; só agora esperar os webhooks do Teams
+        for config_id, error in teams.wait().items():
+            # O email saiu, mas a config fica pendente para publicar no Teams
+            for ids in summary.values():
+                if config_id in ids:
+                    ids.remove(config_id)
+            summary["failed"].append(config_id)
+            if run_id:
+                run_service.mark_config(
+                    run_id, config_id, ConfigStatus.FAILED, str(error)
+                )
+        if run_id:
+            run_service.record_stage_metrics(run_id, "notify", metrics.as_dict())
+
+        app.logger.info(
+            "Lote de %d configs para %s: %d notificadas, %d sem envio, %d com erro",
+            len(config_ids),
+            publish_date,
+            len(summary["notified"]),
+            len(summary["skipped"]),
+            len(summary["failed"]),
+        )
+        return summary
+
+
+def notify_digest(
+    publish_date_str: str, config_ids: list[int], run_id: str | None = None
+) -> dict[str, list[int]]:
+    """
+    Envia um email de resumo por destinatário com os alertas das configs.
+
+    Args:
+        publish_date_str: Data de publicação no formato ISO (YYYY-MM-DD)
+        config_ids: IDs das configurações de busca
+        run_id: Execução do processamento diário cujo ledger é atualizado
+
+    Returns:
+        IDs por resultado: ``notified`` e ``failed``
+    """
+    with job_runtime("notify_digest") as runtime, runtime.mailer.session():
+        app = runtime.app
+        publish_date = date.fromisoformat(publish_date_str)
+        configs = SearchService(SearchConfigRepository()).get_configs(config_ids)
+        metrics = StageMetrics()
+        results = DigestService.for_app(app, runtime.mailer, metrics=metrics).notify(
+            runtime.source, publish_date, configs
+        )
 
-                    try:
-                        results = mailer.send(*emails)
-                        csv_info = (
-                            " com CSV anexado"
-                            if config.attach_csv and report.count > 0
-                            else ""
-                        )
-                        message_id = results[0].message_id if results else None
-                        app.logger.info(
-                            "Email enviado via %s para %s (config %s)%s%s",
-                            mailer.provider_name,
-                            config.mail_to,
-                            config_id,
-                            csv_info,
-                            f" [message_id={message_id}]" if message_id else "",
-                        )
-                    except Exception:
-                        app.logger.exception("Erro ao enviar email")
-                        # Não falhar o job por erro de email
-
-            finally:
-                source.close()
-
-        except Exception:
-            app.logger.exception("Erro ao processar notificação")
-            raise
+        summary: dict[str, list[int]] = {"notified": [], "failed": []}
+        run_service = PipelineRunService(PipelineRunRepository())
+        for config_id, error in results.items():
+            summary["failed" if error else "notified"].append(config_id)
+            if run_id:
+                run_service.mark_config(
+                    run_id,
+                    config_id,
+                    ConfigStatus.FAILED if error else ConfigStatus.NOTIFIED,
+                    str(error) if error else None,
+                )
+        if run_id:
+            run_service.record_stage_metrics(run_id, "notify", metrics.as_dict())
+        app.logger.info(
+            "Resumo de %s: %d configs notificadas, %d com erro",
+            publish_date,
+            len(summary["notified"]),
+            len(summary["failed"]),
+        )
+        return summary
+
+
+def notify_search_config(publish_date_str: str, config_id: int) -> None:
+    """
+    Envia notificações para uma configuração de busca.
+
+    Mantido para jobs já enfileirados; novos jobs usam
+    ``notify_search_configs``.
+
+    Args:
+        publish_date_str: Data de publicação no formato ISO (YYYY-MM-DD)
+        config_id: ID da configuração de busca
+    """
+    notify_search_configs(publish_date_str, [config_id])
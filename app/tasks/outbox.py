@@ -0,0 +1,94 @@
+"""Worker dedicado ao envio dos emails da outbox."""
+
+import logging
+import time
+from typing import Any
+
+from app.extensions import db
+from app.mailer.mailer import Mailer
+from app.services.outbox_service import (
+    DEFAULT_RATE_PER_SECOND,
+    DrainResult,
+    OutboxService,
+    ProviderBuckets,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+def provider_buckets(app: Any, capacity: int) -> ProviderBuckets:
+    """
+    Token buckets com os limites de taxa configurados por provider.
+
+    Args:
+        app: Instância do Flask app
+        capacity: Maior rajada (tamanho do lote)
+
+    Returns:
+        Buckets com ``OUTBOX_RATE_LIMITS[provider]`` envios por segundo
+    """
+    rates = app.config.get("OUTBOX_RATE_LIMITS") or {}
+    return ProviderBuckets(rates, capacity, default_rate=DEFAULT_RATE_PER_SECOND)
+
+
+def run_sender(
+    app: Any, *, burst: bool = False, poll_interval: float | None = None
+) -> DrainResult:
+    """
+    Envia os emails da outbox em lotes até o worker ser interrompido.
+
+    Usa um único mailer em sessão (uma conexão SMTP reaproveitada); cada
+    email respeita o limite de taxa do provider com que foi enfileirado. Só
+    um worker de envio deve rodar por vez: ao iniciar, os emails deixados em
+    envio por um worker interrompido voltam para a fila.
+
+    Args:
+        app: Instância do Flask app
+        burst: Se True, sai quando não houver emails vencidos
+        poll_interval: Segundos entre consultas com a outbox vazia
+
+    Returns:
+        Totais enviados, reagendados e com falha definitiva
+    """
+    interval = poll_interval or float(
+        app.config.get("OUTBOX_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)
+    )
+    total = DrainResult()
+    with app.app_context():
+        outbox = OutboxService.for_app(app)
+        released = outbox.release_stale()
+        if released:
+            logger.warning("%d emails da outbox voltaram para a fila", released)
+
+        mailer = Mailer(app)
+        buckets = provider_buckets(app, outbox.batch_size)
+        logger.info(
+            "Worker da outbox: %s, limites %s emails/s, lotes de %d",
+            mailer.provider_name,
+            buckets.rates,
+            outbox.batch_size,
+        )
+        with mailer.session():
+            while True:
+                result = outbox.drain(mailer, buckets)
+                # Sessão nova por lote: o worker roda por tempo indeterminado
+                db.session.remove()
+                total.claimed += result.claimed
+                total.sent += result.sent
+                total.retried += result.retried
+                total.failed += result.failed
+                if result.claimed:
+                    continue
+                if burst:
+                    break
+                time.sleep(interval)
+
+    logger.info(
+        "Worker da outbox: %d enviados, %d reagendados, %d com falha",
+        total.sent,
+        total.retried,
+        total.failed,
+    )
+    return total
@@ -0,0 +1,175 @@
+"""Worker RQ de longa duração com o app Flask pré-carregado.
+
+Os jobs em ``app.tasks`` rodam dentro de ``job_runtime()``. Em um worker
+iniciado por ``flask worker`` (``run_worker``), o app, a conexão com o
+``diarios.db``, o ``Mailer`` e a conexão Redis são criados uma vez por
+processo e cada job só abre um app context novo. Fora desse worker (``rq
+worker`` comum, chamadas diretas), ``job_runtime()`` cria tudo por job, como
+antes.
+"""
+
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any
+
+from prometheus_client import start_http_server
+from redis import Redis
+from rq import Queue, SimpleWorker
+
+from app import create_app
+from app.mailer.mailer import Mailer
+from app.search.source import SearchSource
+from app.utils.metrics import metrics_registry
+from app.utils.profiling import Profiler
+
+DEFAULT_QUEUES = ["default"]
+
+
+class WorkerRuntime:
+    """Recursos compartilhados pelos jobs: app, busca, mailer e Redis."""
+
+    def __init__(self, app: Any, redis: Redis | None = None) -> None:
+        """
+        Inicializa o runtime. Busca e Redis são abertos no primeiro uso.
+
+        Args:
+            app: Instância do Flask app
+            redis: Conexão Redis já aberta (opcional)
+        """
+        self.app = app
+        self.mailer = Mailer(app)
+        self._redis = redis
+        self._source: SearchSource | None = None
+
+    @property
+    def search_db(self) -> str:
+        """Caminho do ``diarios.db``."""
+        diarios_dir = self.app.config.get("DIARIOS_DIR", "diarios")
+        Path(diarios_dir).mkdir(parents=True, exist_ok=True)
+        return str(Path(diarios_dir) / "diarios.db")
+
+    @property
+    def source(self) -> SearchSource:
+        """Conexão com o banco de busca, aberta uma vez."""
+        if self._source is None:
+            self._source = SearchSource(self.search_db)
+        return self._source
+
+    @property
+    def redis(self) -> Redis:
+        """Conexão Redis para enfileirar jobs."""
+        if self._redis is None:
+            self._redis = Redis.from_url(
+                self.app.config.get("REDIS_URL", "redis://localhost:6379/0")
+            )
+        return self._redis
+
+    def close(self) -> None:
+        """Fecha a conexão de busca (a conexão Redis é do pool do cliente)."""
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+
+_runtime: WorkerRuntime | None = None
+
+
+def preload(app: Any, redis: Redis | None = None) -> WorkerRuntime:
+    """
+    Registra o runtime do processo atual para os próximos jobs.
+
+    Args:
+        app: Instância do Flask app já criada
+        redis: Conexão Redis do worker (opcional)
+
+    Returns:
+        Runtime compartilhado
+    """
+    global _runtime  # noqa: PLW0603
+    if _runtime is not None:
+        _runtime.close()
+    _runtime = WorkerRuntime(app, redis)
+    return _runtime
+
+
+def shutdown() -> None:
+    """Fecha e descarta o runtime pré-carregado."""
+    global _runtime  # noqa: PLW0603
+    if _runtime is not None:
+        _runtime.close()
+        _runtime = None
+
+
+@contextmanager
+def job_runtime(name: str | None = None) -> Iterator[WorkerRuntime]:
+    """
+    Contexto de execução de um job.
+
+    Com runtime pré-carregado, reutiliza seus recursos e só empilha um app
+    context novo (a sessão do banco é descartada ao final de cada job). Sem
+    ele, cria app e recursos para este job e os fecha ao final.
+
+    Args:
+        name: Nome do job, para perfilá-lo se estiver em ``PROFILE_JOBS``
+
+    Yields:
+        Runtime com app context ativo
+    """
+    runtime = _runtime
+    if runtime is not None:
+        with runtime.app.app_context(), _profile(runtime.app, name):
+            yield runtime
+        return
+
+    app = create_app()
+    with app.app_context(), _profile(app, name):
+        runtime = WorkerRuntime(app)
+        try:
+            yield runtime
+        finally:
+            runtime.close()
+
+
+def _profile(app: Any, name: str | None) -> AbstractContextManager[None]:
+    return Profiler.for_app(app).profile(name) if name else nullcontext()
+
+
+class PreloadedWorker(SimpleWorker):
+    """
+    Worker que executa os jobs no próprio processo, sem fork.
+
+    Sem fork, o app e as conexões pré-carregadas sobrevivem entre jobs
+    (conexões SQLite não podem atravessar um fork).
+    """
+
+
+def run_worker(
+    app: Any,
+    queues: list[str] | None = None,
+    *,
+    burst: bool = False,
+    metrics_port: int | None = None,
+) -> None:
+    """
+    Pré-carrega o runtime e processa jobs até o worker ser interrompido.
+
+    Args:
+        app: Instância do Flask app
+        queues: Filas para escutar (padrão: ``default``)
+        burst: Se True, sai quando as filas estiverem vazias
+        metrics_port: Porta para expor as métricas do worker (ou, em modo
+            multiprocesso, de todos os processos do diretório compartilhado)
+    """
+    if metrics_port:
+        start_http_server(metrics_port, registry=metrics_registry())
+    redis = Redis.from_url(app.config.get("REDIS_URL", "redis://localhost:6379/0"))
+    preload(app, redis)
+    try:
+        worker = PreloadedWorker(
+            [Queue(name, connection=redis) for name in queues or DEFAULT_QUEUES],
+            connection=redis,
+        )
+        worker.work(burst=burst)
+    finally:
+        shutdown()
@@ -17,7 +17,18 @@ def init_db(app: Any) -> None:
         inspector = db.inspect(db.engine)
         existing_tables = inspector.get_table_names()
 
-        tables_to_create = ["search_configs", "search_terms"]
+        tables_to_create = [
+            "search_configs",
+            "search_terms",
+            "pipeline_runs",
+            "pipeline_run_stages",
+            "pipeline_run_configs",
+            "pipeline_run_stage_metrics",
+            "notification_deliveries",
+            "email_outbox",
+            "email_outbox_attachments",
+            "search_config_versions",
+        ]
         missing_tables = [t for t in tables_to_create if t not in existing_tables]
 
         if missing_tables:
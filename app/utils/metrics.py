@@ -0,0 +1,170 @@
+"""Métricas no formato do Prometheus para o web e os workers.
+
+As métricas são globais do processo. Com ``PROMETHEUS_MULTIPROC_DIR``
+definido (antes de iniciar o processo), cada processo grava seus valores em
+arquivos nesse diretório e ``metrics_registry()`` soma todos: os workers do
+Gunicorn e os workers do RQ que compartilham o diretório aparecem juntos no
+``/metrics`` de qualquer um deles.
+"""
+
+import os
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Os valores são gravados em arquivos no diretório já no primeiro uso
+if _multiproc_dir := os.getenv(MULTIPROC_DIR_ENV):
+    Path(_multiproc_dir).mkdir(parents=True, exist_ok=True)
+
+# O download do caderno leva dezenas de segundos
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "notificador_http_request_duration_seconds",
+    "Duração das requisições HTTP por rota (endpoint do blueprint)",
+    ["endpoint", "method", "status"],
+)
+FTS_QUERY_SECONDS = Histogram(
+    "notificador_fts_query_duration_seconds",
+    "Duração das buscas FTS5 no diarios.db",
+    ["method"],
+)
+IOF_REQUEST_SECONDS = Histogram(
+    "notificador_iof_request_duration_seconds",
+    "Duração das chamadas à API do IOF por status HTTP",
+    ["status"],
+    buckets=SLOW_BUCKETS,
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "notificador_email_send_duration_seconds",
+    "Duração dos envios de email por provider",
+    ["provider", "outcome"],
+)
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels: str) -> Iterator[dict[str, str]]:
+    """
+    Mede a duração do bloco em ``histogram``.
+
+    Os labels entregues ao bloco podem ser alterados antes de ele terminar
+    (ex.: o status da resposta), inclusive quando o bloco levanta exceção.
+
+    Example:
+        with observe(IOF_REQUEST_SECONDS, status="error") as labels:
+            response = requests.get(url, timeout=30)
+            labels["status"] = str(response.status_code)
+    """
+    started = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - started)
+
+
+class SQLiteFilesCollector(Collector):
+    """Tamanho dos arquivos SQLite (banco e WAL), lido a cada coleta."""
+
+    def __init__(self, databases: dict[str, str]) -> None:
+        """
+        Args:
+            databases: Caminho do arquivo por nome do banco (ex.: ``diarios``)
+        """
+        self.databases = databases
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        gauge = GaugeMetricFamily(
+            "notificador_sqlite_file_bytes",
+            "Tamanho dos arquivos SQLite em bytes",
+            labels=["database", "file"],
+        )
+        for name, path in self.databases.items():
+            for file, suffix in (("db", ""), ("wal", "-wal")):
+                try:
+                    size = Path(f"{path}{suffix}").stat().st_size
+                except OSError:
+                    continue
+                gauge.add_metric([name, file], size)
+        yield gauge
+
+
+def sqlite_databases(app: Flask) -> dict[str, str]:
+    """Arquivos SQLite do app: o banco principal (se SQLite) e o diarios.db."""
+    databases = {
+        "diarios": str(Path(app.config.get("DIARIOS_DIR", "diarios")) / "diarios.db")
+    }
+    uri = str(app.config.get("SQLALCHEMY_DATABASE_URI", ""))
+    if uri.startswith("sqlite:///"):
+        databases["app"] = uri.removeprefix("sqlite:///")
+    return databases
+
+
+def metrics_registry(multiproc_dir: str | None = None) -> CollectorRegistry:
+    """
+    Registry com as métricas a expor.
+
+    Em modo multiprocesso, soma os arquivos de todos os processos; senão,
+    usa o registry padrão (métricas do processo atual).
+
+    Args:
+        multiproc_dir: Diretório multiprocesso (padrão: ``PROMETHEUS_MULTIPROC_DIR``)
+    """
+    multiproc_dir = multiproc_dir or os.getenv(MULTIPROC_DIR_ENV)
+    if not multiproc_dir:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=multiproc_dir)  # type: ignore[no-untyped-call]
+    return registry
+
+
+def metrics_response(app: Flask) -> Response:
+    """Resposta do ``/metrics`` no formato de texto do Prometheus."""
+    # Os tamanhos dos arquivos são lidos agora, por quem atende a coleta
+    files = CollectorRegistry()
+    files.register(SQLiteFilesCollector(sqlite_databases(app)))
+    return Response(
+        generate_latest(metrics_registry()) + generate_latest(files),
+        mimetype=CONTENT_TYPE_LATEST,
+    )
+
+
+def instrument_app(app: Flask) -> None:
+    """Mede a duração de cada requisição do app por endpoint."""
+
+    def start_timer() -> None:
+        g.metrics_started = time.perf_counter()
+
+    def record_request(response: Any) -> Any:
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            HTTP_REQUEST_SECONDS.labels(
+                endpoint=request.endpoint or "unmatched",
+                method=request.method,
+                status=str(response.status_code),
+            ).observe(time.perf_counter() - started)
+        return response
+
+    app.before_request(start_timer)
+    app.after_request(record_request)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Descarta os gauges de um processo encerrado (hook do Gunicorn)."""
+    if os.getenv(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(pid)  # type: ignore[no-untyped-call]
@@ -0,0 +1,253 @@
+"""Profiling opcional de requisições, jobs e da ingestão do diário.
+
+Com ``PROFILING=true``, requisições e jobs escolhidos rodam sob o cProfile
+e a ingestão pode ser acompanhada pelo tracemalloc. Os perfis vão para
+``PROFILE_DIR`` (padrão ``DIARIOS_DIR/profiles``):
+
+- ``<timestamp>-<nome>.prof``: estatísticas do cProfile (``python -m pstats``,
+  snakeviz);
+- ``<timestamp>-<nome>.mem.txt``: pico de memória e as linhas que mais
+  alocaram.
+
+Só os ``PROFILE_MAX_FILES`` arquivos mais novos são mantidos.
+"""
+
+import cProfile
+import hmac
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, g, request
+
+logger = logging.getLogger(__name__)
+
+# Header que liga o profiling de uma requisição (valor: a API_KEY)
+PROFILE_HEADER = "X-Profile"
+# Header da resposta com o nome do perfil gravado
+PROFILE_FILE_HEADER = "X-Profile-File"
+ALL = "*"
+# Linhas do tracemalloc no relatório de memória
+MEMORY_TOP_LINES = 25
+
+# O cProfile admite um profiler ativo por vez no processo
+_profile_lock = threading.Lock()
+
+
+class Profiler:
+    """Grava perfis de CPU e memória com retenção limitada."""
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        enabled: bool = True,
+        routes: frozenset[str] = frozenset(),
+        jobs: frozenset[str] = frozenset(),
+        trace_memory: bool = False,
+        max_files: int = 50,
+    ) -> None:
+        """
+        Args:
+            directory: Diretório dos perfis
+            enabled: Se False, nada é perfilado
+            routes: Endpoints perfilados em toda requisição (``*``: todos)
+            jobs: Jobs perfilados (``*``: todos)
+            trace_memory: Snapshot do tracemalloc na ingestão
+            max_files: Arquivos mantidos no diretório
+        """
+        self.directory = directory
+        self.enabled = enabled
+        self.routes = routes
+        self.jobs = jobs
+        self.trace_memory = trace_memory
+        self.max_files = max_files
+
+    @classmethod
+    def for_app(cls, app: Any) -> "Profiler":
+        """Cria o profiler com as configurações ``PROFILE_*`` do app."""
+        directory = app.config.get("PROFILE_DIR") or (
+            Path(app.config.get("DIARIOS_DIR", "diarios")) / "profiles"
+        )
+        return cls(
+            Path(directory),
+            enabled=bool(app.config.get("PROFILING")),
+            routes=frozenset(app.config.get("PROFILE_ROUTES", ())),
+            jobs=frozenset(app.config.get("PROFILE_JOBS", ())),
+            trace_memory=bool(app.config.get("PROFILE_TRACEMALLOC")),
+            max_files=int(app.config.get("PROFILE_MAX_FILES", 50)),
+        )
+
+    def wants_route(self, endpoint: str | None) -> bool:
+        """Se o endpoint é perfilado em toda requisição."""
+        return self.enabled and (ALL in self.routes or endpoint in self.routes)
+
+    def wants_job(self, name: str) -> bool:
+        """Se o job é perfilado."""
+        return self.enabled and (ALL in self.jobs or name in self.jobs)
+
+    def start(self) -> cProfile.Profile | None:
+        """
+        Liga o cProfile na thread atual.
+
+        Returns:
+            O profile ativo, ou None se outro perfil já estiver rodando
+        """
+        if not _profile_lock.acquire(blocking=False):
+            logger.warning("Profiling ignorado: outro perfil em andamento")
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Outra ferramenta (ex.: um debugger) já usa o sys.monitoring
+            _profile_lock.release()
+            logger.warning("Profiling ignorado: profiler do Python ocupado")
+            return None
+        return profile
+
+    def stop(self, profile: cProfile.Profile, name: str, elapsed: float) -> Path:
+        """
+        Desliga o cProfile e grava o perfil.
+
+        Args:
+            profile: Retorno de ``start``
+            name: Nome do perfil (rota ou job)
+            elapsed: Duração total, em segundos, para o log
+
+        Returns:
+            Caminho do arquivo ``.prof``
+        """
+        try:
+            profile.disable()
+        finally:
+            _profile_lock.release()
+        path = self._path(name, ".prof")
+        profile.dump_stats(path)
+        self._prune()
+        logger.info("Perfil de %s (%.2fs) gravado em %s", name, elapsed, path)
+        return path
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Perfila o bloco com o cProfile, se o job ``name`` for perfilado."""
+        profile = self.start() if self.wants_job(name) else None
+        if profile is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stop(profile, name, time.perf_counter() - started)
+
+    @contextmanager
+    def memory(self, name: str) -> Iterator[None]:
+        """
+        Grava o pico de memória e as linhas que mais alocaram no bloco.
+
+        Não faz nada sem ``PROFILE_TRACEMALLOC``. Se o tracemalloc já estiver
+        ligado, só tira o snapshot no fim.
+        """
+        if not (self.enabled and self.trace_memory):
+            yield
+            return
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if owns_tracing:
+                tracemalloc.stop()
+            self._write_memory_report(name, snapshot, current, peak)
+
+    def _write_memory_report(
+        self, name: str, snapshot: tracemalloc.Snapshot, current: int, peak: int
+    ) -> None:
+        snapshot = snapshot.filter_traces(
+            [tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)]
+        )
+        lines = [
+            (
+                f"{name}: atual {current / 1024 / 1024:.1f} MiB, "
+                f"pico {peak / 1024 / 1024:.1f} MiB"
+            ),
+            "",
+            *(str(stat) for stat in snapshot.statistics("lineno")[:MEMORY_TOP_LINES]),
+        ]
+        path = self._path(name, ".mem.txt")
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self._prune()
+        logger.info("Memória de %s: pico %.1f MiB (%s)", name, peak / 1024 / 1024, path)
+
+    def _path(self, name: str, suffix: str) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "perfil"
+        return self.directory / f"{stamp}-{safe_name}{suffix}"
+
+    def _prune(self) -> None:
+        """Remove os perfis mais antigos além de ``max_files``."""
+        files = sorted(
+            (path for path in self.directory.iterdir() if path.is_file()),
+            key=lambda path: path.name,
+            reverse=True,
+        )
+        for path in files[self.max_files :]:
+            path.unlink(missing_ok=True)
+
+
+def instrument_app(app: Flask) -> None:
+    """
+    Perfila as requisições das rotas em ``PROFILE_ROUTES`` ou com o header
+    ``X-Profile: <API_KEY>``, se ``PROFILING`` estiver ligado.
+    """
+
+    def start_profile() -> None:
+        profiler = Profiler.for_app(app)
+        if not profiler.enabled:
+            return
+        if not (profiler.wants_route(request.endpoint) or _header_authorized(app)):
+            return
+        profile = profiler.start()
+        if profile is not None:
+            g.profile = (profiler, profile, time.perf_counter())
+
+    def save_profile(response: Any) -> Any:
+        active = g.pop("profile", None)
+        if active is not None:
+            profiler, profile, started = active
+            name = f"{request.method}-{request.endpoint or request.path}"
+            path = profiler.stop(profile, name, time.perf_counter() - started)
+            response.headers[PROFILE_FILE_HEADER] = path.name
+        return response
+
+    def release_profile(_error: BaseException | None) -> None:
+        # Requisição interrompida antes do after_request: não prender o lock
+        active = g.pop("profile", None)
+        if active is not None:
+            active[1].disable()
+            _profile_lock.release()
+
+    app.before_request(start_profile)
+    app.after_request(save_profile)
+    app.teardown_request(release_profile)
+
+
+def _header_authorized(app: Flask) -> bool:
+    """Header ``X-Profile`` igual à API_KEY do servidor."""
+    provided = request.headers.get(PROFILE_HEADER, "")
+    expected = os.getenv("API_KEY", app.config.get("API_KEY", ""))
+    return bool(provided and expected) and hmac.compare_digest(provided, expected)
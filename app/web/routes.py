@@ -23,6 +23,7 @@ from app.mailer.notification import build_notification_emails
 from app.mailer.unsubscribe import load_unsubscribe_token
 from app.repositories.search_config_repository import SearchConfigRepository
 from app.schemas.search_config import SearchConfigCreate, SearchConfigUpdate
+from app.search.query import TermSyntax
 from app.search.source import Pagina as SearchPagina
 from app.search.source import SearchSource, Term, Trigger
 from app.services.search_service import SearchService
@@ -142,10 +143,16 @@ def edit_config(config_id: int) -> Any:
     if request.method == "POST":
         data = request.form.to_dict()
 
-        # Processar termos
+        # Processar termos (o formulário só envia o texto; termos já existentes
+        # mantêm a sintaxe cadastrada via API)
+        existing_syntax = {t.term: t.syntax for t in config.terms}
         term_inputs = request.form.getlist("term")
         terms = [
-            {"term": stripped_term, "exact": True}
+            {
+                "term": stripped_term,
+                "exact": True,
+                "syntax": existing_syntax.get(stripped_term, TermSyntax.EXACT),
+            }
             for term_text in term_inputs
             if (stripped_term := term_text.strip())
         ]
@@ -205,7 +212,9 @@ def edit_config(config_id: int) -> Any:
         "mail_to": config.mail_to,
         "mail_subject": config.mail_subject,
         "teams_webhook": "",  # Teams removido da interface
-        "terms": [{"term": t.term, "exact": True} for t in config.terms],
+        "terms": [
+            {"term": t.term, "exact": True, "syntax": t.syntax} for t in config.terms
+        ],
         "active": config.active,
     }
 
@@ -549,8 +558,15 @@ def backtest_config(config_id: int) -> Any:
         if not _ensure_pages_exist(source, test_date):
             return _render_backtest(config)
 
-        search_terms = [Term(term=t.term, exact=True) for t in config.terms]
-        report = source.lookup(Trigger.BACKTEST, test_date, search_terms)
+        search_terms = [
+            Term(term=t.term, exact=True, syntax=t.syntax) for t in config.terms
+        ]
+        report = source.lookup(
+            Trigger.BACKTEST,
+            test_date,
+            search_terms,
+            limit_per_term=config.max_highlights_per_term,
+        )
 
         result = {
             "publish_date": report.publish_date.isoformat(),
@@ -564,7 +580,8 @@ def backtest_config(config_id: int) -> Any:
                 for h in report.highlights
             ],
             "search_terms": [
-                {"term": t.term, "exact": True} for t in report.search_terms
+                {"term": t.term, "exact": True, "syntax": t.syntax}
+                for t in report.search_terms
             ],
             "trigger": report.trigger.value,
             "count": report.count,
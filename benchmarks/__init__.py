@@ -0,0 +1 @@
+"""Benchmarks manuais (não fazem parte da suíte de testes)."""
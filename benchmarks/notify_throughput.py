@@ -0,0 +1,141 @@
+"""Mede a vazão ponta a ponta das notificações com o provider ``memory``.
+
+Cria N configurações com M destinatários cada, todas com match no diário
+da data, e passa as N configurações pelo pipeline real de notificação: busca
+no ``diarios.db``, ledger de entregas, montagem dos emails e envio em jobs
+de ``NOTIFY_CHUNK_SIZE`` configurações (como no worker pré-carregado). O
+provider ``memory`` grava os emails em vez de enviá-los; ``--latency-ms`` e
+``--error-rate`` simulam um serviço de email lento ou instável. Com
+``--outbox``, os jobs gravam na outbox e o worker de envio mede à parte.
+Não precisa de Redis nem de servidor de email.
+
+Uso:
+    uv run python -m benchmarks.notify_throughput --configs 200 --recipients 5
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+PUBLISH_DATE = date(2026, 1, 14)
+
+
+def _seed(app: Any, configs: int, recipients: int, pages: int) -> list[int]:
+    from app.extensions import db  # noqa: PLC0415
+    from app.models import SearchConfig, SearchTerm, User  # noqa: PLC0415
+    from app.search.source import Pagina, SearchSource  # noqa: PLC0415
+
+    with SearchSource(str(Path(app.config["DIARIOS_DIR"]) / "diarios.db")) as src:
+        src.import_pages(
+            [
+                Pagina("", n, "", f"Aviso de licitação pública nº {n}.", PUBLISH_DATE)
+                for n in range(1, pages + 1)
+            ]
+        )
+
+    with app.app_context():
+        user = User(email="benchmark@example.com", auth_provider="local")
+        db.session.add(user)
+        db.session.flush()
+        for n in range(configs):
+            config = SearchConfig(
+                user_id=user.id,
+                label=f"alerta-{n}",
+                attach_csv=n % 2 == 0,
+                mail_to=[f"pessoa{n}-{m}@example.com" for m in range(recipients)],
+                mail_subject="",
+                active=True,
+            )
+            config.terms.append(SearchTerm(term="licitação", exact=True))
+            db.session.add(config)
+        db.session.commit()
+        return [config.id for config in SearchConfig.query.all()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=100)
+    parser.add_argument("--recipients", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--outbox", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APP_ENV"] = "testing"
+        os.environ["DIARIOS_DIR"] = tmp
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/local.db"
+        os.environ["MAIL_PROVIDER"] = "memory"
+
+        from app import create_app  # noqa: PLC0415
+        from app.extensions import db  # noqa: PLC0415
+        from app.tasks import worker  # noqa: PLC0415
+        from app.tasks.notify import notify_search_configs  # noqa: PLC0415
+        from app.tasks.outbox import run_sender  # noqa: PLC0415
+
+        app = create_app()
+        # Um log por config distorce a medição
+        logging.getLogger("app").setLevel(logging.WARNING)
+        app.config.update(
+            MAIL_PROVIDER="memory",
+            MAIL_SINK_LATENCY_MS=args.latency_ms,
+            MAIL_SINK_ERROR_RATE=args.error_rate,
+            MAIL_SINK_SEED=42,
+            NOTIFY_OUTBOX=args.outbox,
+            OUTBOX_RATE_LIMITS={"memory": 1_000_000},
+            OUTBOX_BATCH_SIZE=100,
+        )
+        with app.app_context():
+            db.create_all()
+        config_ids = _seed(app, args.configs, args.recipients, args.pages)
+
+        runtime = worker.preload(app)
+        failed = 0
+        try:
+            started = time.perf_counter()
+            for start in range(0, len(config_ids), args.chunk_size):
+                chunk = config_ids[start : start + args.chunk_size]
+                summary = notify_search_configs(PUBLISH_DATE.isoformat(), chunk)
+                failed += len(summary["failed"])
+            elapsed = time.perf_counter() - started
+        finally:
+            worker.shutdown()
+
+        sender_elapsed = 0.0
+        if args.outbox:
+            started = time.perf_counter()
+            result = run_sender(app, burst=True)
+            sender_elapsed = time.perf_counter() - started
+            failed = result.retried + result.failed
+            sent = result.sent
+        else:
+            sent = len(runtime.mailer.provider.sent)  # type: ignore[attr-defined]
+
+    total = args.configs * args.recipients
+    print(  # noqa: T201
+        f"{args.configs} configs x {args.recipients} destinatários = {total} emails"
+    )
+    print(  # noqa: T201
+        f"Notificação: {elapsed:.2f}s ({args.configs / elapsed:.1f} configs/s)"
+    )
+    if args.outbox:
+        print(  # noqa: T201
+            f"Worker da outbox: {sender_elapsed:.2f}s "
+            f"({sent / sender_elapsed:.1f} emails/s)"
+        )
+        elapsed += sender_elapsed
+    print(  # noqa: T201
+        f"Ponta a ponta: {sent} enviados, {failed} com erro, "
+        f"{sent / elapsed:.1f} emails/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
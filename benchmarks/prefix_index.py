@@ -0,0 +1,180 @@
+"""Compara a latência de consultas por prefixo com e sem índices de prefixo.
+
+Gera um acervo sintético de vários anos no formato do ``diarios.db``, cria uma
+cópia reindexada sem ``prefix=`` e mede as mesmas consultas nos dois bancos:
+a consulta do ``lookup`` (filtrada por data) e uma contagem no acervo inteiro.
+
+Uso:
+    uv run python -m benchmarks.prefix_index --years 3 --pages 40
+"""
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from functools import partial
+from pathlib import Path
+
+from app.search.source import Pagina, SearchSource, Term
+
+STEMS = [
+    "licita",
+    "contrat",
+    "nomea",
+    "exonera",
+    "aposent",
+    "convoca",
+    "homolog",
+    "adjudica",
+    "pregão",
+    "portaria",
+    "resolu",
+    "decret",
+]
+SUFFIXES = ["ção", "ções", "nte", "do", "da", "tório", "r", "mento", "dos"]
+FILLER = [
+    "secretaria",
+    "estado",
+    "minas",
+    "gerais",
+    "governo",
+    "servidor",
+    "processo",
+    "sei",
+    "número",
+    "unidade",
+    "diretoria",
+    "superintendência",
+    "fundação",
+    "instituto",
+    "edital",
+    "extrato",
+    "termo",
+]
+PREFIX_QUERIES = ["li*", "lic*", "licita*", "contrat*", "aposent*", "ho*"]
+
+
+def _vocabulary() -> list[str]:
+    return [stem + suffix for stem in STEMS for suffix in SUFFIXES] + FILLER
+
+
+def build_corpus(
+    db_path: Path, *, years: int, pages: int, words: int, seed: int
+) -> list[date]:
+    """Cria um diarios.db com edições em dias úteis de ``years`` anos."""
+    rng = random.Random(seed)  # noqa: S311
+    vocabulary = _vocabulary()
+    dates: list[date] = []
+    day = date(2026, 1, 1) - timedelta(days=365 * years)
+    with SearchSource(str(db_path)) as source:
+        while day < date(2026, 1, 1):
+            if day.weekday() < 5:
+                dates.append(day)
+                source.import_pages(
+                    [
+                        Pagina(
+                            titulo="",
+                            num_pagina=page,
+                            descricao="",
+                            conteudo=" ".join(rng.choices(vocabulary, k=words)),
+                            data_publicacao=day,
+                        )
+                        for page in range(1, pages + 1)
+                    ]
+                )
+            day += timedelta(days=1)
+    return dates
+
+
+def _median_ms(func: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def measure(db_path: Path, dates: list[date], repeat: int) -> dict[str, list[float]]:
+    """Mede (lookup por data, contagem no acervo) para cada consulta."""
+    results: dict[str, list[float]] = {}
+    probe_dates = dates[:: max(1, len(dates) // repeat)][:repeat]
+    with SearchSource(str(db_path)) as source:
+        for query in PREFIX_QUERIES:
+            terms = [Term(term=query)]
+            match = terms[0].match_expression()
+
+            def count_on(day: date, terms: list[Term] = terms) -> None:
+                source.count_matches(day, terms)
+
+            def count_corpus(match: str = match) -> None:
+                source.conn.execute(
+                    "SELECT COUNT(*) FROM documentos_fts WHERE documentos_fts MATCH ?",
+                    (match,),
+                ).fetchone()
+
+            per_date = statistics.median(
+                _median_ms(partial(count_on, d), 1) for d in probe_dates
+            )
+            corpus = _median_ms(count_corpus, repeat)
+            results[query] = [per_date, corpus]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=20, help="páginas por edição")
+    parser.add_argument("--words", type=int, default=250, help="palavras por página")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with_prefix = Path(tmp) / "with_prefix.db"
+        without_prefix = Path(tmp) / "without_prefix.db"
+
+        started = time.perf_counter()
+        dates = build_corpus(
+            with_prefix,
+            years=args.years,
+            pages=args.pages,
+            words=args.words,
+            seed=args.seed,
+        )
+        print(  # noqa: T201
+            f"Acervo: {len(dates)} edições x {args.pages} páginas "
+            f"({time.perf_counter() - started:.1f}s para gerar)"
+        )
+
+        shutil.copyfile(with_prefix, without_prefix)
+        with SearchSource(str(without_prefix)) as source:
+            source.reindex(prefix=None)
+        with SearchSource(str(with_prefix)) as source:
+            source.reindex()
+
+        baseline = measure(without_prefix, dates, args.repeat)
+        indexed = measure(with_prefix, dates, args.repeat)
+
+    print(  # noqa: T201
+        f"{'consulta':<12}{'data s/ idx':>14}{'data c/ idx':>14}"
+        f"{'acervo s/ idx':>16}{'acervo c/ idx':>16}{'ganho':>9}"
+    )
+    for query in PREFIX_QUERIES:
+        (date_base, corpus_base), (date_idx, corpus_idx) = (
+            baseline[query],
+            indexed[query],
+        )
+        print(  # noqa: T201
+            f"{query:<12}{date_base:>12.2f}ms{date_idx:>12.2f}ms"
+            f"{corpus_base:>14.2f}ms{corpus_idx:>14.2f}ms"
+            f"{corpus_base / corpus_idx:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
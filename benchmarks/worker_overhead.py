@@ -0,0 +1,79 @@
+"""Mede o overhead por job com e sem o runtime pré-carregado do worker.
+
+Executa um job mínimo (abre o contexto do job, consulta o banco de
+configurações e o ``diarios.db``) repetidas vezes em dois modos: como um
+``rq worker`` comum, em que cada job cria o app com ``create_app()`` e abre as
+conexões, e como ``flask worker``, em que app e conexões são criados uma vez.
+Não precisa de Redis.
+
+Uso:
+    uv run python -m benchmarks.worker_overhead --jobs 200
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date
+
+
+def _job() -> None:
+    from app.models.search_config import SearchConfig  # noqa: PLC0415
+    from app.tasks.worker import job_runtime  # noqa: PLC0415
+
+    with job_runtime() as runtime:
+        SearchConfig.query.count()
+        runtime.source.has_pages(date(2026, 1, 14))
+
+
+def _measure(func: Callable[[], None], jobs: int) -> list[float]:
+    samples = []
+    for _ in range(jobs):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["APP_ENV"] = "testing"
+        os.environ["DIARIOS_DIR"] = tmp
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/local.db"
+
+        from app import create_app  # noqa: PLC0415
+        from app.extensions import db  # noqa: PLC0415
+        from app.tasks import worker  # noqa: PLC0415
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+
+        cold = _measure(_job, args.jobs)
+
+        worker.preload(app)
+        try:
+            _job()  # primeira abertura do diarios.db fica fora da medição
+            warm = _measure(_job, args.jobs)
+        finally:
+            worker.shutdown()
+
+    print(f"{'modo':<24}{'mediana':>12}{'p95':>12}")  # noqa: T201
+    for label, samples in (("create_app por job", cold), ("pré-carregado", warm)):
+        p95 = statistics.quantiles(samples, n=20)[-1]
+        print(  # noqa: T201
+            f"{label:<24}{statistics.median(samples):>10.2f}ms{p95:>10.2f}ms"
+        )
+    print(  # noqa: T201
+        f"Ganho na mediana: {statistics.median(cold) / statistics.median(warm):.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -70,6 +70,10 @@ with app.app_context():
         print(f'[db_init] Aviso: {e}')
 PY
 
+# Índices de prefixo do FTS5 (no-op se o diarios.db já estiver atualizado)
+echo "Verificando índice de busca (prefixos FTS5)..."
+flask --app wsgi:application reindex-search || echo "[reindex-search] Aviso: falhou"
+
 # Diagnóstico: se for SQLite, verificar arquivo; se for Postgres, não há arquivo local.
 if [[ "${DATABASE_URL}" == sqlite:////* ]]; then
   DB_PATH="/${DATABASE_URL#sqlite:////}"
@@ -82,6 +86,12 @@ else
   echo "Banco configurado via DATABASE_URL (nao-SQLite)."
 fi
 
+# Métricas multiprocesso: os arquivos da execução anterior não valem mais
+if [ -n "${PROMETHEUS_MULTIPROC_DIR:-}" ]; then
+  rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+  mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+
 # =========================================================
 # Iniciar Gunicorn
 # =========================================================
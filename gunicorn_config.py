@@ -2,6 +2,7 @@
 
 import multiprocessing
 import os
+from typing import Any
 
 # Bind address e porta
 bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
@@ -42,3 +43,10 @@ max_requests_jitter = 50
 
 # Graceful timeout
 graceful_timeout = 30
+
+
+def child_exit(_server: Any, worker: Any) -> None:
+    """Descarta as métricas do worker encerrado (PROMETHEUS_MULTIPROC_DIR)."""
+    from app.utils.metrics import mark_process_dead  # noqa: PLC0415
+
+    mark_process_dead(worker.pid)
@@ -0,0 +1,41 @@
+"""add max_highlights_per_term to search_configs
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "search_configs" not in inspector.get_table_names():
+        return
+
+    columns = [column["name"] for column in inspector.get_columns("search_configs")]
+    if "max_highlights_per_term" not in columns:
+        op.add_column(
+            "search_configs",
+            sa.Column("max_highlights_per_term", sa.Integer(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "search_configs" not in inspector.get_table_names():
+        return
+
+    columns = [column["name"] for column in inspector.get_columns("search_configs")]
+    if "max_highlights_per_term" in columns:
+        op.drop_column("search_configs", "max_highlights_per_term")
@@ -0,0 +1,43 @@
+"""add syntax to search_terms
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "search_terms" not in inspector.get_table_names():
+        return
+
+    columns = [column["name"] for column in inspector.get_columns("search_terms")]
+    if "syntax" not in columns:
+        op.add_column(
+            "search_terms",
+            sa.Column(
+                "syntax", sa.String(length=16), nullable=False, server_default="exact"
+            ),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "search_terms" not in inspector.get_table_names():
+        return
+
+    columns = [column["name"] for column in inspector.get_columns("search_terms")]
+    if "syntax" in columns:
+        op.drop_column("search_terms", "syntax")
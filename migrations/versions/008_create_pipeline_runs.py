@@ -0,0 +1,91 @@
+"""create pipeline_runs and pipeline_run_stages
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    existing_tables = inspector.get_table_names()
+
+    if "pipeline_runs" not in existing_tables:
+        op.create_table(
+            "pipeline_runs",
+            sa.Column("id", sa.String(length=32), nullable=False, primary_key=True),
+            sa.Column("publish_date", sa.Date(), nullable=False),
+            sa.Column(
+                "status", sa.String(length=16), nullable=False, server_default="queued"
+            ),
+            sa.Column(
+                "backend", sa.String(length=16), nullable=False, server_default="sync"
+            ),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.text("CURRENT_TIMESTAMP"),
+            ),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ix_pipeline_runs_publish_date", "pipeline_runs", ["publish_date"]
+        )
+
+    if "pipeline_run_stages" not in existing_tables:
+        op.create_table(
+            "pipeline_run_stages",
+            sa.Column(
+                "id", sa.Integer(), autoincrement=True, nullable=False, primary_key=True
+            ),
+            sa.Column(
+                "run_id",
+                sa.String(length=32),
+                sa.ForeignKey("pipeline_runs.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("name", sa.String(length=32), nullable=False),
+            sa.Column(
+                "status", sa.String(length=16), nullable=False, server_default="running"
+            ),
+            sa.Column("done", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("total", sa.Integer(), nullable=True),
+            sa.Column("detail", sa.Text(), nullable=True),
+            sa.Column(
+                "started_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.text("CURRENT_TIMESTAMP"),
+            ),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "ix_pipeline_run_stages_run_id", "pipeline_run_stages", ["run_id"]
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    existing_tables = inspector.get_table_names()
+
+    if "pipeline_run_stages" in existing_tables:
+        op.drop_index("ix_pipeline_run_stages_run_id", table_name="pipeline_run_stages")
+        op.drop_table("pipeline_run_stages")
+    if "pipeline_runs" in existing_tables:
+        op.drop_index("ix_pipeline_runs_publish_date", table_name="pipeline_runs")
+        op.drop_table("pipeline_runs")
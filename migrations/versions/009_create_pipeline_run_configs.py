@@ -0,0 +1,63 @@
+"""create pipeline_run_configs
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "pipeline_run_configs" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "pipeline_run_configs",
+        sa.Column(
+            "id", sa.Integer(), autoincrement=True, nullable=False, primary_key=True
+        ),
+        sa.Column(
+            "run_id",
+            sa.String(length=32),
+            sa.ForeignKey("pipeline_runs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("config_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status", sa.String(length=16), nullable=False, server_default="matched"
+        ),
+        sa.Column("matches", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.UniqueConstraint("run_id", "config_id"),
+    )
+    op.create_index(
+        "ix_pipeline_run_configs_run_id", "pipeline_run_configs", ["run_id"]
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "pipeline_run_configs" not in inspector.get_table_names():
+        return
+
+    op.drop_index("ix_pipeline_run_configs_run_id", table_name="pipeline_run_configs")
+    op.drop_table("pipeline_run_configs")
@@ -0,0 +1,52 @@
+"""create notification_deliveries
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "notification_deliveries" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "notification_deliveries",
+        sa.Column(
+            "id", sa.Integer(), autoincrement=True, nullable=False, primary_key=True
+        ),
+        sa.Column("config_id", sa.Integer(), nullable=False),
+        sa.Column("recipient", sa.String(length=255), nullable=False),
+        sa.Column("publish_date", sa.Date(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("provider", sa.String(length=32), nullable=False),
+        sa.Column("message_id", sa.String(length=255), nullable=True),
+        sa.Column(
+            "delivered_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.UniqueConstraint("config_id", "recipient", "publish_date", "content_hash"),
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "notification_deliveries" not in inspector.get_table_names():
+        return
+
+    op.drop_table("notification_deliveries")
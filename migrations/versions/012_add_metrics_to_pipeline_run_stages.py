@@ -0,0 +1,45 @@
+"""add metrics to pipeline_run_stages
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "pipeline_run_stages" not in inspector.get_table_names():
+        return
+
+    columns = [
+        column["name"] for column in inspector.get_columns("pipeline_run_stages")
+    ]
+    if "metrics" not in columns:
+        op.add_column(
+            "pipeline_run_stages",
+            sa.Column("metrics", sa.JSON(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "pipeline_run_stages" not in inspector.get_table_names():
+        return
+
+    columns = [
+        column["name"] for column in inspector.get_columns("pipeline_run_stages")
+    ]
+    if "metrics" in columns:
+        op.drop_column("pipeline_run_stages", "metrics")
@@ -0,0 +1,37 @@
+"""create search_config_versions
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "search_config_versions" in inspector.get_table_names():
+        return
+
+    table = op.create_table(
+        "search_config_versions",
+        sa.Column("id", sa.Integer(), nullable=False, primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.bulk_insert(table, [{"id": 1, "version": 1}])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "search_config_versions" in inspector.get_table_names():
+        op.drop_table("search_config_versions")
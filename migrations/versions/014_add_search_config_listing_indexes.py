@@ -0,0 +1,59 @@
+"""add search_configs listing indexes and search_terms config index
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "014"
+down_revision = "013"
+branch_labels = None
+depends_on = None
+
+# (nome, tabela, colunas). Os de search_configs servem à paginação por
+# cursor (created_at, id) com e sem o filtro de ativas.
+INDEXES = (
+    ("search_terms_config_idx", "search_terms", ["search_config_id"]),
+    (
+        "ix_search_configs_user_active_created",
+        "search_configs",
+        ["user_id", "active", "created_at", "id"],
+    ),
+    (
+        "ix_search_configs_user_created",
+        "search_configs",
+        ["user_id", "created_at", "id"],
+    ),
+)
+# Prefixo de ix_search_configs_user_active_created
+REPLACED_INDEX = ("ix_search_configs_user_id_active", "search_configs")
+
+
+def _index_names(table: str) -> set[str]:
+    inspector = inspect(op.get_bind())
+    return {str(idx["name"]) for idx in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        if name not in _index_names(table):
+            op.create_index(name, table, columns)
+
+    name, table = REPLACED_INDEX
+    if name in _index_names(table):
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    name, table = REPLACED_INDEX
+    if name not in _index_names(table):
+        op.create_index(name, table, ["user_id", "active"])
+
+    # search_terms_config_idx é da 001 em bancos criados pelas migrations
+    for name, table, _columns in INDEXES[1:]:
+        if name in _index_names(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,61 @@
+"""create pipeline_run_stage_metrics
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "015"
+down_revision = "014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "pipeline_run_stage_metrics" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "pipeline_run_stage_metrics",
+        sa.Column(
+            "id", sa.Integer(), autoincrement=True, nullable=False, primary_key=True
+        ),
+        sa.Column(
+            "stage_id",
+            sa.Integer(),
+            sa.ForeignKey("pipeline_run_stages.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("metrics", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+    op.create_index(
+        "ix_pipeline_run_stage_metrics_stage_id",
+        "pipeline_run_stage_metrics",
+        ["stage_id"],
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "pipeline_run_stage_metrics" not in inspector.get_table_names():
+        return
+
+    op.drop_index(
+        "ix_pipeline_run_stage_metrics_stage_id",
+        table_name="pipeline_run_stage_metrics",
+    )
+    op.drop_table("pipeline_run_stage_metrics")
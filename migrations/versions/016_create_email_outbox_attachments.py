@@ -0,0 +1,47 @@
+"""create email_outbox_attachments
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "016"
+down_revision = "015"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "email_outbox_attachments" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "email_outbox_attachments",
+        sa.Column(
+            "id", sa.Integer(), autoincrement=True, nullable=False, primary_key=True
+        ),
+        sa.Column("digest", sa.String(length=64), nullable=False, unique=True),
+        sa.Column("content", sa.LargeBinary(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "email_outbox_attachments" not in inspector.get_table_names():
+        return
+
+    op.drop_table("email_outbox_attachments")
@@ -0,0 +1,41 @@
+"""add notify_digest to users
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "017"
+down_revision = "016"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "users" not in inspector.get_table_names():
+        return
+
+    columns = [column["name"] for column in inspector.get_columns("users")]
+    if "notify_digest" not in columns:
+        op.add_column(
+            "users",
+            sa.Column("notify_digest", sa.Boolean(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if "users" not in inspector.get_table_names():
+        return
+
+    columns = [column["name"] for column in inspector.get_columns("users")]
+    if "notify_digest" in columns:
+        op.drop_column("users", "notify_digest")
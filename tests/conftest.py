@@ -1,11 +1,17 @@
 """Configuração de testes e fixtures."""
 
+import json
 import os
-from collections.abc import Generator
+import threading
+from collections.abc import Callable, Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
 
 import pytest
 from flask import Flask
 from flask.testing import FlaskClient, FlaskCliRunner
+from sqlalchemy import event
 
 from app import create_app
 from app.extensions import db
@@ -94,3 +100,77 @@ def sample_config(app: Flask, test_user: User) -> SearchConfig:
 def runner(app: Flask) -> FlaskCliRunner:
     """Test runner do Flask."""
     return app.test_cli_runner()
+
+
+class WebhookStandIn:
+    """Servidor HTTP local no lugar de um webhook (ex.: Teams)."""
+
+    def __init__(self) -> None:
+        self.requests: list[Any] = []
+        # Status das próximas respostas (depois, 200)
+        self.statuses: list[int] = []
+        # Se definido, cada resposta espera o evento (webhook lento)
+        self.release: threading.Event | None = None
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                stand_in.requests.append(json.loads(self.rfile.read(length)))
+                if stand_in.release is not None:
+                    stand_in.release.wait(timeout=10)
+                status = stand_in.statuses.pop(0) if stand_in.statuses else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/webhook"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        if self.release is not None:
+            self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def webhook_server() -> Generator[WebhookStandIn]:
+    """Webhook HTTP local que registra os POSTs recebidos."""
+    server = WebhookStandIn()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def count_queries(app: Flask) -> Callable[[], AbstractContextManager[list[str]]]:
+    """
+    Conta as consultas SQL executadas no banco do app dentro de um bloco.
+
+    Example:
+        with count_queries() as queries:
+            client.get("/api/search/configs")
+        assert len(queries) == 3
+    """
+
+    @contextmanager
+    def counting() -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def record(_conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+            statements.append(statement)
+
+        # Sem objetos já carregados na sessão: cada acesso lazy vira consulta
+        db.session.expire_all()
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+    return counting
@@ -282,6 +282,23 @@ def test_api_configs_require_login(client: Any) -> None:
     assert response_post.status_code == 401
 
 
+def test_user_digest_preference_api(app: Any, client_logged_in: Any) -> None:
+    """Preferência de resumo: null segue NOTIFY_DIGEST."""
+    app.config["NOTIFY_DIGEST"] = True
+    data = client_logged_in.get("/api/users/me").get_json()
+    assert (data["notify_digest"], data["digest"]) == (None, True)
+
+    response = client_logged_in.put("/api/users/me", json={"notify_digest": False})
+    assert response.status_code == 200
+    assert response.get_json()["digest"] is False
+
+    response = client_logged_in.put("/api/users/me", json={"notify_digest": None})
+    assert response.get_json()["notify_digest"] is None
+
+    response = client_logged_in.put("/api/users/me", json={"digest": True})
+    assert response.status_code == 422
+
+
 def test_list_configs_api(client_logged_in: Any, sample_config: Any) -> None:
     """Testa endpoint de listagem (apenas configs do usuário)."""
     response = client_logged_in.get("/api/search/configs")
@@ -330,6 +347,32 @@ def test_create_config_api_ignores_exact_false(client_logged_in: Any) -> None:
     assert "mail_to" in str(data["errors"])
 
 
+def test_create_config_api_with_highlight_limit(client_logged_in: Any) -> None:
+    """API aceita limite de trechos por termo e rejeita valores fora da faixa."""
+    payload = {
+        "label": "Limite",
+        "terms": [{"term": "licitação"}],
+        "mail_to": ["api@test.com"],
+        "max_highlights_per_term": 10,
+    }
+
+    response = client_logged_in.post("/api/search/configs", json=payload)
+
+    assert response.status_code == 201
+    config_id = response.get_json()["id"]
+    assert response.get_json()["max_highlights_per_term"] == 10
+
+    response = client_logged_in.put(
+        f"/api/search/configs/{config_id}", json={"max_highlights_per_term": 0}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["max_highlights_per_term"] is None
+
+    payload["max_highlights_per_term"] = 0
+    response = client_logged_in.post("/api/search/configs", json=payload)
+    assert response.status_code == 422
+
+
 def test_get_config_api(client_logged_in: Any, sample_config: Any) -> None:
     """Testa endpoint de detalhe."""
     response = client_logged_in.get(f"/api/search/configs/{sample_config.id}")
@@ -471,3 +514,104 @@ def test_multi_tenant_user_b_cannot_access_user_a_config(
     assert r_list.status_code == 200
     ids = [c["id"] for c in r_list.get_json()]
     assert config_id not in ids
+
+
+def test_bulk_import_json_is_all_or_nothing(app: Any, client_logged_in: Any) -> None:
+    """Importação em lote valida todas as linhas e só grava se nenhuma falhar."""
+    from app.repositories.search_config_repository import SearchConfigRepository
+
+    configs = [
+        {"label": f"Lote {n}", "terms": [{"term": f"termo {n}"}], "mail_to": []}
+        for n in range(3)
+    ]
+    invalid = [*configs, {"label": "", "terms": []}, {"label": "Ok", "mail_to": "x"}]
+
+    response = client_logged_in.post("/api/search/configs/bulk", json=invalid)
+
+    assert response.status_code == 422
+    errors = response.get_json()["errors"]
+    assert set(errors) == {"4.label", "4.terms", "5.terms", "5.mail_to"}
+    assert client_logged_in.get("/api/search/configs").get_json() == []
+
+    with app.app_context():
+        version = SearchConfigRepository().get_version()
+    response = client_logged_in.post(
+        "/api/search/configs/bulk", json={"configs": configs}
+    )
+
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 3
+    listed = client_logged_in.get("/api/search/configs").get_json()
+    assert sorted(c["label"] for c in listed) == ["Lote 0", "Lote 1", "Lote 2"]
+    assert all(c["created_at"] for c in listed)
+    with app.app_context():
+        assert SearchConfigRepository().get_version() == version + 1
+
+
+def test_bulk_csv_round_trip(
+    client_logged_in: Any, sample_config: Any, test_user_b: Any
+) -> None:
+    """CSV exportado pode ser importado de volta; exportação só traz o dono."""
+    from app.extensions import db
+    from app.models.search_config import SearchConfig
+
+    db.session.add(
+        SearchConfig(user_id=test_user_b.id, label="Outro usuário", mail_to=[])
+    )
+    db.session.commit()
+    csv_text = (
+        "label,terms,query_terms,mail_to,active,max_highlights_per_term\n"
+        'Contratos,"contrato;aditivo","pregão NEAR/5 eletrônico",'
+        "a@example.com;b@example.com,false,10\n"
+        "Sem termos,,,,,\n"
+    )
+
+    response = client_logged_in.post(
+        "/api/search/configs/bulk", data=csv_text, content_type="text/csv"
+    )
+    assert response.status_code == 422
+    assert set(response.get_json()["errors"]) == {"3.terms"}
+
+    csv_text = csv_text.rsplit("Sem termos", 1)[0]
+    response = client_logged_in.post(
+        "/api/search/configs/bulk", data=csv_text, content_type="text/csv"
+    )
+    assert response.status_code == 201
+
+    exported = client_logged_in.get("/api/search/configs/bulk?format=csv")
+    assert exported.mimetype == "text/csv"
+    lines = exported.get_data(as_text=True).splitlines()
+    assert lines[0].startswith("label,terms,query_terms,mail_to")
+    assert len(lines) == 3
+    assert lines[2] == (
+        "Contratos,contrato;aditivo,pregão NEAR/5 eletrônico,"
+        "a@example.com;b@example.com,,,false,false,10"
+    )
+
+    data = client_logged_in.get("/api/search/configs/bulk").get_json()
+    assert [c["label"] for c in data] == [sample_config.label, "Contratos"]
+    assert [t["syntax"] for t in data[1]["terms"]] == ["exact", "exact", "query"]
+
+
+def test_list_configs_api_cursor_pagination(client_logged_in: Any) -> None:
+    """Com limit, a listagem pagina por cursor até next_cursor ser null."""
+    configs = [
+        {"label": f"Página {n}", "terms": [{"term": f"termo {n}"}]} for n in range(5)
+    ]
+    assert (
+        client_logged_in.post("/api/search/configs/bulk", json=configs).status_code
+        == 201
+    )
+
+    labels: list[str] = []
+    url = "/api/search/configs?limit=2"
+    while url:
+        data = client_logged_in.get(url).get_json()
+        labels.extend(c["label"] for c in data["items"])
+        cursor = data["next_cursor"]
+        url = f"/api/search/configs?limit=2&cursor={cursor}" if cursor else ""
+
+    assert labels == [f"Página {n}" for n in reversed(range(5))]
+    assert client_logged_in.get("/api/search/configs?cursor=xyz").status_code == 422
+    assert client_logged_in.get("/api/search/configs?limit=500").status_code == 422
+    assert client_logged_in.get("/api/search/configs?limit=abc").status_code == 422
@@ -0,0 +1,489 @@
+"""Testes para o processamento diário assíncrono e o status das execuções."""
+
+from __future__ import annotations
+
+import threading
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from app.api import tasks as tasks_api
+from app.extensions import db
+from app.iof.common import NotFoundError
+from app.mailer.mailer import Mailer
+from app.mailer.message import DeliveryResult
+from app.models.pipeline_run import ConfigStatus
+from app.models.search_config import SearchConfig, SearchTerm
+from app.models.user import User
+from app.repositories.pipeline_run_repository import PipelineRunRepository
+from app.repositories.sqlite_document_repository import SQLiteDocumentRepository
+from app.search.source import Pagina, SearchSource
+from app.services import gazette_service
+from app.services.delivery_service import DeliveryService
+from app.services.pipeline_run_service import (
+    STALE_AFTER,
+    PipelineRunService,
+    RunInProgressError,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from flask import Flask
+    from flask.testing import FlaskClient
+    from pytest_mock import MockerFixture
+
+    from tests.conftest import WebhookStandIn
+
+API_KEY = "chave-de-teste"
+PUBLISH_DATE = date(2026, 1, 14)
+
+
+@pytest.fixture
+def gazette(
+    app: Flask, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+) -> Any:
+    """Mock da API do IOF com duas páginas."""
+    monkeypatch.setenv("API_KEY", API_KEY)
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    mocker.patch.object(
+        gazette_service,
+        "extract_pages",
+        return_value=[
+            SimpleNamespace(
+                num_pagina=n, conteudo=f"Página {n}", data_publicacao=PUBLISH_DATE
+            )
+            for n in (1, 2)
+        ],
+    )
+    response = SimpleNamespace(
+        dados=SimpleNamespace(arquivo_caderno_principal=SimpleNamespace(arquivo="cGRm"))
+    )
+    return mocker.patch.object(
+        gazette_service, "consulta_por_data", return_value=response
+    )
+
+
+def _config(user: User, label: str, term: str) -> SearchConfig:
+    config = SearchConfig(
+        user_id=user.id,
+        label=label,
+        attach_csv=False,
+        mail_to=[f"{label}@example.com"],
+        mail_subject="",
+        active=True,
+    )
+    config.terms.append(SearchTerm(term=term, exact=True))
+    db.session.add(config)
+    db.session.commit()
+    return config
+
+
+def _start(client: FlaskClient, **body: Any) -> dict[str, Any]:
+    response = client.post(
+        f"/api/tasks/process-daily?api_key={API_KEY}",
+        json={"date": PUBLISH_DATE.isoformat(), **body},
+    )
+    assert response.status_code == 202
+    body = response.get_json()
+    assert response.headers["Location"] == body["status_url"]
+    return dict(body)
+
+
+def _run(client: FlaskClient, run_id: str) -> dict[str, Any]:
+    response = client.get(f"/api/tasks/runs/{run_id}?api_key={API_KEY}")
+    assert response.status_code == 200
+    return dict(response.get_json()["run"])
+
+
+def test_process_daily_requires_api_key(client: FlaskClient, gazette: Any) -> None:
+    assert client.post("/api/tasks/process-daily").status_code == 401
+    assert client.get("/api/tasks/runs/abc").status_code == 401
+    gazette.assert_not_called()
+
+
+def test_process_daily_returns_run_with_stage_timings(
+    client: FlaskClient, gazette: Any
+) -> None:
+    body = _start(client)
+
+    run = _run(client, body["run_id"])
+
+    assert run["status"] == "succeeded"
+    assert run["publish_date"] == PUBLISH_DATE.isoformat()
+    assert [stage["name"] for stage in run["stages"]] == [
+        "fetch",
+        "extract",
+        "index",
+        "match",
+        "notify",
+    ]
+    assert all(stage["status"] == "succeeded" for stage in run["stages"])
+    assert all(stage["duration_ms"] is not None for stage in run["stages"])
+    assert run["stages"][2]["done"] == run["stages"][2]["total"] == 2
+
+
+def test_process_daily_records_stage_metrics_and_freshness(
+    client: FlaskClient, gazette: Any, test_user: User, mocker: MockerFixture
+) -> None:
+    _config(test_user, "envio", "Página")
+    _config(test_user, "vazio", "licitação")
+    mocker.patch.object(DeliveryService, "send", return_value=[])
+
+    run = _run(client, _start(client)["run_id"])
+
+    metrics = {stage["name"]: stage["metrics"] for stage in run["stages"]}
+    assert metrics["fetch"] == {"bytes": 4}
+    assert metrics["extract"]["bytes"] == 3
+    assert metrics["extract"]["pages"] == 2
+    assert "decode_ms" in metrics["extract"]
+    assert "extract_ms" in metrics["extract"]
+    assert metrics["index"] == {"pages": 2}
+    assert metrics["match"] == {"configs": 2, "configs_matched": 1, "matches": 2}
+    assert metrics["notify"]["configs"] == 1
+    assert metrics["notify"]["matches"] == 2
+    assert metrics["notify"]["emails"] == 1
+    assert {"lookup_ms", "render_ms", "send_ms"} <= set(metrics["notify"])
+    # Diário de meses atrás: freshness medida desde a meia-noite da publicação
+    assert run["freshness_ms"] > 24 * 60 * 60 * 1000
+
+    response = client.get(f"/api/tasks/metrics?api_key={API_KEY}&days=36500")
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["runs"] == 1
+    assert report["stages"]["notify"]["count"] == 1
+    assert report["stages"]["notify"]["metrics"]["emails"] == 1
+    assert report["stages"]["fetch"]["duration_ms"]["p95"] >= 0
+    assert report["freshness_ms"]["max"] == run["freshness_ms"]
+
+
+def test_metrics_requires_api_key(client: FlaskClient, gazette: Any) -> None:
+    assert client.get("/api/tasks/metrics").status_code == 401
+    response = client.get(f"/api/tasks/metrics?api_key={API_KEY}&days=0")
+    assert response.status_code == 400
+
+
+def test_process_daily_records_failed_stage(client: FlaskClient, gazette: Any) -> None:
+    gazette.side_effect = RuntimeError("IOF fora do ar")
+
+    run = _run(client, _start(client)["run_id"])
+
+    assert run["status"] == "failed"
+    assert run["error"] == "IOF fora do ar"
+    assert [(s["name"], s["status"]) for s in run["stages"]] == [("fetch", "failed")]
+
+
+def test_process_daily_skips_missing_gazette(client: FlaskClient, gazette: Any) -> None:
+    gazette.side_effect = NotFoundError("Diário não encontrado")
+
+    run = _run(client, _start(client)["run_id"])
+
+    assert run["status"] == "succeeded"
+    assert run["stages"][0]["detail"] == "Nenhum diário encontrado"
+
+
+def test_failed_run_resumes_and_retries_only_failed_configs(
+    app: Flask,
+    client: FlaskClient,
+    gazette: Any,
+    test_user: User,
+    tmp_path: Path,
+    mocker: MockerFixture,
+) -> None:
+    app.config["NOTIFY_CONCURRENCY"] = 1
+    failing = _config(test_user, "falha", "Página")
+    _config(test_user, "envio", "Página")
+    _config(test_user, "vazio", "licitação")
+    attempts = {"count": 0}
+
+    def notify(publish_date: date, config_id: int, **kwargs: Any) -> None:
+        if config_id == failing.id and attempts["count"] == 0:
+            attempts["count"] += 1
+            raise RuntimeError("SMTP fora do ar")
+
+    notify_sync = mocker.patch.object(
+        tasks_api, "notify_search_config_sync", side_effect=notify
+    )
+
+    first = _start(client)
+    run = _run(client, first["run_id"])
+    assert run["status"] == "failed"
+    assert run["checkpoint"] == "match"
+    assert run["configs"]["failed"] == 1
+    assert run["configs"]["notified"] == 1
+    assert run["configs"]["no_match"] == 1
+
+    notify_sync.reset_mock()
+    second = _start(client)
+
+    assert second["run_id"] == first["run_id"]
+    assert second["resumed"] is True
+    run = _run(client, second["run_id"])
+    assert run["status"] == "succeeded"
+    assert run["configs"]["notified"] == 2
+    # Só a config que falhou é notificada de novo; download não se repete.
+    assert [call.args[1] for call in notify_sync.call_args_list] == [failing.id]
+    assert gazette.call_count == 1
+    assert gazette_service.extract_pages.call_count == 1  # type: ignore[attr-defined]
+    # Artefatos removidos ao concluir.
+    assert not (tmp_path / "runs" / first["run_id"]).exists()
+
+
+def test_failed_teams_webhook_fails_config_in_sync_run(
+    app: Flask,
+    client: FlaskClient,
+    gazette: Any,
+    test_user: User,
+    mocker: MockerFixture,
+    webhook_server: WebhookStandIn,
+) -> None:
+    app.config["NOTIFY_CONCURRENCY"] = 1
+    config = _config(test_user, "teams", "Página")
+    config.teams_webhook = webhook_server.url
+    db.session.commit()
+    mocker.patch(
+        "app.mailer.mailer.Mailer.send",
+        side_effect=lambda *emails: [DeliveryResult(provider="smtp") for _ in emails],
+    )
+    # 400 não tem retry
+    webhook_server.statuses = [400]
+
+    run = _run(client, _start(client)["run_id"])
+
+    # O email saiu, mas a config fica pendente para publicar no Teams
+    assert run["status"] == "failed"
+    assert run["configs"]["failed"] == 1
+    assert run["configs"].get("notified", 0) == 0
+
+
+def test_succeeded_run_with_failed_notify_job_resumes(
+    app: Flask,
+    client: FlaskClient,
+    gazette: Any,
+    test_user: User,
+    mocker: MockerFixture,
+) -> None:
+    app.config["NOTIFY_CONCURRENCY"] = 1
+    failing = _config(test_user, "falha", "Página")
+    _config(test_user, "envio", "Página")
+    notify_sync = mocker.patch.object(tasks_api, "notify_search_config_sync")
+    first = _start(client)
+    assert _run(client, first["run_id"])["status"] == "succeeded"
+    # Job de notificação do RQ que falhou depois de a execução concluir
+    PipelineRunService(PipelineRunRepository()).mark_config(
+        first["run_id"], failing.id, ConfigStatus.FAILED, "SMTP fora do ar"
+    )
+    notify_sync.reset_mock()
+
+    second = _start(client)
+
+    assert second["run_id"] == first["run_id"]
+    assert second["resumed"] is True
+    run = _run(client, second["run_id"])
+    assert run["status"] == "succeeded"
+    assert run["configs"]["notified"] == 2
+    assert [call.args[1] for call in notify_sync.call_args_list] == [failing.id]
+    # Diário já indexado: a retomada não baixa nem extrai de novo
+    assert gazette.call_count == 1
+    assert gazette_service.extract_pages.call_count == 1  # type: ignore[attr-defined]
+    assert [stage["name"] for stage in run["stages"]][5:] == ["notify"]
+
+
+def test_resume_reuses_extracted_pages(
+    app: Flask, client: FlaskClient, gazette: Any, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(
+        SQLiteDocumentRepository,
+        "save_pages",
+        side_effect=[RuntimeError("disco cheio"), None],
+    )
+
+    first = _run(client, _start(client)["run_id"])
+    assert first["checkpoint"] == "extract"
+
+    second = _run(client, _start(client)["run_id"])
+
+    assert second["status"] == "succeeded"
+    assert gazette.call_count == 1
+    assert gazette_service.extract_pages.call_count == 1  # type: ignore[attr-defined]
+
+
+def test_process_daily_conflicts_with_run_in_progress(
+    client: FlaskClient, gazette: Any
+) -> None:
+    service = PipelineRunService(PipelineRunRepository())
+    run = service.create_run(PUBLISH_DATE, "rq")
+
+    response = client.post(
+        f"/api/tasks/process-daily?api_key={API_KEY}",
+        json={"date": PUBLISH_DATE.isoformat()},
+    )
+
+    assert response.status_code == 409
+    assert response.get_json()["run_id"] == run.id
+    assert _start(client, resume=True)["run_id"] == run.id
+
+
+def test_stale_run_in_progress_is_taken_over(app: Flask) -> None:
+    service = PipelineRunService(PipelineRunRepository())
+    run = service.create_run(PUBLISH_DATE, "rq")
+    with pytest.raises(RunInProgressError):
+        service.open_run(PUBLISH_DATE, "rq")
+
+    # Processo morto: nenhuma atividade desde o início da execução
+    run.created_at -= STALE_AFTER + timedelta(minutes=1)
+    db.session.commit()
+
+    assert service.open_run(PUBLISH_DATE, "rq") == (run, True)
+
+
+def test_stale_queued_configs_are_pending(app: Flask) -> None:
+    service = PipelineRunService(PipelineRunRepository())
+    run = service.create_run(PUBLISH_DATE, "rq")
+    tracker = service.tracker(run.id)
+    assert tracker is not None
+    tracker.record_matches({1: 1, 2: 1})
+    tracker.mark_configs([1, 2], ConfigStatus.QUEUED)
+    tracker.succeed()
+    assert tracker.pending_configs() == []
+
+    # O job do RQ da config 1 morreu sem atualizar o ledger
+    run.configs[0].updated_at -= STALE_AFTER + timedelta(minutes=1)
+    db.session.commit()
+
+    assert tracker.pending_configs() == [1]
+    assert service.open_run(PUBLISH_DATE, "rq") == (run, True)
+
+
+def test_process_daily_runs_in_background_thread(
+    app: Flask, client: FlaskClient, gazette: Any
+) -> None:
+    app.config["TASKS_BACKEND"] = "thread"
+
+    body = _start(client)
+    # O executor roda uma execução por vez: esperar uma tarefa vazia basta.
+    tasks_api._get_executor().submit(lambda: None).result(timeout=10)
+
+    assert _run(client, body["run_id"])["status"] == "succeeded"
+
+
+def test_auto_backend_falls_back_to_thread_only_outside_production(
+    app: Flask, caplog: pytest.LogCaptureFixture
+) -> None:
+    app.config["TASKS_BACKEND"] = "auto"
+    # Porta sem Redis
+    app.config["REDIS_URL"] = "redis://127.0.0.1:1/0"
+
+    assert tasks_api.resolve_backend(app) == "thread"
+    app.config["APP_ENV"] = "production"
+    assert tasks_api.resolve_backend(app) == "rq"
+    assert [r.levelname for r in caplog.records] == ["WARNING", "WARNING"]
+
+
+def test_process_daily_returns_503_when_queue_is_down(
+    app: Flask, client: FlaskClient, gazette: Any
+) -> None:
+    app.config["TASKS_BACKEND"] = "rq"
+    app.config["REDIS_URL"] = "redis://127.0.0.1:1/0"
+
+    response = client.post(
+        f"/api/tasks/process-daily?api_key={API_KEY}",
+        json={"date": PUBLISH_DATE.isoformat()},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "60"
+    # Falha registrada: a próxima chamada retoma em vez de responder 409
+    assert _run(client, response.get_json()["run_id"])["status"] == "failed"
+    gazette.assert_not_called()
+
+
+def test_get_unknown_run_returns_404(
+    client: FlaskClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("API_KEY", API_KEY)
+
+    response = client.get(f"/api/tasks/runs/inexistente?api_key={API_KEY}")
+
+    assert response.status_code == 404
+
+
+def test_notify_configs_runs_on_bounded_thread_pool(
+    app: Flask, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["NOTIFY_CONCURRENCY"] = 3
+    search_db = str(tmp_path / "diarios.db")
+    SearchSource(search_db).close()
+    # Só passa se as três configs estiverem em andamento ao mesmo tempo.
+    barrier = threading.Barrier(3, timeout=5)
+    sources: dict[int, int] = {}
+    mailers: dict[int, int] = {}
+
+    def notify(publish_date: date, config_id: int, **kwargs: Any) -> None:
+        sources[config_id] = id(kwargs["source"])
+        mailers[config_id] = id(kwargs["mailer"])
+        barrier.wait()
+        if config_id == 2:
+            raise RuntimeError("falhou")
+
+    mocker.patch.object(tasks_api, "notify_search_config_sync", side_effect=notify)
+    sessions = mocker.spy(Mailer, "session")
+
+    results = dict(tasks_api._notify_configs(PUBLISH_DATE, [1, 2, 3], search_db))
+
+    assert results[1] is None
+    assert results[3] is None
+    assert isinstance(results[2], RuntimeError)
+    # Uma conexão somente leitura e uma sessão de email por thread.
+    assert len(set(sources.values())) == 3
+    assert len(set(mailers.values())) == 3
+    # Nenhuma sessão a mais na thread que só distribui as configs
+    assert sessions.call_count == 3
+
+
+def test_notify_configs_sends_digest_only_for_opted_in_owners(
+    app: Flask,
+    test_user: User,
+    test_user_b: User,
+    tmp_path: Path,
+    mocker: MockerFixture,
+) -> None:
+    app.config["NOTIFY_CONCURRENCY"] = 1
+    search_db = str(tmp_path / "diarios.db")
+    with SearchSource(search_db) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Aviso de licitação e pregão.", PUBLISH_DATE)]
+        )
+    owner = db.session.get(User, test_user.id)
+    assert owner is not None
+    owner.notify_digest = True
+    digest = [
+        _config(test_user, "licitacao", "licitação"),
+        _config(test_user, "pregao", "pregão"),
+    ]
+    single = _config(test_user_b, "avulso", "licitação")
+    for config in [*digest, single]:
+        config.mail_to = ["ana@example.com"]
+    db.session.commit()
+    send = mocker.patch(
+        "app.mailer.mailer.Mailer.send", return_value=[DeliveryResult("smtp")]
+    )
+
+    results = dict(
+        tasks_api._notify_configs(
+            PUBLISH_DATE, [digest[0].id, single.id, digest[1].id], search_db
+        )
+    )
+
+    assert set(results) == {digest[0].id, digest[1].id, single.id}
+    assert not any(results.values())
+    emails = sorted(
+        (call.args[0] for call in send.call_args_list), key=lambda e: e.subject
+    )
+    # Um resumo com os dois alertas do dono que optou e o alerta avulso
+    assert len(emails) == 2
+    assert emails[1].subject.startswith("Resumo de 2 alertas")
+    assert "avulso" in emails[0].text
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import logging
+import smtplib
 from datetime import date
 from types import SimpleNamespace
 from typing import Any
@@ -9,8 +11,9 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from app.mailer import notification
 from app.mailer.mailer import Mailer
-from app.mailer.message import Attachment, Email
+from app.mailer.message import Attachment, DeliveryError, DeliveryResult, Email
 from app.mailer.notification import build_notification_emails, notification_email
 from app.models.search_config import SearchConfig
 from app.search.source import Highlight, Report, Term, Trigger
@@ -189,6 +192,119 @@ def test_smtp_provider_sends_attachment_via_flask_mail(app: Any) -> None:
     assert sent_message.attachments[0].filename == "arquivo.csv"
 
 
+def _smtp_connections(app: Any, count: int) -> list[MagicMock]:
+    app.config["MAIL_PROVIDER"] = "smtp"
+    app.config["MAIL_SERVER"] = "localhost"
+    app.config["MAIL_DEFAULT_SENDER"] = "noreply@example.com"
+    connections = []
+    for _ in range(count):
+        connection = MagicMock()
+        connection.__enter__.return_value = connection
+        connections.append(connection)
+    return connections
+
+
+def _email(n: int) -> Email:
+    return Email(to=[f"d{n}@example.com"], subject=f"Assunto {n}", text="Corpo")
+
+
+def test_smtp_session_reuses_connection_across_sends(
+    app: Any, caplog: pytest.LogCaptureFixture
+) -> None:
+    app.config["MAIL_MAX_MESSAGES_PER_CONNECTION"] = 3
+    connections = _smtp_connections(app, 2)
+    mailer = Mailer(app)
+
+    with (
+        app.app_context(),
+        patch("app.extensions.mail.connect", side_effect=connections) as connect,
+        caplog.at_level(logging.INFO, logger="app.mailer.smtp_provider"),
+        mailer.session(),
+    ):
+        for n in range(4):
+            mailer.send(_email(n))
+
+    # A cada 3 mensagens a conexão é renovada
+    assert connect.call_count == 2
+    assert connections[0].send.call_count == 3
+    assert connections[1].send.call_count == 1
+    connections[0].__exit__.assert_called_once()
+    connections[1].__exit__.assert_called_once()
+    assert "4 mensagens" in caplog.text
+    assert "2 conexões, 0 reconexões" in caplog.text
+
+
+def test_smtp_session_reconnects_when_server_drops(app: Any) -> None:
+    connections = _smtp_connections(app, 2)
+    connections[0].send.side_effect = [None, smtplib.SMTPServerDisconnected()]
+    mailer = Mailer(app)
+
+    with (
+        app.app_context(),
+        patch("app.extensions.mail.connect", side_effect=connections),
+        mailer.session(),
+    ):
+        mailer.send(_email(1))
+        results = mailer.send(_email(2))
+
+    # A mensagem da conexão derrubada é reenviada na nova conexão
+    assert len(results) == 1
+    assert connections[1].send.call_args.args[0].subject == "Assunto 2"
+    connections[0].host.close.assert_called_once()
+
+
+def test_smtp_without_session_connects_per_send(app: Any) -> None:
+    connections = _smtp_connections(app, 2)
+    mailer = Mailer(app)
+
+    with (
+        app.app_context(),
+        patch("app.extensions.mail.connect", side_effect=connections) as connect,
+    ):
+        mailer.send(_email(1))
+        mailer.send(_email(2))
+
+    assert connect.call_count == 2
+    assert all(c.__exit__.call_count == 1 for c in connections)
+
+
+def test_memory_provider_records_and_injects_errors(app: Any) -> None:
+    app.config["MAIL_PROVIDER"] = "memory"
+    app.config["MAIL_SINK_ERROR_RATE"] = 0.5
+    app.config["MAIL_SINK_SEED"] = 1
+    mailer = Mailer(app)
+
+    with pytest.raises(DeliveryError) as exc_info:
+        mailer.send(*(_email(n) for n in range(20)))
+
+    outcomes = exc_info.value.outcomes
+    delivered = [o for o in outcomes if isinstance(o, DeliveryResult)]
+    assert 0 < len(delivered) < 20
+    # Só os emails entregues ficam gravados, na ordem do lote
+    sent = mailer.provider.sent  # type: ignore[attr-defined]
+    assert [email.subject for email in sent] == [
+        f"Assunto {n}"
+        for n, outcome in enumerate(outcomes)
+        if isinstance(outcome, DeliveryResult)
+    ]
+    assert len({result.message_id for result in delivered}) == len(delivered)
+
+
+def test_file_provider_writes_eml(app: Any, tmp_path: Any) -> None:
+    app.config["MAIL_PROVIDER"] = "file"
+    app.config["MAIL_SINK_DIR"] = str(tmp_path / "mail")
+    email = _email(1)
+    email.attachments = [Attachment("a.csv", b"id\n1\n", "text/csv")]
+
+    (result,) = Mailer(app).send(email)
+
+    content = (tmp_path / "mail" / f"{result.message_id}.eml").read_text()
+    assert result.provider == "file"
+    assert "Subject: Assunto 1" in content
+    assert "To: d1@example.com" in content
+    assert 'filename="a.csv"' in content
+
+
 def test_notification_email_includes_csv_attachment() -> None:
     email = notification_email(
         ["destinatario@example.com"],
@@ -222,3 +338,104 @@ def test_build_notification_emails_uses_individual_recipients(app: Any) -> None:
         )
 
     assert [email.to for email in emails] == [["um@example.com"], ["dois@example.com"]]
+
+
+def test_build_notification_emails_renders_report_once(app: Any, mocker: Any) -> None:
+    config = SearchConfig(
+        user_id=1,
+        label="Alerta <teste>",
+        mail_to=["um@example.com", "dois@example.com", "tres@example.com"],
+        mail_subject="",
+        attach_csv=True,
+        active=True,
+    )
+    config.id = 99
+    render = mocker.spy(notification, "render_highlights")
+
+    emails = build_notification_emails(
+        config=config,
+        report=_build_report(),
+        secret_key=str(app.config["SECRET_KEY"]),
+        app_base_url="",
+        app_env="testing",
+    )
+
+    assert render.call_count == 1
+    assert emails[0].attachments is emails[2].attachments
+    assert all("Trecho de teste" in (email.html or "") for email in emails)
+    # Só o rodapé muda; o nome do alerta é escapado no HTML.
+    assert "Alerta &lt;teste&gt;" in (emails[0].html or "")
+    assert (
+        emails[0].text.split("Você está recebendo")[0]
+        == (emails[1].text.split("Você está recebendo")[0])
+    )
+
+
+def _azure_mailer(client: MagicMock, **config: Any) -> tuple[Mailer, Any]:
+    app = SimpleNamespace(
+        config={
+            "MAIL_PROVIDER": "azure",
+            "AZURE_EMAIL_ENDPOINT": "https://example.communication.azure.com/",
+            "AZURE_EMAIL_SENDER_ADDRESS": "DoNotReply@example.azurecomm.net",
+            "AZURE_COMMUNICATION_CONNECTION_STRING": "endpoint=https://x;accesskey=y",
+            **config,
+        }
+    )
+    fake_email_module = SimpleNamespace(
+        EmailClient=SimpleNamespace(
+            from_connection_string=MagicMock(return_value=client)
+        )
+    )
+    return Mailer(app), patch(
+        "app.mailer.azure_provider.import_module", return_value=fake_email_module
+    )
+
+
+def test_azure_provider_starts_sends_before_waiting() -> None:
+    events: list[str] = []
+
+    def begin_send(message: dict[str, Any]) -> Any:
+        to = message["recipients"]["to"][0]["address"]
+        events.append(f"begin {to}")
+
+        def result() -> Any:
+            events.append(f"result {to}")
+            return SimpleNamespace(id=f"id-{to}")
+
+        return SimpleNamespace(result=result)
+
+    client = MagicMock()
+    client.begin_send.side_effect = begin_send
+    mailer, import_patch = _azure_mailer(client, AZURE_EMAIL_MAX_IN_FLIGHT=2)
+    emails = [Email(to=[f"{n}@x"], subject="s", text="t") for n in "abc"]
+
+    with import_patch:
+        results = mailer.send(*emails)
+
+    assert [r.message_id for r in results] == ["id-a@x", "id-b@x", "id-c@x"]
+    # Janela de 2: o terceiro envio começa quando o primeiro termina.
+    assert events == [
+        "begin a@x",
+        "begin b@x",
+        "result a@x",
+        "begin c@x",
+        "result b@x",
+        "result c@x",
+    ]
+
+
+def test_azure_provider_reports_each_failed_email() -> None:
+    failed = SimpleNamespace(result=MagicMock(side_effect=ValueError("rejeitado")))
+    sent = SimpleNamespace(result=MagicMock(return_value=SimpleNamespace(id="ok")))
+    client = MagicMock()
+    client.begin_send.side_effect = [sent, failed, sent]
+    mailer, import_patch = _azure_mailer(client)
+    emails = [Email(to=[f"{n}@x"], subject="s", text="t") for n in "abc"]
+
+    with import_patch, pytest.raises(DeliveryError, match="1 de 3") as exc_info:
+        mailer.send(*emails)
+
+    outcomes = exc_info.value.outcomes
+    assert isinstance(outcomes[0], DeliveryResult)
+    assert isinstance(outcomes[1], ValueError)
+    assert isinstance(outcomes[2], DeliveryResult)
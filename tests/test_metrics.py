@@ -0,0 +1,108 @@
+"""Testes para o endpoint /metrics e a coleta multiprocesso."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from datetime import date
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.iof.common import NotFoundError
+from app.iof.v1 import consulta
+from app.mailer.mailer import Mailer
+from app.mailer.message import Email
+from app.search.source import SearchSource, Term, Trigger
+from app.utils.metrics import metrics_registry
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from flask import Flask
+    from flask.testing import FlaskClient
+    from pytest_mock import MockerFixture
+
+API_KEY = "chave-de-teste"
+
+
+def _count(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(f"{name}_count", labels) or 0.0
+
+
+def test_metrics_requires_api_key(
+    client: FlaskClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("API_KEY", API_KEY)
+
+    assert client.get("/metrics").status_code == 401
+
+
+def test_metrics_exposes_requests_search_iof_and_email(
+    app: Flask,
+    client: FlaskClient,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockerFixture,
+) -> None:
+    monkeypatch.setenv("API_KEY", API_KEY)
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    app.config["MAIL_PROVIDER"] = "memory"
+    http = "notificador_http_request_duration_seconds"
+    before = _count(http, endpoint="features.get_features", method="GET", status="200")
+    fts = "notificador_fts_query_duration_seconds"
+    streams = _count(fts, method="stream")
+
+    client.get("/api/features")
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.lookup(Trigger.CRON, date(2026, 1, 14), [Term("licitação")])
+        streamed = source.stream(Trigger.CRON, date(2026, 1, 14), [Term("licitação")])
+        assert _count(fts, method="stream") == streams
+        list(streamed.highlights)
+        list(streamed.highlights)
+    Mailer(app).send(Email(to=["a@example.com"], subject="Teste", text="Olá"))
+    mocker.patch("requests.get", return_value=SimpleNamespace(status_code=401))
+    with pytest.raises(NotFoundError):
+        consulta.consulta_por_data(date(2026, 1, 14))
+
+    response = client.get(f"/metrics?api_key={API_KEY}")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert (
+        _count(http, endpoint="features.get_features", method="GET", status="200")
+        == before + 1
+    )
+    assert 'notificador_fts_query_duration_seconds_count{method="lookup"}' in body
+    assert 'notificador_fts_query_duration_seconds_count{method="count"}' in body
+    # A consulta dos highlights é medida a cada leitura do stream
+    assert _count(fts, method="stream") == streams + 2
+    assert 'notificador_iof_request_duration_seconds_count{status="401"}' in body
+    assert (
+        'notificador_email_send_duration_seconds_count{outcome="ok",provider="memory"}'
+        in body
+    )
+    assert 'notificador_sqlite_file_bytes{database="diarios",file="db"}' in body
+
+
+def test_multiprocess_registry_adds_up_processes(tmp_path: Path) -> None:
+    script = (
+        "from app.utils.metrics import EMAIL_SEND_SECONDS\n"
+        "EMAIL_SEND_SECONDS.labels(provider='smtp', outcome='ok').observe(0.2)\n"
+    )
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", script],
+            check=True,
+            env={"PROMETHEUS_MULTIPROC_DIR": str(tmp_path / "prometheus")},
+        )
+
+    registry = metrics_registry(str(tmp_path / "prometheus"))
+
+    labels = {"provider": "smtp", "outcome": "ok"}
+    name = "notificador_email_send_duration_seconds"
+    assert registry.get_sample_value(f"{name}_count", labels) == 2
+    assert registry.get_sample_value(f"{name}_sum", labels) == pytest.approx(0.4)
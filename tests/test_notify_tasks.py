@@ -0,0 +1,380 @@
+"""Testes para os jobs de notificação em lote."""
+
+from __future__ import annotations
+
+import time
+from datetime import date
+from typing import TYPE_CHECKING, Any
+from unittest.mock import MagicMock
+
+from app.extensions import db
+from app.mailer.message import DeliveryError, DeliveryResult
+from app.models.notification_delivery import NotificationDelivery
+from app.models.pipeline_run import ConfigStatus
+from app.models.search_config import SearchConfig, SearchTerm
+from app.models.user import User
+from app.repositories.pipeline_run_repository import PipelineRunRepository
+from app.repositories.search_config_repository import SearchConfigRepository
+from app.search.source import Pagina, SearchSource
+from app.services import digest_service
+from app.services.gazette_service import GazetteService
+from app.services.pipeline_run_service import PipelineRunService
+from app.services.search_service import SearchService
+from app.tasks import notify, worker
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from flask import Flask
+    from pytest_mock import MockerFixture
+
+PUBLISH_DATE = date(2026, 1, 14)
+
+
+def _config(user: User, label: str, term: str) -> SearchConfig:
+    config = SearchConfig(
+        user_id=user.id,
+        label=label,
+        attach_csv=False,
+        mail_to=[f"{label}@example.com"],
+        mail_subject="",
+        active=True,
+    )
+    config.terms.append(SearchTerm(term=term, exact=True))
+    db.session.add(config)
+    db.session.commit()
+    return config
+
+
+def _prefer_digest(user: User) -> None:
+    owner = db.session.get(User, user.id)
+    assert owner is not None
+    owner.notify_digest = True
+    db.session.commit()
+
+
+def test_notify_search_configs_isolates_errors_per_config(
+    app: Flask, test_user: User, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Aviso de licitação pública.", PUBLISH_DATE)]
+        )
+    failing = _config(test_user, "falha", "licitação")
+    sent = _config(test_user, "envio", "licitação")
+    no_match = _config(test_user, "vazio", "pregão")
+
+    mocker.patch.object(worker, "create_app", return_value=app)
+    send = mocker.patch(
+        "app.mailer.mailer.Mailer.send",
+        side_effect=[RuntimeError("smtp fora"), [DeliveryResult(provider="smtp")]],
+    )
+    create_source = mocker.spy(worker, "SearchSource")
+
+    summary = notify.notify_search_configs(
+        PUBLISH_DATE.isoformat(), [failing.id, sent.id, no_match.id, 999]
+    )
+
+    assert summary == {
+        "notified": [sent.id],
+        "skipped": [no_match.id, 999],
+        "failed": [failing.id],
+    }
+    assert send.call_count == 2
+    assert create_source.call_count == 1
+
+
+def test_notify_search_configs_updates_run_ledger(
+    app: Flask, test_user: User, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Aviso de licitação pública.", PUBLISH_DATE)]
+        )
+    failing = _config(test_user, "falha", "licitação")
+    sent = _config(test_user, "envio", "licitação")
+    run_service = PipelineRunService(PipelineRunRepository())
+    run = run_service.create_run(PUBLISH_DATE, "rq")
+    tracker = run_service.tracker(run.id)
+    assert tracker is not None
+    tracker.record_matches({failing.id: 1, sent.id: 1})
+
+    mocker.patch.object(worker, "create_app", return_value=app)
+    mocker.patch(
+        "app.mailer.mailer.Mailer.send",
+        side_effect=[RuntimeError("smtp fora"), [DeliveryResult(provider="smtp")]],
+    )
+
+    notify.notify_search_configs(
+        PUBLISH_DATE.isoformat(), [failing.id, sent.id], run_id=run.id
+    )
+
+    entries = {entry.config_id: entry for entry in run.configs}
+    assert entries[failing.id].status == ConfigStatus.FAILED
+    assert entries[failing.id].error == "smtp fora"
+    assert entries[sent.id].status == ConfigStatus.NOTIFIED
+    assert tracker.pending_configs() == [failing.id]
+
+
+def test_stage_metrics_are_stored_per_job(app: Flask) -> None:
+    run_service = PipelineRunService(PipelineRunRepository())
+    run = run_service.create_run(PUBLISH_DATE, "rq")
+    tracker = run_service.tracker(run.id)
+    assert tracker is not None
+    with tracker.stage("notify") as stage:
+        tracker.record_metrics(stage, {"configs": 2})
+
+    # Dois lotes do RQ terminando juntos: cada um insere a sua linha
+    run_service.record_stage_metrics(run.id, "notify", {"emails": 1, "send_ms": 1.5})
+    run_service.record_stage_metrics(run.id, "notify", {"emails": 2, "send_ms": 2.0})
+
+    db.session.expire_all()
+    assert stage.metrics == {"configs": 2}
+    assert [row.metrics["emails"] for row in stage.job_metrics] == [1, 2]
+    assert stage.to_dict()["metrics"] == {"configs": 2, "emails": 3, "send_ms": 3.5}
+    report = run_service.stage_report(PUBLISH_DATE)
+    assert report["stages"]["notify"]["metrics"]["emails"] == 3
+
+
+def test_enqueue_notifications_chunks_config_ids(
+    app: Flask, test_user: User, mocker: MockerFixture
+) -> None:
+    configs = [_config(test_user, f"c{i}", "licitação") for i in range(5)]
+    queue = MagicMock()
+    mocker.patch("app.services.gazette_service.Queue", return_value=queue)
+
+    service = GazetteService(
+        doc_repository=MagicMock(),
+        search_service=SearchService(SearchConfigRepository()),
+        queue_connection=MagicMock(),
+        notify_chunk_size=2,
+    )
+    service._enqueue_notifications(PUBLISH_DATE)
+
+    chunks = [call.args[2] for call in queue.enqueue.call_args_list]
+    assert chunks == [
+        [configs[0].id, configs[1].id],
+        [configs[2].id, configs[3].id],
+        [configs[4].id],
+    ]
+    assert all(
+        call.args[0] is notify.notify_search_configs
+        for call in queue.enqueue.call_args_list
+    )
+
+
+def test_enqueue_notifications_chunks_digest_by_shared_recipients(
+    app: Flask, test_user: User, test_user_b: User, mocker: MockerFixture
+) -> None:
+    _prefer_digest(test_user)
+    recipients = [
+        ["a@example.com"],
+        ["b@example.com"],
+        ["c@example.com", "A@example.com"],
+    ]
+    configs = [_config(test_user, f"c{i}", "licitação") for i in range(4)]
+    for config, mail_to in zip(configs, recipients, strict=False):
+        config.mail_to = mail_to
+    # Dono sem preferência: segue NOTIFY_DIGEST (desligado)
+    single = _config(test_user_b, "avulso", "licitação")
+    db.session.commit()
+    queue = MagicMock()
+    mocker.patch("app.services.gazette_service.Queue", return_value=queue)
+
+    service = GazetteService(
+        doc_repository=MagicMock(),
+        search_service=SearchService(SearchConfigRepository()),
+        queue_connection=MagicMock(),
+        notify_chunk_size=2,
+    )
+    service._enqueue_notifications(PUBLISH_DATE)
+
+    jobs = [(call.args[0], call.args[2]) for call in queue.enqueue.call_args_list]
+    # c0 e c2 têm um destinatário em comum: mesmo resumo, mesmo job
+    assert jobs == [
+        (notify.notify_digest, [configs[0].id, configs[2].id]),
+        (notify.notify_digest, [configs[1].id, configs[3].id]),
+        (notify.notify_search_configs, [single.id]),
+    ]
+
+
+def test_preloaded_runtime_is_shared_between_jobs(
+    app: Flask, test_user: User, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    config = _config(test_user, "sem-match", "licitação")
+    create_app = mocker.patch.object(worker, "create_app")
+    create_source = mocker.spy(worker, "SearchSource")
+
+    runtime = worker.preload(app)
+    try:
+        for _ in range(3):
+            notify.notify_search_config(PUBLISH_DATE.isoformat(), config.id)
+        with worker.job_runtime() as current:
+            assert current is runtime
+    finally:
+        worker.shutdown()
+
+    create_app.assert_not_called()
+    assert create_source.call_count == 1
+
+
+def test_rerun_sends_only_undelivered_recipients(
+    app: Flask, test_user: User, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Aviso de licitação pública.", PUBLISH_DATE)]
+        )
+    config = _config(test_user, "dois", "licitação")
+    # Mesmo endereço com outra caixa: um email só
+    config.mail_to = ["a@example.com", "B@example.com", "A@Example.com"]
+    db.session.commit()
+
+    mocker.patch.object(worker, "create_app", return_value=app)
+    send = mocker.patch(
+        "app.mailer.mailer.Mailer.send",
+        side_effect=[
+            DeliveryError(
+                "smtp fora",
+                [DeliveryResult(provider="smtp"), RuntimeError("smtp fora")],
+            ),
+            [DeliveryResult(provider="smtp")],
+        ],
+    )
+
+    first = notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id])
+    second = notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id])
+    third = notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id])
+
+    assert first["failed"] == [config.id]
+    assert second["notified"] == [config.id]
+    assert third["skipped"] == [config.id]
+    sent_to = [[email.to for email in call.args] for call in send.call_args_list]
+    assert sent_to == [[["a@example.com"], ["B@example.com"]], [["B@example.com"]]]
+    assert {d.recipient for d in NotificationDelivery.query.all()} == {
+        "a@example.com",
+        "b@example.com",
+    }
+
+
+def test_notify_digest_sends_one_email_per_recipient(
+    app: Flask, test_user: User, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Aviso de licitação e pregão.", PUBLISH_DATE)]
+        )
+    licitacao = _config(test_user, "licitacao", "licitação")
+    licitacao.mail_to = ["ana@example.com", "bia@example.com"]
+    licitacao.attach_csv = True
+    pregao = _config(test_user, "pregao", "pregão")
+    pregao.mail_to = ["ANA@example.com"]
+    pregao.attach_csv = True
+    db.session.commit()
+
+    mocker.patch.object(worker, "create_app", return_value=app)
+    send = mocker.patch(
+        "app.mailer.mailer.Mailer.send", return_value=[DeliveryResult("smtp")]
+    )
+
+    summary = notify.notify_digest(PUBLISH_DATE.isoformat(), [licitacao.id, pregao.id])
+
+    assert sorted(summary["notified"]) == sorted([licitacao.id, pregao.id])
+    emails = {call.args[0].to[0]: call.args[0] for call in send.call_args_list}
+    assert sorted(emails) == ["ana@example.com", "bia@example.com"]
+    digest = emails["ana@example.com"]
+    assert digest.subject.startswith("Resumo de 2 alertas")
+    assert digest.text.count("/unsubscribe?token=") == 2
+    assert digest.attachments is not None
+    csv = digest.attachments[0].content.decode("utf-8-sig")
+    assert "licitacao" in csv
+    assert "pregao" in csv
+
+    # Reprocessar não reenvia nada.
+    send.reset_mock()
+    notify.notify_digest(PUBLISH_DATE.isoformat(), [licitacao.id, pregao.id])
+    send.assert_not_called()
+
+
+def test_notify_digest_renders_single_alert_once(
+    app: Flask, test_user: User, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Aviso de licitação pública.", PUBLISH_DATE)]
+        )
+    config = _config(test_user, "licitacao", "licitação")
+    config.mail_to = ["ana@example.com", "bia@example.com", "caio@example.com"]
+    config.attach_csv = True
+    db.session.commit()
+
+    mocker.patch.object(worker, "create_app", return_value=app)
+    send = mocker.patch(
+        "app.mailer.mailer.Mailer.send", return_value=[DeliveryResult("smtp")]
+    )
+    render = mocker.spy(digest_service, "render_notification")
+
+    notify.notify_digest(PUBLISH_DATE.isoformat(), [config.id])
+
+    emails = [call.args[0] for call in send.call_args_list]
+    assert [email.to for email in emails] == [
+        ["ana@example.com"],
+        ["bia@example.com"],
+        ["caio@example.com"],
+    ]
+    # Template e CSV renderizados uma vez; só o rodapé muda por destinatário
+    assert render.call_count == 1
+    assert emails[0].attachments is emails[2].attachments
+    assert emails[0].text != emails[1].text
+
+
+def test_highlight_queries_are_timed_as_lookup(
+    app: Flask, test_user: User, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [
+                Pagina("", n, "", "Aviso de licitação pública.", PUBLISH_DATE)
+                for n in (1, 2)
+            ]
+        )
+    config = _config(test_user, "csv", "licitação")
+    config.attach_csv = True
+    config.max_highlights_per_term = 1
+    db.session.commit()
+
+    run_service = PipelineRunService(PipelineRunRepository())
+    run = run_service.create_run(PUBLISH_DATE, "rq")
+    tracker = run_service.tracker(run.id)
+    assert tracker is not None
+    with tracker.stage("notify"):
+        pass
+
+    mocker.patch.object(worker, "create_app", return_value=app)
+    mocker.patch("app.mailer.mailer.Mailer.send", return_value=[DeliveryResult("smtp")])
+    iter_highlights = SearchSource.iter_highlights
+    queries: list[int | None] = []
+
+    def slow_query(self: SearchSource, *args: Any, **kwargs: Any) -> Any:
+        queries.append(kwargs.get("limit_per_term"))
+        time.sleep(0.1)
+        yield from iter_highlights(self, *args, **kwargs)
+
+    mocker.patch.object(SearchSource, "iter_highlights", slow_query)
+
+    notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id], run_id=run.id)
+
+    # Trechos do email e lista completa do CSV: uma consulta cada, lidas
+    # durante a renderização mas contadas como busca
+    assert queries == [1, None]
+    db.session.expire_all()
+    metrics = run.stages[-1].to_dict()["metrics"]
+    assert metrics["lookup_ms"] >= 200
+    assert metrics["render_ms"] < 100
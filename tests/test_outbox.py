@@ -0,0 +1,203 @@
+"""Testes para a outbox de emails e o worker de envio."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock
+
+from app.extensions import db
+from app.mailer.message import DeliveryError, DeliveryResult, Email
+from app.models.notification_delivery import NotificationDelivery
+from app.models.outbox_email import OutboxAttachment, OutboxEmail, OutboxStatus
+from app.models.search_config import SearchConfig, SearchTerm, get_now_utc
+from app.search.source import Pagina, SearchSource
+from app.services.outbox_service import OutboxService, ProviderBuckets, TokenBucket
+from app.tasks import notify, worker
+from app.tasks.outbox import run_sender
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from flask import Flask
+    from pytest_mock import MockerFixture
+
+    from app.models import User
+
+PUBLISH_DATE = date(2026, 1, 14)
+
+
+def test_token_bucket_waits_for_refill() -> None:
+    now = [0.0]
+
+    def sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    bucket = TokenBucket(2.0, 4, clock=lambda: now[0], sleep=sleep)
+
+    # A rajada inicial sai sem espera; depois, 2 tokens por segundo
+    assert bucket.acquire(4) == 0
+    assert bucket.acquire(1) == 0.5
+    assert bucket.acquire(3) == 1.5
+    assert now[0] == 2.0
+
+
+def test_drain_limits_each_email_by_its_provider(app: Flask) -> None:
+    now = [0.0]
+
+    def sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    outbox = OutboxService.for_app(app)
+    outbox.batch_size = 2
+    for index, provider in enumerate(["azure", "azure", "smtp", "smtp", "azure"]):
+        outbox.enqueue(
+            [Email(to=[f"{index}@example.com"], subject="Assunto", text="Corpo")],
+            provider=provider,
+            publish_date=PUBLISH_DATE,
+            alerts=[(index, "hash")],
+        )
+    mailer = MagicMock()
+    mailer.send.side_effect = lambda *emails: [
+        DeliveryResult(provider="smtp", message_id=None) for _ in emails
+    ]
+    buckets = ProviderBuckets(
+        {"azure": 1.0, "smtp": 100.0}, 2, clock=lambda: now[0], sleep=sleep
+    )
+    later = get_now_utc() + timedelta(seconds=1)
+
+    # Os emails do smtp não esperam pelos tokens gastos com o azure
+    assert outbox.drain(mailer, buckets, later).claimed == 2
+    assert outbox.drain(mailer, buckets, later).claimed == 2
+    assert now[0] == 0
+    assert outbox.drain(mailer, buckets, later).claimed == 1
+    assert now[0] == 1.0
+
+
+def test_outbox_decouples_search_from_sending(
+    app: Flask, test_user: User, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    app.config["NOTIFY_OUTBOX"] = True
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Aviso de licitação pública.", PUBLISH_DATE)]
+        )
+    config = SearchConfig(
+        user_id=test_user.id,
+        label="outbox",
+        attach_csv=True,
+        mail_to=["a@example.com", "b@example.com"],
+        mail_subject="",
+        active=True,
+    )
+    config.terms.append(SearchTerm(term="licitação", exact=True))
+    db.session.add(config)
+    db.session.commit()
+
+    mocker.patch.object(worker, "create_app", return_value=app)
+    send = mocker.patch(
+        "app.mailer.mailer.Mailer.send",
+        side_effect=lambda *emails: [
+            DeliveryResult(provider="smtp", message_id=email.to[0]) for email in emails
+        ],
+    )
+
+    # Reprocessar antes do envio não duplica a outbox
+    for _ in range(2):
+        summary = notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id])
+        assert summary["notified"] == [config.id]
+    send.assert_not_called()
+    assert OutboxEmail.query.count() == 2
+    # O CSV do alerta é gravado uma vez e referenciado pelos dois emails
+    attachment = OutboxAttachment.query.one()
+    assert all(
+        attachment.digest in e.payload and '"content":' not in e.payload
+        for e in OutboxEmail.query.all()
+    )
+
+    result = run_sender(app, burst=True)
+
+    assert (result.sent, result.retried, result.failed) == (2, 0, 0)
+    assert send.call_count == 1
+    emails = send.call_args.args
+    assert [email.to for email in emails] == [["a@example.com"], ["b@example.com"]]
+    assert emails[0].attachments[0].content.startswith(b"\xef\xbb\xbf")
+    assert emails[1].attachments[0].content == attachment.content
+    assert {e.status for e in OutboxEmail.query.all()} == {OutboxStatus.SENT}
+    assert {d.recipient for d in NotificationDelivery.query.all()} == {
+        "a@example.com",
+        "b@example.com",
+    }
+    # Entregue: uma nova execução não enfileira nada
+    summary = notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id])
+    assert summary["skipped"] == [config.id]
+
+
+def test_drain_retries_with_exponential_backoff(app: Flask) -> None:
+    outbox = OutboxService.for_app(app)
+    outbox.max_attempts = 3
+    outbox.enqueue(
+        [Email(to=["a@example.com"], subject="Assunto", text="Corpo")],
+        provider="smtp",
+        publish_date=PUBLISH_DATE,
+        alerts=[(1, "hash")],
+    )
+    mailer = MagicMock()
+    mailer.send.side_effect = DeliveryError("fora", [RuntimeError("fora")])
+    buckets = ProviderBuckets({"smtp": 100}, 10)
+    now = get_now_utc()
+
+    first = outbox.drain(mailer, buckets, now)
+    # Ainda não venceu a espera de 30s
+    early = outbox.drain(mailer, buckets, now + timedelta(seconds=29))
+    second = outbox.drain(mailer, buckets, now + timedelta(seconds=31))
+    # Segunda espera: 60s
+    third = outbox.drain(mailer, buckets, now + timedelta(seconds=92))
+
+    assert (first.retried, early.claimed, second.retried, third.failed) == (1, 0, 1, 1)
+    entry = OutboxEmail.query.one()
+    assert entry.status == OutboxStatus.FAILED
+    assert entry.attempts == 3
+    assert entry.last_error == "fora"
+
+    # Um email que falhou de vez volta à fila se for enfileirado de novo
+    assert (
+        outbox.enqueue(
+            [Email(to=["A@example.com"], subject="Assunto", text="Corpo")],
+            provider="smtp",
+            publish_date=PUBLISH_DATE,
+            alerts=[(1, "hash")],
+        )
+        == 1
+    )
+    assert OutboxEmail.query.one().status == OutboxStatus.PENDING
+
+
+def test_drain_treats_recorded_delivery_as_sent(app: Flask) -> None:
+    db.session.add(
+        NotificationDelivery(
+            config_id=1,
+            recipient="a@example.com",
+            publish_date=PUBLISH_DATE,
+            content_hash="hash",
+            provider="smtp",
+        )
+    )
+    db.session.commit()
+    outbox = OutboxService.for_app(app)
+    outbox.enqueue(
+        [Email(to=["a@example.com"], subject="Assunto", text="Corpo")],
+        provider="smtp",
+        publish_date=PUBLISH_DATE,
+        alerts=[(1, "hash")],
+    )
+    mailer = MagicMock()
+    mailer.send.return_value = [DeliveryResult(provider="smtp", message_id="m1")]
+
+    result = outbox.drain(mailer, ProviderBuckets({}, 10))
+
+    assert result.sent == 1
+    entry = OutboxEmail.query.one()
+    assert (entry.status, entry.message_id) == (OutboxStatus.SENT, "m1")
+    assert NotificationDelivery.query.count() == 1
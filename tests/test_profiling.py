@@ -0,0 +1,91 @@
+"""Testes para o profiling opcional de requisições, jobs e ingestão."""
+
+from __future__ import annotations
+
+import pstats
+from typing import TYPE_CHECKING
+
+from app.utils.profiling import PROFILE_FILE_HEADER, Profiler
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+    from flask import Flask
+    from flask.testing import FlaskClient
+
+API_KEY = "chave-de-teste"
+
+
+def _enable(app: Flask, tmp_path: Path, **config: object) -> Path:
+    app.config.update(PROFILING=True, PROFILE_DIR=str(tmp_path / "profiles"), **config)
+    return tmp_path / "profiles"
+
+
+def test_request_profiled_only_with_api_key_header(
+    app: Flask, client: FlaskClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("API_KEY", API_KEY)
+    profiles = _enable(app, tmp_path)
+
+    assert PROFILE_FILE_HEADER not in client.get("/api/features").headers
+    assert PROFILE_FILE_HEADER not in (
+        client.get("/api/features", headers={"X-Profile": "errada"}).headers
+    )
+    response = client.get("/api/features", headers={"X-Profile": API_KEY})
+
+    name = response.headers[PROFILE_FILE_HEADER]
+    assert name.endswith("-GET-features.get_features.prof")
+    stats = pstats.Stats(str(profiles / name))
+    assert any(func[2] == "get_features" for func in stats.stats)  # type: ignore[attr-defined]
+
+
+def test_configured_routes_profiled_with_retention(
+    app: Flask, client: FlaskClient, tmp_path: Path
+) -> None:
+    profiles = _enable(
+        app,
+        tmp_path,
+        PROFILE_ROUTES=frozenset({"features.get_features"}),
+        PROFILE_MAX_FILES=2,
+    )
+
+    for _ in range(3):
+        assert PROFILE_FILE_HEADER in client.get("/api/features").headers
+
+    assert len(list(profiles.iterdir())) == 2
+
+
+def test_disabled_profiler_ignores_header(
+    app: Flask, client: FlaskClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("API_KEY", API_KEY)
+    app.config["PROFILE_DIR"] = str(tmp_path / "profiles")
+
+    response = client.get("/api/features", headers={"X-Profile": API_KEY})
+
+    assert PROFILE_FILE_HEADER not in response.headers
+    assert not (tmp_path / "profiles").exists()
+
+
+def test_job_profile_and_memory_snapshot(tmp_path: Path) -> None:
+    profiler = Profiler(
+        tmp_path, jobs=frozenset({"notify_search_configs"}), trace_memory=True
+    )
+
+    with profiler.profile("notify_digest"):
+        pass
+    with profiler.profile("notify_search_configs"):
+        sorted(range(1000))
+    with profiler.memory("ingest-2026-01-14"):
+        blob = [bytes(1024) for _ in range(1000)]
+
+    assert len(blob) == 1000
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert [name.split("-", 1)[1] for name in names] == [
+        "notify_search_configs.prof",
+        "ingest-2026-01-14.mem.txt",
+    ]
+    report = (tmp_path / names[1]).read_text(encoding="utf-8")
+    assert report.startswith("ingest-2026-01-14: atual")
+    assert "test_profiling.py" in report
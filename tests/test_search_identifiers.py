@@ -0,0 +1,90 @@
+"""Testes para a extração e o índice de identificadores."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import TYPE_CHECKING
+
+from app.search.identifiers import (
+    Identifier,
+    IdentifierType,
+    extract_identifiers,
+    parse_identifier,
+)
+from app.search.query import TermSyntax
+from app.search.source import Pagina, SearchSource, Term, Trigger
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+PUBLISH_DATE = date(2026, 1, 14)
+CNPJ = Identifier(IdentifierType.CNPJ, "11222333000181")
+
+
+def test_extract_identifiers_normalizes_each_type() -> None:
+    text = (
+        "Contratada: Empresa X, CNPJ 11.222.333/0001-81, representada por "
+        "CPF 529.982.247-25 e CPF ***.982.247-**. Processo SEI "
+        "1500.01.0012345/2024-12. Extrato do Contrato nº 045/2024."
+    )
+
+    assert extract_identifiers(text) == {
+        CNPJ,
+        Identifier(IdentifierType.CPF, "52998224725"),
+        Identifier(IdentifierType.PROCESSO_SEI, "1500010012345202412"),
+        Identifier(IdentifierType.CONTRATO, "45/2024"),
+    }
+
+
+def test_extract_identifiers_rejects_invalid_check_digits() -> None:
+    assert extract_identifiers("CNPJ 11.222.333/0001-82 e CPF 529.982.247-24") == set()
+
+
+def test_parse_identifier_accepts_any_punctuation() -> None:
+    assert parse_identifier("11.222.333/0001-81") == CNPJ
+    assert parse_identifier(" 11222333000181 ") == CNPJ
+    assert parse_identifier("contrato 45/2024") == Identifier(
+        IdentifierType.CONTRATO, "45/2024"
+    )
+    assert parse_identifier("licitação 11.222.333/0001-81") is None
+    assert parse_identifier("123") is None
+
+
+def test_lookup_answers_identifier_terms_from_index(tmp_path: Path) -> None:
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [
+                Pagina("", 1, "", "Contratada CNPJ 11.222.333/0001-81.", PUBLISH_DATE),
+                Pagina("", 2, "", "Inscrita no CNPJ 11222333000181.", PUBLISH_DATE),
+                Pagina("", 3, "", "Sem identificadores.", PUBLISH_DATE),
+            ]
+        )
+        term = Term(term="11.222.333/0001-81")
+
+        report = source.lookup(Trigger.CRON, PUBLISH_DATE, [term])
+
+        assert [h.page for h in report.highlights] == [1, 2]
+        assert "<b>11.222.333/0001-81</b>" in next(iter(report.highlights)).content
+        assert source.count_matches(PUBLISH_DATE, [term]) == 2
+        # Consultas continuam no FTS, que só acha a mesma pontuação.
+        query_term = Term(term="11.222.333/0001-81", syntax=TermSyntax.QUERY)
+        assert source.count_matches(PUBLISH_DATE, [query_term]) == 1
+
+        # Reimportar a página substitui os identificadores dela.
+        source.import_pages([Pagina("", 2, "", "Página corrigida.", PUBLISH_DATE)])
+        assert source.count_matches(PUBLISH_DATE, [term]) == 1
+
+
+def test_reindex_identifiers_backfills_existing_pages(tmp_path: Path) -> None:
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Contrato nº 7/2025 assinado.", PUBLISH_DATE)]
+        )
+        source.conn.execute("DELETE FROM identificadores")
+        source.conn.commit()
+        assert not source.has_identifier_index()
+
+        assert source.reindex_identifiers() == 1
+
+        assert source.has_identifier_index()
+        assert source.count_matches(PUBLISH_DATE, [Term(term="Contrato 007/2025")]) == 1
@@ -0,0 +1,80 @@
+"""Testes da linguagem de consulta dos termos (compilação para FTS5)."""
+
+from __future__ import annotations
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.search_config import SearchTermBase
+from app.search.query import (
+    QuerySyntaxError,
+    TermSyntax,
+    compile_query,
+    compile_term,
+)
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("licitação", '"licitação"'),
+        ('"pregão eletrônico" AND obra', '("pregão eletrônico" AND "obra")'),
+        ("a OR b c", '("a" OR ("b" AND "c"))'),
+        ("a NOT b OR c", '(("a" NOT "b") OR "c")'),
+        ("contrato NEAR/5 aditivo", 'NEAR("contrato" "aditivo", 5)'),
+        ("a NEAR b NEAR c", 'NEAR("a" "b" "c", 10)'),
+        ('(a OR b) NOT "c d"', '(("a" OR "b") NOT "c d")'),
+        ("licita* NOT cancel*", '("licita"* NOT "cancel"*)'),
+        ('"pregão ele"* NEAR/3 aviso', 'NEAR("pregão ele"* "aviso", 3)'),
+    ],
+)
+def test_compile_query(query: str, expected: str) -> None:
+    assert compile_query(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "NOT a",
+        "a AND",
+        "(a",
+        "a)",
+        '"abc',
+        "a NEAR/3 b NEAR/4 c",
+        "a NEAR (b)",
+        "a*",
+        "li*ta",
+    ],
+)
+def test_compile_query_rejects_invalid(query: str) -> None:
+    with pytest.raises(QuerySyntaxError):
+        compile_query(query)
+
+
+def test_exact_terms_keep_phrase_behavior() -> None:
+    """Termos exatos continuam uma frase, mesmo contendo operadores."""
+    assert compile_term("saúde AND educação") == '"saúde AND educação"'
+    assert compile_term('diz "olá"') == '"diz ""olá"""'
+    assert compile_term("a OR b", TermSyntax.QUERY) == '("a" OR "b")'
+
+
+def test_schema_validates_query_terms() -> None:
+    term = SearchTermBase(term="a AND b", syntax=TermSyntax.QUERY)
+    assert term.syntax == TermSyntax.QUERY
+
+    with pytest.raises(ValidationError, match="Consulta inválida"):
+        SearchTermBase(term="a AND", syntax=TermSyntax.QUERY)
+
+    # Sem syntax=query o texto é aceito como frase exata.
+    assert SearchTermBase(term="a AND").syntax == TermSyntax.EXACT
+
+
+def test_exact_terms_accept_trailing_prefix() -> None:
+    assert compile_term("licita*") == '"licita"*'
+    assert compile_term("pregão eletr*") == '"pregão eletr"*'
+    # Prefixo inválido em termo já salvo não quebra a busca.
+    assert compile_term("a*") == '"a*"'
+
+    with pytest.raises(ValidationError, match="Prefixo"):
+        SearchTermBase(term="a*")
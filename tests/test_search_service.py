@@ -1,7 +1,14 @@
 """Testes para SearchService (multi-tenant por user_id)."""
 
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import UTC, datetime
 from typing import Any
 
+from flask.testing import FlaskClient
+
+from app.extensions import db
+from app.models.search_config import SearchConfig, SearchTerm
 from app.repositories.search_config_repository import SearchConfigRepository
 from app.schemas.search_config import (
     SearchConfigCreate,
@@ -110,3 +117,121 @@ def test_unsubscribe_email_from_config_deactivates_alert(
         assert result.config is not None
         assert result.config.mail_to == []
         assert result.config.active is False
+
+
+def _add_configs(user_id: int, count: int) -> None:
+    for n in range(count):
+        config = SearchConfig(
+            user_id=user_id, label=f"Alerta {n}", mail_to=[], mail_subject=""
+        )
+        config.terms = [SearchTerm(term=f"termo {n}"), SearchTerm(term="licitação")]
+        db.session.add(config)
+    db.session.commit()
+
+
+def test_listings_run_constant_number_of_queries(
+    client_logged_in: FlaskClient,
+    test_user: Any,
+    count_queries: Callable[[], AbstractContextManager[list[str]]],
+) -> None:
+    """Termos vêm em uma consulta por listagem, não uma por config (N+1)."""
+    service = SearchService(SearchConfigRepository())
+
+    def listing_queries() -> list[int]:
+        counts = []
+        for listing in (
+            lambda: [c.terms for c in service.list_configs()],
+            lambda: [c.terms for c in service.get_configs(list(range(1, 100)))],
+            lambda: client_logged_in.get("/api/search/configs"),
+            lambda: client_logged_in.get("/"),
+        ):
+            with count_queries() as queries:
+                listing()
+            counts.append(len(queries))
+        return counts
+
+    _add_configs(test_user.id, 2)
+    few = listing_queries()
+    _add_configs(test_user.id, 10)
+
+    assert listing_queries() == few
+    # Configs + termos; nas rotas, também o usuário da sessão (e o COUNT na página)
+    assert few == [2, 2, 3, 4]
+
+
+def test_active_snapshot_reloads_only_after_writes(
+    app: Any,
+    test_user: Any,
+    count_queries: Callable[[], AbstractContextManager[list[str]]],
+) -> None:
+    """O snapshot é reaproveitado até alguma config ou termo ser gravado."""
+    with app.app_context():
+        repo = SearchConfigRepository()
+        service = SearchService(repo)
+        _add_configs(test_user.id, 2)
+        version = repo.get_version()
+
+        snapshot = service.active_snapshot()
+        with count_queries() as queries:
+            assert service.active_snapshot() is snapshot
+        assert len(queries) == 1  # só a versão
+
+        assert [c.label for c in snapshot.configs] == ["Alerta 0", "Alerta 1"]
+        terms = snapshot.terms_by_key[snapshot.configs[0].id]
+        assert [t["term"] for t in terms] == ["termo 0", "licitação"]
+        assert terms[0]["match"] == '"termo 0"'
+
+        config = db.session.get(SearchConfig, snapshot.configs[0].id)
+        config.terms[0].term = "pregão"
+        db.session.commit()
+        assert repo.get_version() == version + 1
+        assert service.active_snapshot().terms_by_key[config.id][0]["term"] == "pregão"
+
+        config.active = False
+        db.session.commit()
+        assert service.active_snapshot().config_ids == [snapshot.configs[1].id]
+
+        service.delete_config(snapshot.configs[1].id, user_id=test_user.id)
+        assert repo.get_version() == version + 3
+        assert service.active_snapshot().configs == ()
+
+
+def test_keyset_pages_use_listing_index(
+    app: Any,
+    test_user: Any,
+    count_queries: Callable[[], AbstractContextManager[list[str]]],
+) -> None:
+    """Páginas por cursor cobrem tudo, sem repetir, com custo fixo por página."""
+    with app.app_context():
+        repo = SearchConfigRepository()
+        _add_configs(test_user.id, 7)
+        # Empates em created_at são desfeitos pelo id
+        same_time = datetime(2026, 1, 14, tzinfo=UTC)
+        for config in SearchConfig.query.filter(SearchConfig.id <= 4):
+            config.created_at = same_time
+        db.session.commit()
+
+        ids: list[int] = []
+        cursor = None
+        while True:
+            with count_queries() as queries:
+                page = repo.find_page(
+                    3, cursor=cursor, active_only=False, user_id=test_user.id
+                )
+            assert len(queries) == 2  # configs + termos
+            ids.extend(config.id for config in page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        assert ids == [7, 6, 5, 4, 3, 2, 1]
+        # A consulta da página segue o índice, sem ordenar em memória
+        statement = queries[0]
+        plan = " ".join(
+            str(row[-1])
+            for row in db.session.connection().exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", (1,) * statement.count("?")
+            )
+        )
+        assert "ix_search_configs_user_created" in plan
+        assert "TEMP B-TREE" not in plan
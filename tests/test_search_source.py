@@ -0,0 +1,159 @@
+"""Testes para o motor de busca SQLite FTS5."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from typing import TYPE_CHECKING
+
+import pytest
+
+from app.mailer.notification import notification_email
+from app.search.query import TermSyntax
+from app.search.source import (
+    HighlightStream,
+    Pagina,
+    SearchSource,
+    SearchSourcePool,
+    Term,
+    Trigger,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
+PUBLISH_DATE = date(2026, 1, 14)
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Generator[SearchSource]:
+    """SearchSource com algumas páginas importadas."""
+    search_source = SearchSource(str(tmp_path / "diarios.db"))
+    search_source.import_pages(
+        [
+            Pagina(
+                titulo="",
+                num_pagina=1,
+                descricao="",
+                conteudo="Aviso de licitação pública para obras.",
+                data_publicacao=PUBLISH_DATE,
+            ),
+            Pagina(
+                titulo="",
+                num_pagina=2,
+                descricao="",
+                conteudo="Resultado de licitação pública e contrato.",
+                data_publicacao=PUBLISH_DATE,
+            ),
+            Pagina(
+                titulo="",
+                num_pagina=1,
+                descricao="",
+                conteudo="Licitação pública de outro dia.",
+                data_publicacao=date(2026, 1, 15),
+            ),
+        ]
+    )
+    yield search_source
+    search_source.close()
+
+
+def test_lookup_returns_highlights_for_date(source: SearchSource) -> None:
+    report = source.lookup(Trigger.CRON, PUBLISH_DATE, [Term(term="licitação pública")])
+
+    assert report.count == 2
+    assert sorted(h.page for h in report.highlights) == [1, 2]
+
+
+def test_stream_counts_without_materializing(source: SearchSource) -> None:
+    terms = [Term(term="licitação pública"), Term(term="contrato")]
+
+    report = source.stream(Trigger.CRON, PUBLISH_DATE, terms)
+
+    assert isinstance(report.highlights, HighlightStream)
+    assert report.count == 3
+    # Cada iteração lê de novo do cursor, sem guardar as linhas.
+    assert len(list(report.highlights)) == 3
+    assert [h.term for h in report.highlights].count("contrato") == 1
+
+
+def test_notification_email_renders_streamed_report(
+    source: SearchSource, mocker: MockerFixture
+) -> None:
+    report = source.stream(Trigger.CRON, PUBLISH_DATE, [Term(term="licitação pública")])
+    queries = mocker.spy(source, "iter_highlights")
+
+    email = notification_email(["a@example.com"], report, attach_csv=True)
+
+    # Texto, HTML e CSV saem de uma única passada pelo cursor
+    assert queries.call_count == 1
+
+    assert "Página 1" in email.text
+    assert "Página 2" in (email.html or "")
+    assert email.attachments is not None
+    assert email.attachments[0].content.decode("utf-8-sig").count("\n") == 3
+
+
+def test_stream_limit_per_term_keeps_exact_count_and_full_csv(
+    source: SearchSource,
+) -> None:
+    report = source.stream(
+        Trigger.CRON,
+        PUBLISH_DATE,
+        [Term(term="licitação pública")],
+        limit_per_term=1,
+    )
+
+    assert report.count == 2
+    assert len(list(report.highlights)) == 1
+    assert report.overflow() == {"licitação pública": 1}
+    assert len(list(report.complete_highlights())) == 2
+
+    email = notification_email(["a@example.com"], report, attach_csv=True)
+
+    assert "mais 1 ocorrência(s)" in email.text
+    assert email.attachments is not None
+    assert email.attachments[0].content.decode("utf-8-sig").count("\n") == 3
+
+
+def test_lookup_without_limit_has_no_overflow(source: SearchSource) -> None:
+    report = source.lookup(Trigger.CRON, PUBLISH_DATE, [Term(term="contrato")])
+
+    assert report.overflow() == {}
+    assert report.complete_highlights() is report.highlights
+
+
+def test_lookup_compiles_query_terms(source: SearchSource) -> None:
+    terms = [Term(term='"licitação pública" NOT contrato', syntax=TermSyntax.QUERY)]
+
+    report = source.lookup(Trigger.CRON, PUBLISH_DATE, terms)
+
+    assert [h.page for h in report.highlights] == [1]
+    assert report.count == source.count_matches(PUBLISH_DATE, terms) == 1
+
+
+def test_prefix_terms_use_reindexed_prefix_index(source: SearchSource) -> None:
+    assert source.has_prefix_index()
+
+    source.reindex(prefix=None)
+    assert not source.has_prefix_index()
+    without_index = source.count_matches(PUBLISH_DATE, [Term(term="licita*")])
+
+    source.reindex()
+    assert source.has_prefix_index()
+    report = source.lookup(Trigger.CRON, PUBLISH_DATE, [Term(term="licita*")])
+
+    assert report.count == without_index == 2
+
+
+def test_read_only_pool_searches_but_cannot_write(source: SearchSource) -> None:
+    with SearchSourcePool(source.db_path) as pool:
+        reader = pool.get()
+
+        assert pool.get() is reader
+        assert reader.count_matches(PUBLISH_DATE, [Term(term="contrato")]) == 1
+        with pytest.raises(sqlite3.OperationalError):
+            reader.conn.execute("DELETE FROM documentos")
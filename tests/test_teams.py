@@ -0,0 +1,173 @@
+"""Testes para o canal de notificação do Microsoft Teams."""
+
+from __future__ import annotations
+
+import threading
+from datetime import date
+from typing import TYPE_CHECKING
+
+from app.extensions import db
+from app.mailer.message import DeliveryResult
+from app.models.notification_delivery import NotificationDelivery
+from app.models.pipeline_run import ConfigStatus
+from app.models.search_config import SearchConfig, SearchTerm
+from app.repositories.pipeline_run_repository import PipelineRunRepository
+from app.search.source import Pagina, SearchSource
+from app.services.pipeline_run_service import PipelineRunService
+from app.tasks import notify, worker
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from flask import Flask
+    from pytest_mock import MockerFixture
+
+    from app.models import User
+    from tests.conftest import WebhookStandIn
+
+PUBLISH_DATE = date(2026, 1, 14)
+
+
+def _setup(
+    app: Flask, user: User, tmp_path: Path, webhook: str, mail_to: list[str]
+) -> SearchConfig:
+    app.config["DIARIOS_DIR"] = str(tmp_path)
+    with SearchSource(str(tmp_path / "diarios.db")) as source:
+        source.import_pages(
+            [Pagina("", 1, "", "Aviso de licitação pública.", PUBLISH_DATE)]
+        )
+    config = SearchConfig(
+        user_id=user.id,
+        label="Licitações",
+        attach_csv=False,
+        mail_to=mail_to,
+        mail_subject="",
+        active=True,
+        teams_webhook=webhook,
+    )
+    config.terms.append(SearchTerm(term="licitação", exact=True))
+    db.session.add(config)
+    db.session.commit()
+    return config
+
+
+def test_teams_posts_adaptive_card_with_retry(
+    app: Flask,
+    test_user: User,
+    tmp_path: Path,
+    mocker: MockerFixture,
+    webhook_server: WebhookStandIn,
+) -> None:
+    config = _setup(app, test_user, tmp_path, webhook_server.url, [])
+    mocker.patch.object(worker, "create_app", return_value=app)
+    webhook_server.statuses = [503]
+
+    first = notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id])
+    second = notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id])
+
+    assert first["notified"] == [config.id]
+    # Já publicado: reprocessar não publica de novo
+    assert second["skipped"] == [config.id]
+    # 503 e o retry
+    assert len(webhook_server.requests) == 2
+    card = webhook_server.requests[-1]["attachments"][0]
+    assert card["contentType"] == "application/vnd.microsoft.card.adaptive"
+    texts = [block.get("text", "") for block in card["content"]["body"]]
+    assert texts[0] == "Licitações"
+    assert any("**licitação**" in text for text in texts)
+    assert NotificationDelivery.query.one().recipient == "teams"
+
+
+def test_slow_teams_webhook_does_not_delay_email(
+    app: Flask,
+    test_user: User,
+    tmp_path: Path,
+    mocker: MockerFixture,
+    webhook_server: WebhookStandIn,
+) -> None:
+    config = _setup(app, test_user, tmp_path, webhook_server.url, ["a@example.com"])
+    mocker.patch.object(worker, "create_app", return_value=app)
+    release = webhook_server.release = threading.Event()
+    emailed_before_webhook: list[bool] = []
+
+    def send(*emails: object) -> list[DeliveryResult]:
+        # O webhook ainda não respondeu quando o email sai
+        emailed_before_webhook.append(not release.is_set())
+        release.set()
+        return [DeliveryResult(provider="smtp") for _ in emails]
+
+    mocker.patch("app.mailer.mailer.Mailer.send", side_effect=send)
+
+    summary = notify.notify_search_configs(PUBLISH_DATE.isoformat(), [config.id])
+
+    assert summary["notified"] == [config.id]
+    assert emailed_before_webhook == [True]
+    assert {d.recipient for d in NotificationDelivery.query.all()} == {
+        "a@example.com",
+        "teams",
+    }
+
+
+def test_failed_teams_webhook_leaves_config_pending(
+    app: Flask,
+    test_user: User,
+    tmp_path: Path,
+    mocker: MockerFixture,
+    webhook_server: WebhookStandIn,
+) -> None:
+    config = _setup(app, test_user, tmp_path, webhook_server.url, ["a@example.com"])
+    run_service = PipelineRunService(PipelineRunRepository())
+    run = run_service.create_run(PUBLISH_DATE, "rq")
+    tracker = run_service.tracker(run.id)
+    assert tracker is not None
+    tracker.record_matches({config.id: 1})
+    mocker.patch.object(worker, "create_app", return_value=app)
+    send = mocker.patch(
+        "app.mailer.mailer.Mailer.send",
+        side_effect=lambda *emails: [DeliveryResult(provider="smtp") for _ in emails],
+    )
+    # 400 não tem retry
+    webhook_server.statuses = [400]
+
+    first = notify.notify_search_configs(
+        PUBLISH_DATE.isoformat(), [config.id], run_id=run.id
+    )
+
+    assert first["failed"] == [config.id]
+    entry = run.configs[0]
+    assert entry.status == ConfigStatus.FAILED
+    assert entry.error is not None
+    assert entry.error.startswith("Falha ao publicar no Teams")
+    assert tracker.pending_configs() == [config.id]
+
+    # A nova tentativa publica no Teams sem reenviar o email
+    second = notify.notify_search_configs(
+        PUBLISH_DATE.isoformat(), [config.id], run_id=run.id
+    )
+
+    assert second["notified"] == [config.id]
+    assert send.call_count == 1
+    assert len(webhook_server.requests) == 2
+    db.session.expire_all()
+    assert run.configs[0].status == ConfigStatus.NOTIFIED
+
+
+def test_failed_teams_webhook_fails_digest_alert(
+    app: Flask,
+    test_user: User,
+    tmp_path: Path,
+    mocker: MockerFixture,
+    webhook_server: WebhookStandIn,
+) -> None:
+    config = _setup(app, test_user, tmp_path, webhook_server.url, ["a@example.com"])
+    mocker.patch.object(worker, "create_app", return_value=app)
+    mocker.patch(
+        "app.mailer.mailer.Mailer.send",
+        side_effect=lambda *emails: [DeliveryResult(provider="smtp") for _ in emails],
+    )
+    webhook_server.statuses = [400]
+
+    summary = notify.notify_digest(PUBLISH_DATE.isoformat(), [config.id])
+
+    assert summary["failed"] == [config.id]
+    assert [d.recipient for d in NotificationDelivery.query.all()] == ["a@example.com"]